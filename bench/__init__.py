@@ -0,0 +1,4 @@
+# Package bench: các bộ đo hiệu năng (benchmark) của ứng dụng Todo.
+# Chạy từ thư mục gốc của dự án, ví dụ:
+#   python -m bench.app --users 50 --todos 200 --tags 20 --concurrency 8 --output bench_app.json
+# Mỗi bộ đo ghi kết quả dạng JSON để so sánh giữa các phiên bản (tham số --compare).
@@ -0,0 +1,183 @@
+# Bộ đo tải và độ trễ cho ứng dụng web (webapp.create_app).
+# - Tạo database tạm với N user x M công việc, K nhãn (models.seed.seed_database).
+# - Chạy ứng dụng FastHTML bằng uvicorn trên một cổng cục bộ, trong cùng tiến trình
+#   (để đếm được số câu lệnh SQL qua sự kiện của engine).
+# - Nhiều client đồng thời lần lượt gọi /login, / và /logout; mỗi route được đo thành một pha riêng.
+# - Báo cáo thông lượng, p50/p95/p99 và số câu lệnh SQL trung bình trên mỗi request,
+#   ghi ra file JSON để so sánh giữa các phiên bản.
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.app --users 50 --todos 200 --tags 20 --concurrency 8 --requests 20 --output bench_app.json
+#   python -m bench.app --compare bench_app.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import http.client  # Client HTTP của thư viện chuẩn (giữ kết nối keep-alive)
+import socket  # Tìm cổng trống
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import threading  # Chạy server và đếm câu lệnh SQL an toàn giữa các thread
+import time  # Đo thời gian
+from concurrent.futures import ThreadPoolExecutor  # Các client đồng thời
+from bench.common import compare_results, print_results, summarize, write_results
+
+class SqlCounter:
+    """Đếm số câu lệnh SQL mà engine thực thi (qua sự kiện before_cursor_execute)."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+def free_port() -> int:
+    """Tìm một cổng TCP còn trống trên máy cục bộ."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(app, port: int):
+    """Chạy uvicorn trong một thread nền; trả về đối tượng server (gọi server.should_exit = True để dừng)."""
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+class Client:
+    """Một client HTTP giữ kết nối keep-alive và cookie session của riêng nó."""
+
+    def __init__(self, port: int):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        self.cookies: dict[str, str] = {}
+        self.set_cookies = 0  # Số response có header Set-Cookie
+
+    def request(self, method: str, path: str, body: str | None = None) -> tuple[int, float]:
+        """Gửi một request, trả về (mã trạng thái, độ trễ tính bằng giây). Không tự đi theo chuyển hướng."""
+        headers = {}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        start = time.perf_counter()
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        response.read()
+        elapsed = time.perf_counter() - start
+        set_cookie = response.headers.get_all("set-cookie") or []
+        self.set_cookies += bool(set_cookie)
+        for header in set_cookie:
+            name, _, value = header.split(";", 1)[0].partition("=")
+            self.cookies[name.strip()] = value.strip()
+        return response.status, elapsed
+
+    def close(self):
+        self.conn.close()
+
+def run_phase(name: str, clients: list, action, requests_per_client: int, counter: SqlCounter, expected: tuple[int, ...]) -> dict:
+    """
+    Chạy một pha đo: mỗi client gọi action(client, i) requests_per_client lần, tất cả client chạy đồng thời.
+
+    Returns:
+        dict: Kết quả tổng hợp của pha (xem bench.common.summarize).
+    """
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def worker(client):
+        nonlocal errors
+        local, local_errors = [], 0
+        for i in range(requests_per_client):
+            status, elapsed = action(client, i)
+            local.append(elapsed)
+            if status not in expected:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    sql_before = counter.count
+    cookies_before = sum(client.set_cookies for client in clients)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        list(pool.map(worker, clients))
+    elapsed = time.perf_counter() - start
+    statements = counter.count - sql_before
+    set_cookies = sum(client.set_cookies for client in clients) - cookies_before
+    return summarize(latencies, elapsed, sql_per_request=round(statements / max(len(latencies), 1), 2),
+                     set_cookie_per_request=round(set_cookies / max(len(latencies), 1), 2), errors=errors)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo tải các route /login, / và /logout")
+    parser.add_argument("--users", type=int, default=50, help="Số user được tạo")
+    parser.add_argument("--todos", type=int, default=200, help="Số công việc của mỗi user")
+    parser.add_argument("--tags", type=int, default=20, help="Số nhãn")
+    parser.add_argument("--concurrency", type=int, default=8, help="Số client đồng thời")
+    parser.add_argument("--requests", type=int, default=20, help="Số request mỗi client trong mỗi pha")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    # Database tạm, truyền thẳng cho factory
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    from webapp import create_app
+    app = create_app({"db": {"url": f"sqlite+pysqlite:///{workdir}/bench.db"}})
+    engine = app.state.engine
+
+    from models.seed import SEED_PASSWORD, seed_database
+    print(f"Đang tạo dữ liệu: {args.users} user x {args.todos} công việc, {args.tags} nhãn...")
+    seed_database(engine, args.users, args.todos, args.tags, log=None)
+    with engine.connect() as conn:
+        logins = [row[0] for row in conn.exec_driver_sql("SELECT login FROM users WHERE login LIKE 'seed%' ORDER BY id")]
+    counter = SqlCounter(engine)
+    port = free_port()
+    server, thread = start_server(app, port)
+
+    clients = [Client(port) for _ in range(args.concurrency)]
+
+    def do_login(client, i):
+        login = logins[(id(client) + i) % len(logins)]
+        return client.request("POST", "/login", f"login={login}&password={SEED_PASSWORD}")
+
+    def do_home(client, i):
+        return client.request("GET", "/")
+
+    def do_logout(client, i):
+        # Đăng nhập lại (không tính giờ) để mỗi lần đăng xuất đều có session hợp lệ
+        if i:
+            do_login(client, i)
+        return client.request("GET", "/logout")
+
+    results = {}
+    try:
+        results["POST /login"] = run_phase("POST /login", clients, do_login, args.requests, counter, (200, 303))
+        results["GET /"] = run_phase("GET /", clients, do_home, args.requests, counter, (200,))
+        results["GET /logout"] = run_phase("GET /logout", clients, do_logout, args.requests, counter, (200, 303))
+    finally:
+        for client in clients:
+            client.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    # Pha /logout có kèm đăng nhập lại nên số câu lệnh SQL của nó bao gồm cả truy vấn đăng nhập
+    print_results(results)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "app", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
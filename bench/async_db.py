@@ -0,0 +1,120 @@
+# So sánh thông lượng của đường truy cập database đồng bộ và async (xem models/db_executor.py).
+# - Chạy cùng một bộ pha đo hai lần: db_async=False (route đồng bộ, chạy trong threadpool chung của Starlette)
+#   và db_async=True (route async, chỉ phần truy cập database chạy trong DbExecutor).
+# - Các pha: GET / khi cache nóng (phiên bản dữ liệu và user đã có trong cache), GET / khi cache nguội
+#   (xóa fragment cache và user cache trước mỗi request, buộc phải truy vấn và render lại) và POST /login.
+# - --query-delay-ms thêm độ trễ vào mỗi câu lệnh SQL (giả lập ổ đĩa chậm) để thấy rõ các request
+#   đồng thời có chồng phần chờ I/O lên nhau hay không.
+# - Báo cáo thông lượng, p50/p95/p99 của từng chế độ và tỷ lệ thông lượng async / đồng bộ.
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.async_db --users 50 --todos 200 --concurrency 16 --requests 20 --query-delay-ms 2 --output bench_async.json
+#   python -m bench.async_db --compare bench_async.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import time  # Giả lập độ trễ câu lệnh SQL
+from bench.app import Client, SqlCounter, free_port, run_phase, start_server
+from bench.common import compare_results, print_results, write_results
+
+def add_query_delay(engine, seconds: float):
+    """Ngủ một khoảng thời gian trước mỗi câu lệnh SQL (time.sleep nhả GIL giống như chờ I/O thật)."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _delay(*args):
+        time.sleep(seconds)
+
+def run_mode(db_async: bool, args) -> dict:
+    # Mỗi chế độ dùng database và server riêng, cùng dữ liệu (seed cố định)
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    from webapp import create_app
+    from models import user_cache
+    from views import Home
+    # Độ trễ giả lập làm nhiều câu lệnh vượt ngưỡng "chậm": nâng ngưỡng để không in log trong lúc đo
+    app = create_app({"db": {"url": f"sqlite+pysqlite:///{workdir}/bench.db", "slow_query_ms": 60_000},
+                      "db_async": db_async})
+    engine = app.state.engine
+
+    from models.seed import SEED_PASSWORD, seed_database
+    seed_database(engine, args.users, args.todos, args.tags, log=None)
+    with engine.connect() as conn:
+        logins = [row[0] for row in conn.exec_driver_sql("SELECT login FROM users WHERE login LIKE 'seed%' ORDER BY id")]
+    if args.query_delay_ms:
+        add_query_delay(engine, args.query_delay_ms / 1000)
+    Home.todo_list_cache.clear()
+    user_cache.clear()
+    counter = SqlCounter(engine)
+    port = free_port()
+    server, thread = start_server(app, port)
+    clients = [Client(port) for _ in range(args.concurrency)]
+
+    def do_login(client, i):
+        login = logins[(id(client) + i) % len(logins)]
+        return client.request("POST", "/login", f"login={login}&password={SEED_PASSWORD}")
+
+    def do_home(client, i):
+        return client.request("GET", "/")
+
+    def do_home_cold(client, i):
+        Home.todo_list_cache.clear()
+        user_cache.clear()
+        return client.request("GET", "/")
+
+    results = {}
+    try:
+        # Đăng nhập một lần (không tính giờ) để các pha GET / có session hợp lệ
+        for i, client in enumerate(clients):
+            do_login(client, i)
+        results["GET / (cache nóng)"] = run_phase("GET /", clients, do_home, args.requests, counter, (200,))
+        results["GET / (cache nguội)"] = run_phase("GET /", clients, do_home_cold, args.requests, counter, (200,))
+        results["POST /login"] = run_phase("POST /login", clients, do_login, args.login_requests, counter, (303, 503))
+    finally:
+        for client in clients:
+            client.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        engine.dispose()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh thông lượng route đồng bộ và async (DbExecutor)")
+    parser.add_argument("--users", type=int, default=50, help="Số user được tạo")
+    parser.add_argument("--todos", type=int, default=200, help="Số công việc của mỗi user")
+    parser.add_argument("--tags", type=int, default=20, help="Số nhãn")
+    parser.add_argument("--concurrency", type=int, default=16, help="Số client đồng thời")
+    parser.add_argument("--requests", type=int, default=20, help="Số request GET / mỗi client trong mỗi pha")
+    parser.add_argument("--login-requests", type=int, default=3, help="Số lần đăng nhập của mỗi client (scrypt tốn CPU)")
+    parser.add_argument("--query-delay-ms", type=float, default=0.0, help="Độ trễ thêm vào mỗi câu lệnh SQL (ms)")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    print(f"Dữ liệu: {args.users} user x {args.todos} công việc, {args.tags} nhãn; "
+          f"{args.concurrency} client, độ trễ SQL {args.query_delay_ms}ms")
+    results = {}
+    for db_async, label in ((False, "đồng bộ"), (True, "async")):
+        for phase, result in run_mode(db_async, args).items():
+            results[f"{phase} [{label}]"] = result
+    print_results(results)
+    for phase in ("GET / (cache nóng)", "GET / (cache nguội)", "POST /login"):
+        sync_rps = results[f"{phase} [đồng bộ]"]["throughput_per_s"]
+        async_rps = results[f"{phase} [async]"]["throughput_per_s"]
+        print(f"{phase}: async / đồng bộ = {async_rps / max(sync_rps, 1e-9):.2f}x")
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "async_db", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
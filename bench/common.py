@@ -0,0 +1,97 @@
+# Các hàm dùng chung cho các bộ đo hiệu năng: tính phân vị, tổng hợp kết quả,
+# ghi file JSON và so sánh với kết quả của phiên bản trước.
+
+import json  # Ghi/đọc kết quả dạng JSON
+import platform  # Thông tin máy chạy đo
+import subprocess  # Lấy mã commit git hiện tại
+import sys  # Phiên bản Python
+from datetime import datetime  # Thời điểm chạy đo
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """
+    Tính phân vị p (0-100) của một danh sách ĐÃ SẮP XẾP, nội suy tuyến tính giữa hai phần tử.
+
+    Args:
+        sorted_values (list[float]): Danh sách giá trị đã sắp xếp tăng dần.
+        p (float): Phân vị cần tính, ví dụ 95 cho p95.
+    """
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+def summarize(latencies: list[float], elapsed: float, **extra) -> dict:
+    """
+    Tổng hợp độ trễ (giây) của một nhóm thao tác thành số liệu: thông lượng và p50/p95/p99 (mili giây).
+
+    Args:
+        latencies (list[float]): Độ trễ của từng thao tác, tính bằng giây.
+        elapsed (float): Tổng thời gian thực (giây) của cả nhóm thao tác.
+        **extra: Các số liệu bổ sung ghi kèm (ví dụ sql_per_request, errors).
+    """
+    values = sorted(latencies)
+    result = {
+        "count": len(values),
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+def environment_info() -> dict:
+    """Thông tin môi trường chạy đo: commit git, phiên bản Python, nền tảng, thời điểm."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+    }
+
+def write_results(path: str, name: str, config: dict, results: dict):
+    """Ghi kết quả đo ra file JSON (kèm cấu hình và thông tin môi trường)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"benchmark": name, "environment": environment_info(), "config": config, "results": results}, f, ensure_ascii=False, indent=2)
+
+def print_results(results: dict):
+    """In bảng kết quả ra màn hình, mỗi nhóm thao tác một dòng."""
+    for name, r in results.items():
+        line = f"{name:<24} n={r['count']:<7} {r['throughput_per_s']:>10.1f}/s  p50={r['p50_ms']:>8.2f}ms  p95={r['p95_ms']:>8.2f}ms  p99={r['p99_ms']:>8.2f}ms"
+        extras = {k: v for k, v in r.items() if k not in ("count", "elapsed_s", "throughput_per_s", "mean_ms", "p50_ms", "p95_ms", "p99_ms")}
+        if extras:
+            line += "  " + " ".join(f"{k}={v}" for k, v in extras.items())
+        print(line)
+
+def compare_results(baseline_path: str, results: dict, threshold: float = 0.10) -> list[str]:
+    """
+    So sánh kết quả hiện tại với một file kết quả trước đó.
+
+    Args:
+        baseline_path (str): Đường dẫn file JSON của lần đo trước.
+        results (dict): Kết quả của lần đo hiện tại.
+        threshold (float): Tỷ lệ chậm đi tối đa cho phép của p95 (0.10 = 10%).
+
+    Returns:
+        list[str]: Danh sách các nhóm thao tác bị chậm đi quá ngưỡng.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("p95_ms"):
+            continue
+        change = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        print(f"{name:<24} p95 {before['p95_ms']:.2f}ms -> {current['p95_ms']:.2f}ms ({change:+.1%})")
+        if change > threshold:
+            regressions.append(f"{name}: p95 chậm đi {change:.1%}")
+    return regressions
@@ -0,0 +1,94 @@
+# Đo thời gian lấy trang đầu của danh sách công việc có bộ lọc (models/todo_filter.py) khi số công việc
+# của một user tăng dần (mặc định 1 nghìn, 10 nghìn, 100 nghìn). Mỗi kích thước dùng một database riêng.
+# - status, statuses_priority, due_window, tags_any, tags_all, combined: load_todo_page với bộ lọc
+#   (điều kiện nằm trong câu truy vấn, đi theo index, dừng sau một trang).
+# - python_filter: cách cũ để so sánh: nạp mọi công việc của user rồi lọc trạng thái trong Python.
+# Thời gian của các bộ lọc SQL gần như không đổi giữa các kích thước; python_filter tăng tuyến tính.
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.filters --sizes 1000 10000 100000 --output bench_filters.json
+#   python -m bench.filters --compare bench_filters.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import time  # Đo thời gian
+from datetime import datetime, timedelta  # Khoảng hạn chót
+from bench.common import compare_results, print_results, summarize, write_results
+
+def _filters(TodoFilter, tag_names: list[str]) -> dict:
+    # Các bộ lọc được đo (tỷ lệ khớp không phụ thuộc kích thước dữ liệu)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "status": TodoFilter(statuses=("pending",)),
+        "statuses_priority": TodoFilter(statuses=("pending", "in_progress"), priority_min=2, priority_max=3),
+        "due_window": TodoFilter(due_from=today, due_to=today + timedelta(days=30)),
+        "tags_any": TodoFilter(tags=tuple(tag_names[:2])),
+        "tags_all": TodoFilter(tags=tuple(tag_names[:2]), tag_mode="all"),
+        "combined": TodoFilter(statuses=("pending",), priority_min=3, tags=tuple(tag_names[:3])),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo bộ lọc danh sách công việc theo số công việc của user")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000], help="Số công việc của user được đo")
+    parser.add_argument("--tags", type=int, default=10, help="Số nhãn")
+    parser.add_argument("--tags-per-todo", type=int, default=3, help="Số nhãn tối đa của mỗi công việc")
+    parser.add_argument("--repeat", type=int, default=50, help="Số lần đo mỗi bộ lọc")
+    parser.add_argument("--python-repeat", type=int, default=3, help="Số lần đo cách lọc trong Python")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    from sqlalchemy.orm import Session
+    from models import (TodoFilter, configure_data_versions, load_todo_page, load_user_todos, make_engine, migrate,
+                        seed_database)
+    results = {}
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix="todo-bench-")
+        engine = make_engine({"url": f"sqlite+pysqlite:///{workdir}/filters.db", "slow_query_ms": 60_000})
+        migrate(engine)
+        configure_data_versions(engine)
+        seed_database(engine, 1, size, args.tags, tags_per_todo=args.tags_per_todo, log=None)
+        with engine.connect() as conn:
+            user_id = conn.exec_driver_sql("SELECT MIN(id) FROM users").scalar()
+            tag_names = [name for (name,) in conn.exec_driver_sql("SELECT name FROM tags ORDER BY id")]
+        print(f"Dữ liệu: 1 user, {size} công việc, {args.tags} nhãn")
+
+        for name, filters in _filters(TodoFilter, tag_names).items():
+            latencies, found = [], 0
+            with Session(engine) as db:
+                load_todo_page(db, user_id, filters=filters)  # Làm nóng (chỉ mục nhãn, cache trang)
+                for _ in range(args.repeat):
+                    began = time.perf_counter()
+                    todos, _ = load_todo_page(db, user_id, filters=filters)
+                    latencies.append(time.perf_counter() - began)
+                    found = len(todos)
+                    db.expunge_all()
+            results[f"{name}@{size}"] = summarize(latencies, sum(latencies), page_items=found)
+
+        latencies = []
+        with Session(engine) as db:
+            for _ in range(args.python_repeat):
+                began = time.perf_counter()
+                todos = [todo for todo in load_user_todos(db, user_id) if todo.status == "pending"][:50]
+                latencies.append(time.perf_counter() - began)
+                db.expunge_all()
+        results[f"python_filter@{size}"] = summarize(latencies, sum(latencies), page_items=len(todos))
+        engine.dispose()
+
+    print_results(results)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "filters", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# Đo thông lượng đăng nhập khi kiểm tra mật khẩu bằng scrypt (models/passwords.py).
+# - Tạo database tạm với N user; một nửa số user được đặt lại mật khẩu theo định dạng SHA-256 cũ
+#   để đo cả trường hợp băm lại (rehash) khi đăng nhập.
+# - Nhiều client đồng thời gửi POST /login (pha "login storm"); cùng lúc một client khác liên tục gọi
+#   GET /metrics để đo độ trễ của các request không liên quan trong lúc pool băm mật khẩu đang bận
+#   (nếu event loop bị chặn, độ trễ này sẽ tăng vọt).
+# - Báo cáo thông lượng, p50/p95/p99, số request bị từ chối (503) và số user đã được băm lại.
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.login --users 200 --concurrency 16 --requests 10 --pool-workers 2 --output bench_login.json
+#   python -m bench.login --compare bench_login.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import hashlib  # Tạo mật khẩu theo định dạng SHA-256 cũ
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import threading  # Client đo độ trễ chạy song song
+import time  # Đo thời gian
+from bench.app import Client, SqlCounter, free_port, run_phase, start_server
+from bench.common import compare_results, print_results, summarize, write_results
+
+def probe(port: int, stop: threading.Event, latencies: list):
+    """Liên tục gọi GET /metrics cho tới khi stop được đặt, ghi lại độ trễ của từng lần."""
+    client = Client(port)
+    try:
+        while not stop.is_set():
+            latencies.append(client.request("GET", "/metrics")[1])
+            time.sleep(0.005)
+    finally:
+        client.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thông lượng POST /login với scrypt")
+    parser.add_argument("--users", type=int, default=200, help="Số user được tạo")
+    parser.add_argument("--concurrency", type=int, default=16, help="Số client đăng nhập đồng thời")
+    parser.add_argument("--requests", type=int, default=10, help="Số lần đăng nhập của mỗi client")
+    parser.add_argument("--pool-workers", type=int, default=0, help="Số thread băm mật khẩu (0 = số nhân CPU)")
+    parser.add_argument("--pool-queue", type=int, default=64, help="Số lần băm được phép chờ")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    from webapp import create_app
+    app = create_app({"db": {"url": f"sqlite+pysqlite:///{workdir}/bench.db"},
+                      "password_workers": args.pool_workers, "password_queue": args.pool_queue})
+    engine = app.state.engine
+
+    from models.seed import SEED_PASSWORD, seed_database
+    print(f"Đang tạo dữ liệu: {args.users} user...")
+    seed_database(engine, args.users, 0, 0, log=None)
+    legacy = hashlib.sha256(SEED_PASSWORD.encode("utf-8")).hexdigest()
+    with engine.begin() as conn:
+        # Một nửa số user dùng mật khẩu định dạng cũ
+        conn.exec_driver_sql("UPDATE users SET password = ? WHERE login LIKE 'seed%' AND id % 2 = 0", (legacy,))
+        logins = [row[0] for row in conn.exec_driver_sql("SELECT login FROM users WHERE login LIKE 'seed%' ORDER BY id")]
+    counter = SqlCounter(engine)
+    port = free_port()
+    server, thread = start_server(app, port)
+    clients = [Client(port) for _ in range(args.concurrency)]
+
+    def do_login(client, i):
+        login = logins[(id(client) + i) % len(logins)]
+        return client.request("POST", "/login", f"login={login}&password={SEED_PASSWORD}")
+
+    stop = threading.Event()
+    probe_latencies = []
+    probe_thread = threading.Thread(target=probe, args=(port, stop, probe_latencies), daemon=True)
+    results = {}
+    try:
+        probe_thread.start()
+        start = time.perf_counter()
+        # 503 (hàng đợi đầy) được tính riêng, không coi là lỗi
+        results["POST /login"] = run_phase("POST /login", clients, do_login, args.requests, counter, (303, 503))
+        probe_elapsed = time.perf_counter() - start
+        stop.set()
+        probe_thread.join()
+        results["GET /metrics (trong lúc đăng nhập)"] = summarize(probe_latencies, probe_elapsed)
+    finally:
+        for client in clients:
+            client.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    pool_stats = app.state.password_pool.stats()
+    with engine.connect() as conn:
+        remaining = conn.exec_driver_sql("SELECT COUNT(*) FROM users WHERE password NOT LIKE 'scrypt$%'").scalar()
+    results["POST /login"]["rejected_503"] = pool_stats["rejected_total"]
+    results["POST /login"]["legacy_hashes_left"] = remaining
+    print_results(results)
+    print(f"Pool băm mật khẩu: {pool_stats['workers']} thread, chờ trung bình "
+          f"{pool_stats['wait_seconds_total'] / max(pool_stats['completed_total'], 1) * 1000:.1f}ms, "
+          f"băm trung bình {pool_stats['run_seconds_total'] / max(pool_stats['completed_total'], 1) * 1000:.1f}ms")
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "login", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# Đo chi phí của bộ lập lịch nhắc việc (models/reminders.py) trên database có nhiều công việc đang chờ:
+# - resync: nạp cửa sổ công việc sắp đến hạn (truy vấn theo khoảng trên index ix_todos_due_open + dựng heap),
+#   kèm số dòng nạp được và bộ nhớ của heap.
+# - todo_changed: cập nhật heap khi một công việc được sửa hạn chót (thao tác của route ghi).
+# - tick: mô phỏng đồng hồ chạy hết cửa sổ theo từng bước --tick-seconds, đo mỗi lần lấy các nhắc việc đến hạn.
+#   Chi phí mỗi tick chỉ phụ thuộc số nhắc việc đến hạn trong tick đó, không phụ thuộc tổng số công việc.
+# Dữ liệu sinh bởi models.seed.seed_database: hạn chót trải đều từ 60 ngày trước tới 120 ngày sau.
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.reminders --users 1000 --todos 1000 --output bench_reminders.json   # 1 triệu công việc
+#   python -m bench.reminders --compare bench_reminders.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import random  # Chọn công việc để sửa hạn chót
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import time  # Đo thời gian
+import tracemalloc  # Đo bộ nhớ của heap
+from datetime import datetime, timedelta  # Mô phỏng đồng hồ
+from types import SimpleNamespace  # Công việc giả cho todo_changed
+from bench.common import compare_results, print_results, summarize, write_results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo chi phí bộ lập lịch nhắc việc")
+    parser.add_argument("--users", type=int, default=200, help="Số user được tạo")
+    parser.add_argument("--todos", type=int, default=1000, help="Số công việc của mỗi user")
+    parser.add_argument("--horizon-hours", type=float, default=24, help="Độ dài cửa sổ nhắc việc (giờ)")
+    parser.add_argument("--resyncs", type=int, default=5, help="Số lần đo resync")
+    parser.add_argument("--changes", type=int, default=100_000, help="Số lần gọi todo_changed")
+    parser.add_argument("--tick-seconds", type=float, default=60, help="Bước thời gian mô phỏng của mỗi tick")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    from models import ReminderScheduler, make_engine, migrate, seed_database
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    engine = make_engine({"url": f"sqlite+pysqlite:///{workdir}/reminders.db", "slow_query_ms": 60_000})
+    migrate(engine)
+    seed_database(engine, args.users, args.todos, 0, log=None)
+    with engine.connect() as conn:
+        pending = conn.exec_driver_sql("SELECT COUNT(*) FROM todos WHERE status != 'completed'").scalar()
+    print(f"Dữ liệu: {args.users * args.todos} công việc ({pending} chưa hoàn thành), cửa sổ {args.horizon_hours} giờ")
+
+    horizon = timedelta(hours=args.horizon_hours)
+    start = datetime.now()
+    results = {}
+
+    # resync: lần đầu đo cả bộ nhớ của heap
+    latencies = []
+    heap_mb = 0.0
+    for i in range(args.resyncs):
+        scheduler = ReminderScheduler(engine, horizon)
+        if i == 0:
+            tracemalloc.start()
+        began = time.perf_counter()
+        scheduled = scheduler.resync(start)
+        latencies.append(time.perf_counter() - began)
+        if i == 0:
+            heap_mb = tracemalloc.get_traced_memory()[0] / 1e6
+            tracemalloc.stop()
+    results["resync"] = summarize(latencies, sum(latencies), scheduled=scheduled, heap_mb=round(heap_mb, 2))
+
+    # todo_changed: dời hạn chót của các công việc ngẫu nhiên trong cửa sổ
+    rng = random.Random(42)
+    todo_ids = list(scheduler._entries)
+    window_seconds = horizon.total_seconds()
+    latencies = []
+    began_all = time.perf_counter()
+    for _ in range(args.changes):
+        todo = SimpleNamespace(id=rng.choice(todo_ids), user_id=1, title="x", status="pending",
+                               due_date=start + timedelta(seconds=rng.uniform(0, window_seconds)))
+        began = time.perf_counter()
+        scheduler.todo_changed(todo)
+        latencies.append(time.perf_counter() - began)
+    results["todo_changed"] = summarize(latencies, time.perf_counter() - began_all, scheduled=scheduler.scheduled_count())
+
+    # tick: cho đồng hồ chạy hết cửa sổ, mỗi tick lấy các nhắc việc đến hạn
+    latencies = []
+    fired = max_fired = 0
+    now = start
+    began_all = time.perf_counter()
+    while now < start + horizon:
+        now += timedelta(seconds=args.tick_seconds)
+        began = time.perf_counter()
+        batch = scheduler.pop_due(now)
+        latencies.append(time.perf_counter() - began)
+        fired += len(batch)
+        max_fired = max(max_fired, len(batch))
+    results["tick"] = summarize(latencies, time.perf_counter() - began_all, fired=fired, max_fired_per_tick=max_fired)
+
+    print_results(results)
+    engine.dispose()
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "reminders", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# Đo renderer nhanh của danh sách công việc (views/Home/rows.py) so với cách render bằng FT
+# (views/Home/index.py: todo_item -> FH.Li -> FH.to_xml) trên một user có nhiều công việc (mặc định 10 nghìn).
+# Việc HTML của hai cách giống nhau từng byte được kiểm tra bằng pytest (tests/test_rows.py).
+# Đo thời gian (mỗi thao tác --repeat lần; riêng nạp/render toàn bộ danh sách bằng FT --ft-repeat lần vì FH.to_xml
+# của một thẻ Ul rất nhiều con chậm hơn tuyến tính: khoảng 1 giây cho 1 nghìn, 20 giây cho 10 nghìn công việc):
+# - ft_render / fast_render: chỉ render toàn bộ danh sách từ dữ liệu đã nạp (fast_render kèm bộ nhớ cấp phát lớn nhất);
+# - ft_full / fast_full: nạp + render toàn bộ danh sách (load_user_todos + FT, iter_todo_row_pages + renderer nhanh);
+# - ft_first_page / fast_first_page: nạp + render trang đầu (đường đi của trang chủ khi cache trống).
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.render --todos 10000 --output bench_render.json
+#   python -m bench.render --compare bench_render.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import time  # Đo thời gian
+import tracemalloc  # Đo bộ nhớ cấp phát khi render
+from bench.common import compare_results, print_results, summarize, write_results
+
+def _measure(func, repeat: int) -> tuple[list[float], object]:
+    # Gọi func() repeat lần, trả về (độ trễ từng lần, kết quả lần cuối)
+    latencies = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - began)
+    return latencies, result
+
+def _peak_mb(func) -> float:
+    # Bộ nhớ cấp phát lớn nhất (MB) trong lúc chạy func()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 1e6, 2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo renderer nhanh của danh sách công việc")
+    parser.add_argument("--todos", type=int, default=10_000, help="Số công việc của user được đo")
+    parser.add_argument("--tags", type=int, default=20, help="Số nhãn")
+    parser.add_argument("--tags-per-todo", type=int, default=3, help="Số nhãn tối đa của mỗi công việc")
+    parser.add_argument("--repeat", type=int, default=10, help="Số lần đo mỗi thao tác")
+    parser.add_argument("--ft-repeat", type=int, default=1, help="Số lần đo nạp/render toàn bộ danh sách bằng FT")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    from fasthtml import common as FH
+    from sqlalchemy.orm import Session
+    from models import (configure_data_versions, iter_todo_row_pages, load_todo_page, load_todo_rows, load_user_todos,
+                        make_engine, migrate, seed_database)
+    from views import Home
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    engine = make_engine({"url": f"sqlite+pysqlite:///{workdir}/render.db", "slow_query_ms": 60_000})
+    migrate(engine)
+    configure_data_versions(engine)
+    seed_database(engine, 1, args.todos, args.tags, tags_per_todo=args.tags_per_todo, log=None)
+    with engine.connect() as conn:
+        user_id = conn.exec_driver_sql("SELECT MIN(id) FROM users").scalar()
+    print(f"Dữ liệu: 1 user, {args.todos} công việc, {args.tags} nhãn")
+
+    def sort_key(todo):
+        # Cùng thứ tự với phân trang keyset: due_date NULL đứng trước, rồi theo (due_date, id)
+        return (todo.due_date is not None, todo.due_date or 0, todo.id)
+
+    with Session(engine) as db:
+        all_todos = sorted(load_user_todos(db, user_id), key=sort_key)
+    all_rows = [row for rows in iter_todo_row_pages(engine, user_id) for row in rows]
+
+    # --- Đo thời gian ---
+    results = {}
+    latencies, _ = _measure(lambda: FH.to_xml(Home.todo_list(all_todos)), args.ft_repeat)
+    results["ft_render"] = summarize(latencies, sum(latencies), todos=len(all_todos))
+    latencies, _ = _measure(lambda: Home.todo_list_html(all_rows), args.repeat)
+    results["fast_render"] = summarize(latencies, sum(latencies), todos=len(all_rows),
+                                       peak_mb=_peak_mb(lambda: Home.todo_list_html(all_rows)))
+
+    def ft_full():
+        with Session(engine) as db:
+            return FH.to_xml(Home.todo_list(sorted(load_user_todos(db, user_id), key=sort_key)))
+
+    def fast_full():
+        # Như GET /todos/all: đọc và render từng trang, chỉ giữ phần đang gửi
+        size = 0
+        for chunk in Home.iter_todo_list_html(iter_todo_row_pages(engine, user_id)):
+            size += len(chunk)
+        return size
+
+    latencies, _ = _measure(ft_full, args.ft_repeat)
+    results["ft_full"] = summarize(latencies, sum(latencies))
+    latencies, _ = _measure(fast_full, args.repeat)
+    results["fast_full"] = summarize(latencies, sum(latencies), peak_mb=_peak_mb(fast_full))
+
+    def ft_first_page():
+        with Session(engine) as db:
+            todos, next_cursor = load_todo_page(db, user_id)
+            return FH.to_xml(Home.todo_list(todos, next_cursor))
+
+    def fast_first_page():
+        with Session(engine) as db:
+            rows, next_cursor = load_todo_rows(db, user_id)
+        return Home.todo_list_html(rows, next_cursor)
+
+    repeat = args.repeat * 20
+    latencies, _ = _measure(ft_first_page, repeat)
+    results["ft_first_page"] = summarize(latencies, sum(latencies))
+    latencies, _ = _measure(fast_first_page, repeat)
+    results["fast_first_page"] = summarize(latencies, sum(latencies))
+
+    print_results(results)
+    for name in ("render", "full", "first_page"):
+        speedup = results[f"ft_{name}"]["p50_ms"] / max(results[f"fast_{name}"]["p50_ms"], 1e-9)
+        print(f"{name}: renderer nhanh nhanh hơn {speedup:.1f}x (p50)")
+    engine.dispose()
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "render", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# Đo chi phí khởi động của ứng dụng web, mỗi lần đo trong một tiến trình Python mới:
+# - import: thời gian "import webapp" (phải gần như bằng 0 vì mọi import nặng nằm trong create_app).
+# - create_app: thời gian gọi create_app() (import FastHTML/SQLAlchemy/models/views, tạo engine, kiểm tra migration).
+# - first_request: thời gian xử lý request đầu tiên (GET /metrics) qua giao diện ASGI, không cần mạng.
+# - process: tổng thời gian từ lúc chạy tiến trình tới khi có response đầu tiên (kể cả khởi động trình thông dịch).
+# Kết quả (p50/p95 của các lần đo) được ghi ra file JSON để so sánh giữa các phiên bản.
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.startup --runs 10 --output bench_startup.json
+#   python -m bench.startup --compare bench_startup.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import json  # Đọc kết quả từ tiến trình con
+import os  # Đường dẫn thư mục dự án
+import subprocess  # Chạy tiến trình Python mới cho mỗi lần đo
+import sys  # Đường dẫn trình thông dịch, mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import time  # Đo thời gian
+from bench.common import compare_results, print_results, summarize, write_results
+
+# Mã chạy trong tiến trình con: in ra một dòng JSON chứa các mốc thời gian (giây)
+_CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import webapp
+t1 = time.perf_counter()
+app = webapp.create_app({"db": {"url": sys.argv[1]}})
+t2 = time.perf_counter()
+
+async def first_request():
+    scope = {"type": "http", "http_version": "1.1", "method": "GET", "path": "/metrics", "raw_path": b"/metrics",
+             "root_path": "", "scheme": "http", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1),
+             "server": ("127.0.0.1", 80)}
+    status = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+    await app(scope, receive, send)
+    return status[0]
+
+status = asyncio.run(first_request())
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "first_request": t3 - t2, "status": status}))
+"""
+
+def run_once(db_url: str) -> dict:
+    """Khởi động ứng dụng trong một tiến trình mới, trả về các mốc thời gian (giây) của lần chạy đó."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", _CHILD, db_url], cwd=root, capture_output=True, text=True, check=True).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - start
+    return timings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thời gian import và khởi động ứng dụng")
+    parser.add_argument("--runs", type=int, default=10, help="Số lần khởi động")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    db_url = f"sqlite+pysqlite:///{workdir}/startup.db"
+    # Lần chạy đầu tạo database và áp dụng migration; không tính vào kết quả
+    cold = run_once(db_url)
+    print(f"Lần đầu (có migration): create_app={cold['create_app'] * 1000:.1f}ms, process={cold['process'] * 1000:.1f}ms")
+
+    samples = {"import": [], "create_app": [], "first_request": [], "process": []}
+    errors = 0
+    for _ in range(args.runs):
+        timings = run_once(db_url)
+        errors += timings["status"] != 200
+        for name in samples:
+            samples[name].append(timings[name])
+
+    # Các lần khởi động chạy nối tiếp nên "elapsed" là tổng thời gian của từng giai đoạn
+    results = {name: summarize(values, sum(values), errors=errors) for name, values in samples.items()}
+    print_results(results)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "startup", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
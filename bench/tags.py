@@ -0,0 +1,121 @@
+# Đo chỉ mục nhãn trong bộ nhớ (models/tag_index.py) trên database có nhiều nhãn:
+# - load: nạp toàn bộ chỉ mục (một truy vấn + sắp xếp), kèm bộ nhớ của chỉ mục.
+# - name: tra tên nhãn theo id (thao tác của todo_item khi render danh sách công việc).
+# - prefix: gợi ý theo tiền tố 1-3 ký tự (thao tác của GET /tags/suggest), so với cùng truy vấn
+#   LIKE 'tiền tố%' trên bảng tags (sql_prefix).
+# - sync: kiểm tra phiên bản khi bảng tags chưa đổi (sync_unchanged) và nạp thêm một nhãn mới (sync_new_tag).
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.tags --tags 100000 --output bench_tags.json
+#   python -m bench.tags --compare bench_tags.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import random  # Chọn id/tiền tố ngẫu nhiên
+import string  # Bảng chữ cái cho tiền tố
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import time  # Đo thời gian
+import tracemalloc  # Đo bộ nhớ của chỉ mục
+from datetime import datetime  # Thời điểm tạo nhãn mới
+from bench.common import compare_results, print_results, summarize, write_results
+
+def _measure(func, values) -> tuple[list[float], float]:
+    # Gọi func(value) với từng value, trả về (độ trễ từng lần, tổng thời gian)
+    latencies = []
+    began_all = time.perf_counter()
+    for value in values:
+        began = time.perf_counter()
+        func(value)
+        latencies.append(time.perf_counter() - began)
+    return latencies, time.perf_counter() - began_all
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo chỉ mục nhãn trong bộ nhớ")
+    parser.add_argument("--tags", type=int, default=100_000, help="Số nhãn được tạo")
+    parser.add_argument("--loads", type=int, default=5, help="Số lần đo nạp toàn bộ chỉ mục")
+    parser.add_argument("--lookups", type=int, default=100_000, help="Số lần tra tên theo id")
+    parser.add_argument("--prefixes", type=int, default=10_000, help="Số lần gợi ý theo tiền tố")
+    parser.add_argument("--syncs", type=int, default=200, help="Số lần đo sync")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    from sqlalchemy import text
+    from models import TagIndex, configure_data_versions, make_engine, migrate
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    engine = make_engine({"url": f"sqlite+pysqlite:///{workdir}/tags.db", "slow_query_ms": 60_000})
+    migrate(engine)
+    configure_data_versions(engine)
+    rng = random.Random(42)
+    now = datetime.now()
+    # Tên nhãn ngẫu nhiên 3-12 chữ cái (có cả chữ có dấu), để tiền tố ngắn khớp nhiều nhãn
+    letters = string.ascii_lowercase + "ăâđêôơư"
+    names = {"".join(rng.choice(letters) for _ in range(rng.randint(3, 12))) for _ in range(args.tags)}
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO tags (name, created_at, updated_at, is_deleted) VALUES (:name, :now, :now, 0)"),
+                     [{"name": name, "now": now} for name in names])
+    print(f"Dữ liệu: {len(names)} nhãn")
+    results = {}
+
+    # load: lần đầu đo cả bộ nhớ của chỉ mục
+    latencies = []
+    index_mb = 0.0
+    for i in range(args.loads):
+        index = TagIndex()
+        if i == 0:
+            tracemalloc.start()
+        with engine.connect() as conn:
+            began = time.perf_counter()
+            index.sync(conn)
+            latencies.append(time.perf_counter() - began)
+        if i == 0:
+            index_mb = tracemalloc.get_traced_memory()[0] / 1e6
+            tracemalloc.stop()
+    results["load"] = summarize(latencies, sum(latencies), size=len(index), index_mb=round(index_mb, 2))
+
+    tag_ids = list(index._names)
+    results["name"] = summarize(*_measure(index.name, [rng.choice(tag_ids) for _ in range(args.lookups)]))
+
+    prefixes = ["".join(rng.choice(letters) for _ in range(rng.randint(1, 3))) for _ in range(args.prefixes)]
+    found = []
+    latencies, elapsed = _measure(lambda prefix: found.append(len(index.search_prefix(prefix))), prefixes)
+    results["prefix"] = summarize(latencies, elapsed, mean_results=round(sum(found) / len(found), 2))
+
+    # Cùng gợi ý bằng truy vấn LIKE (không phân biệt dấu như chỉ mục, chỉ để so sánh thời gian)
+    like = text("SELECT id, name FROM tags WHERE is_deleted = 0 AND name LIKE :prefix || '%' ORDER BY name LIMIT 10")
+    with engine.connect() as conn:
+        latencies, elapsed = _measure(lambda prefix: conn.execute(like, {"prefix": prefix}).all(), prefixes[:1000])
+    results["sql_prefix"] = summarize(latencies, elapsed)
+
+    with engine.connect() as conn:
+        results["sync_unchanged"] = summarize(*_measure(lambda _: index.sync(conn), range(args.syncs)))
+
+    # Mỗi lần: tạo một nhãn mới (trigger tăng phiên bản chung) rồi đo sync nạp thêm nhãn đó
+    insert = text("INSERT INTO tags (name, created_at, updated_at, is_deleted) VALUES (:name, :now, :now, 0)")
+    latencies = []
+    for i in range(args.syncs):
+        with engine.begin() as conn:
+            conn.execute(insert, {"name": f"bench-new-{i}", "now": datetime.now()})
+        with engine.connect() as conn:
+            began = time.perf_counter()
+            index.sync(conn)
+            latencies.append(time.perf_counter() - began)
+    results["sync_new_tag"] = summarize(latencies, sum(latencies), reloads=index.reloads, refreshes=index.refreshes)
+
+    print_results(results)
+    engine.dispose()
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "tags", config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
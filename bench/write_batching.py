@@ -0,0 +1,154 @@
+# So sánh các route ghi công việc khi ghi từng transaction riêng và khi ghi theo lô (models/write_batcher.py).
+# - Chạy cùng một bộ pha đo hai lần: write_batching=False và write_batching=True, mỗi lần với database/server riêng.
+# - Mỗi client đăng nhập bằng một user khác nhau và chỉ ghi công việc của chính user đó.
+# - Các pha: đặt trạng thái (POST /todos/{id}/status?status=...), tạo công việc (POST /todos)
+#   và gắn nhãn (POST /todos/{id}/tags).
+# - Pha đặt trạng thái kiểm tra read-your-writes: thẻ Li trả về (đọc lại sau khi ghi) và GET /todos/{id}
+#   ngay sau đó phải hiện đúng trạng thái vừa đặt; số lần sai được ghi ở cột stale.
+# - Chế độ theo lô báo thêm số lô, kích thước lô trung bình/lớn nhất (theo bucket) và thời gian chờ trung bình trong hàng đợi.
+# - --query-delay-ms thêm độ trễ vào mỗi câu lệnh SQL (giả lập ổ đĩa chậm), khi đó tranh chấp khóa ghi rõ hơn.
+#
+# Cách dùng (từ thư mục gốc của dự án):
+#   python -m bench.write_batching --concurrency 16 --requests 30 --output bench_write_batching.json
+#   python -m bench.write_batching --compare bench_write_batching.json   # Báo lỗi (mã thoát 1) nếu p95 chậm đi quá 10%
+
+import argparse  # Tham số dòng lệnh
+import sys  # Mã thoát
+import tempfile  # Thư mục tạm chứa database đo
+import threading  # Đếm số lần đọc sai an toàn giữa các client
+import time  # Đo thời gian
+from bench.app import Client, SqlCounter, free_port, run_phase, start_server
+from bench.async_db import add_query_delay
+from bench.common import compare_results, print_results, write_results
+
+def request_body(client: Client, method: str, path: str, body: str | None = None) -> tuple[int, float, str]:
+    """Như Client.request nhưng trả về cả nội dung response: (mã trạng thái, độ trễ, nội dung)."""
+    headers = {"Cookie": "; ".join(f"{k}={v}" for k, v in client.cookies.items()), "HX-Request": "true"}
+    if body is not None:
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    start = time.perf_counter()
+    client.conn.request(method, path, body=body, headers=headers)
+    response = client.conn.getresponse()
+    text = response.read().decode()
+    return response.status, time.perf_counter() - start, text
+
+def run_mode(write_batching: bool, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="todo-bench-")
+    from webapp import create_app
+    app = create_app({"db": {"url": f"sqlite+pysqlite:///{workdir}/bench.db", "slow_query_ms": 60_000},
+                      "write_batching": write_batching, "write_batch_window_ms": args.window_ms, "reminders": False})
+    engine = app.state.engine
+
+    from models.seed import SEED_PASSWORD, seed_database
+    seed_database(engine, args.concurrency, args.todos, args.tags, log=None)
+    with engine.connect() as conn:
+        users = conn.exec_driver_sql("SELECT id, login FROM users WHERE login LIKE 'seed%' ORDER BY id").all()
+        todo_ids = {user_id: [row[0] for row in conn.exec_driver_sql(
+            "SELECT id FROM todos WHERE user_id = ? ORDER BY id", (user_id,))] for user_id, _ in users}
+    if args.query_delay_ms:
+        add_query_delay(engine, args.query_delay_ms / 1000)
+    counter = SqlCounter(engine)
+    port = free_port()
+    server, thread = start_server(app, port)
+    clients = [Client(port) for _ in users]
+    owned = {}  # client -> id các công việc của user đăng nhập
+    for client, (user_id, login) in zip(clients, users):
+        client.request("POST", "/login", f"login={login}&password={SEED_PASSWORD}")
+        owned[id(client)] = todo_ids[user_id]
+    stale = 0
+    lock = threading.Lock()
+
+    def do_status(client, i):
+        nonlocal stale
+        todos = owned[id(client)]
+        todo_id = todos[i % len(todos)]
+        status = ("pending", "in_progress", "completed")[(i // len(todos)) % 3]
+        code, elapsed, body = request_body(client, "POST", f"/todos/{todo_id}/status?status={status}")
+        # Đọc lại ngay (không tính giờ): phải thấy trạng thái vừa đặt
+        _, _, again = request_body(client, "GET", f"/todos/{todo_id}")
+        expected = f"Trạng thái: {status} "
+        if expected not in body or expected not in again:
+            with lock:
+                stale += 1
+        return code, elapsed
+
+    def do_create(client, i):
+        return request_body(client, "POST", "/todos", f"title=Bench+{i}&priority=2&tags=bench")[:2]
+
+    def do_tag(client, i):
+        todos = owned[id(client)]
+        return request_body(client, "POST", f"/todos/{todos[i % len(todos)]}/tags", f"name=bench-{i % 5}")[:2]
+
+    results = {}
+    try:
+        results["POST /todos/{id}/status"] = run_phase("status", clients, do_status, args.requests, counter, (200,))
+        results["POST /todos/{id}/status"]["stale"] = stale
+        results["POST /todos"] = run_phase("create", clients, do_create, args.requests, counter, (200,))
+        results["POST /todos/{id}/tags"] = run_phase("tags", clients, do_tag, args.requests, counter, (200,))
+    finally:
+        for client in clients:
+            client.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        engine.dispose()
+    batcher = app.state.write_batcher
+    if batcher is not None:
+        from models.write_batcher import BATCH_SIZE_BUCKETS
+        stats = batcher.stats()
+        largest = max((i for i, count in enumerate(stats["batch_sizes"]) if count), default=0)
+        batches = max(stats["batches_total"], 1)
+        results["write_batcher"] = {
+            "batches": stats["batches_total"],
+            "writes": stats["writes_total"],
+            "mean_batch_size": round(stats["writes_total"] / batches, 2),
+            "max_batch_size_bucket": (BATCH_SIZE_BUCKETS + ("+Inf",))[largest],
+            "mean_queue_wait_ms": round(stats["queue_wait_seconds_total"] / max(stats["submitted_total"], 1) * 1000, 3),
+            "rejected": stats["rejected_total"],
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh route ghi công việc khi ghi từng transaction và ghi theo lô")
+    parser.add_argument("--todos", type=int, default=50, help="Số công việc của mỗi user")
+    parser.add_argument("--tags", type=int, default=20, help="Số nhãn")
+    parser.add_argument("--concurrency", type=int, default=16, help="Số client đồng thời (mỗi client một user)")
+    parser.add_argument("--requests", type=int, default=30, help="Số request mỗi client trong mỗi pha")
+    parser.add_argument("--window-ms", type=float, default=2, help="Cửa sổ gom lô của thread ghi (ms)")
+    parser.add_argument("--query-delay-ms", type=float, default=0.0, help="Độ trễ thêm vào mỗi câu lệnh SQL (ms)")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--compare", help="So sánh với file kết quả JSON của lần đo trước")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tỷ lệ chậm đi tối đa cho phép của p95")
+    args = parser.parse_args(argv)
+
+    print(f"Dữ liệu: {args.concurrency} user x {args.todos} công việc, {args.tags} nhãn; "
+          f"{args.concurrency} client, cửa sổ {args.window_ms}ms, độ trễ SQL {args.query_delay_ms}ms")
+    results = {}
+    for write_batching, label in ((False, "từng transaction"), (True, "theo lô")):
+        for phase, result in run_mode(write_batching, args).items():
+            results[f"{phase} [{label}]"] = result
+    batch_stats = results.pop("write_batcher [theo lô]")
+    print_results(results)
+    print(f"Thread ghi theo lô: {batch_stats}")
+    for phase in ("POST /todos/{id}/status", "POST /todos", "POST /todos/{id}/tags"):
+        single_rps = results[f"{phase} [từng transaction]"]["throughput_per_s"]
+        batched_rps = results[f"{phase} [theo lô]"]["throughput_per_s"]
+        print(f"{phase}: theo lô / từng transaction = {batched_rps / max(single_rps, 1e-9):.2f}x")
+    stale = sum(result.get("stale", 0) for result in results.values())
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    if args.output:
+        write_results(args.output, "write_batching", config, {**results, "write_batcher": batch_stats})
+    if stale:
+        print(f"Đọc lại không thấy dữ liệu vừa ghi: {stale} lần")
+        return 1
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print("Phát hiện chậm đi:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# Công cụ dòng lệnh cho ứng dụng Todo
+# Cách dùng:
+#   python cli.py migrate [--check]   # Áp dụng migration schema (và kiểm tra index nếu có --check)
+#   python cli.py import --user john --format csv todos.csv    # Nhập hàng loạt công việc ("-" để đọc từ stdin)
+#   python cli.py export --user john --format jsonl > todos.jsonl  # Xuất công việc ra stdout (hoặc --output FILE)
+#   python cli.py reconcile-stats [--dry-run]   # Tính lại bảng thống kê từ đầu và báo sai lệch
+#   python cli.py seed --users 100000 --todos 100 --tags 1000 [--reset]  # Sinh dữ liệu giả lập kích thước lớn
+#   python cli.py purge --retention-days 30 --batch-size 500   # Xóa hẳn các dòng đã xóa mềm quá thời gian lưu giữ
+# Cấu hình database được đọc từ biến môi trường TODO_DB_* (xem models/engine.py).
+
+import argparse  # Phân tích tham số dòng lệnh
+import sys  # Để trả mã thoát
+
+def cmd_migrate(args):
+    """Áp dụng các migration còn thiếu; với --check thì kiểm tra các truy vấn chính có dùng index."""
+    from models import make_engine, migrate
+    from models.migrations import check_query_plans
+    engine = make_engine()
+    applied = migrate(engine)
+    print(f"Đã áp dụng {len(applied)} migration.")
+    if args.check:
+        problems = check_query_plans(engine)
+        if problems:
+            print("Các truy vấn không dùng index:")
+            for problem in problems:
+                print(f"    {problem}")
+            return 1
+        print("Tất cả truy vấn chính đều dùng index.")
+    return 0
+
+def _find_user_id(engine, login: str) -> int | None:
+    # Tìm id của user theo tên đăng nhập
+    from sqlalchemy import select
+    from models import User
+    with engine.connect() as conn:
+        return conn.execute(select(User.id).where(User.login == login)).scalar()
+
+def cmd_import(args):
+    """Nhập hàng loạt công việc cho một user từ file CSV/JSONL."""
+    from models import make_engine, migrate
+    from models.todo_io import TodoImportError, import_todos, iter_records
+    engine = make_engine()
+    migrate(engine)
+    user_id = _find_user_id(engine, args.user)
+    if user_id is None:
+        print(f"Không tìm thấy user: {args.user}")
+        return 1
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8-sig", newline="")
+    with source:
+        try:
+            stats = import_todos(engine, user_id, iter_records(source, args.format), chunk_size=args.chunk_size)
+        except TodoImportError as e:
+            print(f"Dữ liệu không hợp lệ: {e} (đã nhập {e.stats['todos']} công việc trước khi gặp lỗi)")
+            return 1
+    print(f"Đã nhập {stats['todos']} công việc, tạo {stats['tags_created']} nhãn mới, "
+          f"gán {stats['links']} nhãn, bỏ qua {stats['skipped']} dòng không hợp lệ.")
+    return 0
+
+def cmd_export(args):
+    """Xuất toàn bộ công việc của một user ra file CSV/JSONL (hoặc stdout)."""
+    from models import make_engine
+    from models.todo_io import iter_export_lines
+    engine = make_engine()
+    user_id = _find_user_id(engine, args.user)
+    if user_id is None:
+        print(f"Không tìm thấy user: {args.user}", file=sys.stderr)
+        return 1
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    with target:
+        target.writelines(iter_export_lines(engine, user_id, args.format))
+    return 0
+
+def cmd_reconcile_stats(args):
+    """Tính lại bảng thống kê từ dữ liệu gốc, in các sai lệch và sửa lại (trừ khi --dry-run)."""
+    from models import make_engine, migrate, reconcile_stats
+    engine = make_engine()
+    migrate(engine)
+    drift = reconcile_stats(engine, fix=not args.dry_run)
+    for (user_id, status), stored, expected in drift["users"]:
+        print(f"user {user_id} [{status}]: đang lưu {stored}, đúng là {expected}")
+    for tag_id, stored, expected in drift["tags"]:
+        print(f"tag {tag_id}: đang lưu {stored}, đúng là {expected}")
+    total = len(drift["users"]) + len(drift["tags"])
+    if not total:
+        print("Không có sai lệch.")
+    elif not args.dry_run:
+        print(f"Đã sửa {total} sai lệch.")
+    # Với --dry-run, trả mã lỗi khi có sai lệch để dùng được trong job giám sát
+    return 1 if total and args.dry_run else 0
+
+def cmd_seed(args):
+    """Sinh dữ liệu giả lập kích thước lớn (với --reset: xóa và tạo lại database trước)."""
+    from models import ini_db, make_engine, migrate, seed_database
+    engine = make_engine()
+    if args.reset:
+        ini_db(engine, users=args.users, todos_per_user=args.todos, tags=args.tags, tags_per_todo=args.tags_per_todo, seed=args.seed)
+    else:
+        migrate(engine)
+        seed_database(engine, args.users, args.todos, args.tags, tags_per_todo=args.tags_per_todo, seed=args.seed, batch_size=args.batch_size)
+    return 0
+
+def cmd_purge(args):
+    """Xóa hẳn các dòng đã xóa mềm quá thời gian lưu giữ, theo từng lô nhỏ."""
+    from datetime import timedelta
+    from models import make_engine, migrate, purge_deleted
+    engine = make_engine()
+    migrate(engine)
+    counts = purge_deleted(engine, timedelta(days=args.retention_days), args.batch_size, args.pause)
+    print(f"Đã xóa hẳn {counts['todos']} công việc, {counts['todo_tags']} liên kết nhãn, {counts['tags']} nhãn, "
+          f"{counts['users']} user trong {counts['batches']} lô.")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Tạo bộ phân tích tham số với các lệnh con."""
+    parser = argparse.ArgumentParser(description="Công cụ dòng lệnh cho ứng dụng Todo")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Áp dụng migration schema")
+    migrate_parser.add_argument("--check", action="store_true", help="Kiểm tra EXPLAIN QUERY PLAN của các truy vấn chính")
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    import_parser = commands.add_parser("import", help="Nhập hàng loạt công việc từ CSV/JSONL")
+    import_parser.add_argument("file", help='Đường dẫn file dữ liệu ("-" để đọc từ stdin)')
+    import_parser.add_argument("--user", required=True, help="Tên đăng nhập của chủ sở hữu công việc")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    import_parser.add_argument("--chunk-size", type=int, default=5000, help="Số dòng ghi trong mỗi transaction")
+    import_parser.set_defaults(func=cmd_import)
+
+    export_parser = commands.add_parser("export", help="Xuất công việc ra CSV/JSONL")
+    export_parser.add_argument("--user", required=True, help="Tên đăng nhập của chủ sở hữu công việc")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    export_parser.add_argument("--output", default="-", help='File đích ("-" để ghi ra stdout)')
+    export_parser.set_defaults(func=cmd_export)
+
+    reconcile_parser = commands.add_parser("reconcile-stats", help="Đối soát bảng thống kê với dữ liệu gốc")
+    reconcile_parser.add_argument("--dry-run", action="store_true", help="Chỉ báo sai lệch, không sửa")
+    reconcile_parser.set_defaults(func=cmd_reconcile_stats)
+
+    seed_parser = commands.add_parser("seed", help="Sinh dữ liệu giả lập kích thước lớn")
+    seed_parser.add_argument("--users", type=int, default=1000, help="Số user")
+    seed_parser.add_argument("--todos", type=int, default=100, help="Số công việc của mỗi user")
+    seed_parser.add_argument("--tags", type=int, default=100, help="Số nhãn")
+    seed_parser.add_argument("--tags-per-todo", type=int, default=2, help="Số nhãn tối đa của mỗi công việc")
+    seed_parser.add_argument("--seed", type=int, default=42, help="Hạt giống ngẫu nhiên")
+    seed_parser.add_argument("--batch-size", type=int, default=200_000, help="Số dòng trong mỗi transaction")
+    seed_parser.add_argument("--reset", action="store_true", help="Xóa và tạo lại database (kèm dữ liệu mẫu) trước khi sinh")
+    seed_parser.set_defaults(func=cmd_seed)
+
+    purge_parser = commands.add_parser("purge", help="Xóa hẳn các dòng đã xóa mềm quá thời gian lưu giữ")
+    purge_parser.add_argument("--retention-days", type=float, default=30, help="Số ngày lưu giữ dòng đã xóa mềm")
+    purge_parser.add_argument("--batch-size", type=int, default=500, help="Số dòng xóa trong mỗi transaction")
+    purge_parser.add_argument("--pause", type=float, default=0.0, help="Thời gian nghỉ (giây) giữa hai lô")
+    purge_parser.set_defaults(func=cmd_purge)
+
+    return parser
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    sys.exit(args.func(args) or 0)
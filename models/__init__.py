@@ -3,22 +3,49 @@
 # và định nghĩa các hàm, biến có thể truy cập từ package này.
 
 # Import các thư viện và module cần thiết
-import hashlib  # Thư viện để băm mật khẩu
 from models.model_base import ModelBase  # Import lớp cơ sở cho các model
+from models.soft_delete import live, soft_delete_values, INCLUDE_DELETED  # Bộ lọc xóa mềm cho mọi truy vấn ORM
 from models.todo import Todo  # Import model Todo
 from models.tag import Tag  # Import model Tag
 from models.todo_tag import TodoTag  # Import model TodoTag (bảng trung gian)
 from models.user import User  # Import model User
+from models.engine import make_engine, load_db_config  # Tạo engine SQLite đã cấu hình PRAGMA
+from models.user_cache import UserSnapshot, UserCache, user_cache  # Cache User theo user_id
+from models.data_version import configure_data_versions, get_data_version, get_scope_version, bump_user_version, bump_global_version  # Phiên bản dữ liệu cho cache
+from models.migrations import migrate, stamp, LATEST_VERSION  # Migration schema theo phiên bản
+from models.seed import seed_database  # Sinh dữ liệu giả lập kích thước lớn
+from models.repository import (load_user_with_todos, load_user_todos, load_todo, load_todo_page, load_todo_rows,  # Các hàm truy vấn nạp sẵn dữ liệu
+                               iter_todo_row_pages, TODO_PAGE_SIZE)
+from models.search import search_todos, SEARCH_PAGE_SIZE  # Tìm kiếm toàn văn (FTS5)
+from models.todo_filter import TodoFilter, parse_todo_filter, TAG_MODES  # Bộ lọc danh sách công việc (đẩy xuống SQL)
+from models.stats import get_user_stats, reconcile_stats  # Số liệu thống kê duy trì tăng dần
+from models.passwords import hash_password, verify_password, needs_rehash, PasswordHasherPool, PasswordPoolBusy  # Băm mật khẩu bằng scrypt
+from models.todo_crud import (create_todo, update_todo, set_todo_status, delete_todo, add_todo_tag,  # Ghi một công việc (route HTMX)
+                              remove_todo_tag, clean_todo_values, STATUS_CYCLE)
+from models.admin import get_admin_totals, list_users_page, list_tag_usage_page, list_recent_activity, iter_users_csv  # Truy vấn trang quản trị
+from models.purge import purge_deleted, DeletedRowPurger  # Xóa hẳn các dòng đã xóa mềm theo lô
+from models.reminders import Reminder, ReminderScheduler  # Nhắc việc theo hạn chót (min-heap trong bộ nhớ)
+from models.tag_index import TagIndex, tag_index, fold_tag_name, TAG_SUGGESTION_LIMIT  # Chỉ mục nhãn trong bộ nhớ (gợi ý theo tiền tố)
+from models.bounded_pool import BoundedPool, PoolBusy  # Pool thread có hàng đợi giới hạn
+from models.db_executor import DbExecutor, DbExecutorBusy, get_data_version_async  # Truy cập database cho route async
+from models.write_batcher import WriteBatcher, WriteBatcherBusy  # Gộp các thao tác ghi thành lô (một transaction)
 from sqlalchemy.orm import Session  # Import Session để tương tác với database
 
-def ini_db(engine):
+def ini_db(engine, users: int = 0, todos_per_user: int = 0, tags: int = 0, tags_per_todo: int = 2, seed: int = 42):
     """
     Hàm này dùng để khởi tạo cơ sở dữ liệu.
     Nó sẽ xóa tất cả các bảng hiện có và tạo lại chúng từ đầu,
     sau đó thêm một số dữ liệu mẫu.
+    Nếu users > 0, sau dữ liệu mẫu sẽ sinh thêm dữ liệu giả lập với kích thước lớn
+    (xem models.seed.seed_database).
 
     Args:
         engine: Đối tượng engine của SQLAlchemy đã được tạo trước đó.
+        users (int): Số user giả lập cần sinh thêm (0 để chỉ tạo dữ liệu mẫu).
+        todos_per_user (int): Số công việc của mỗi user giả lập.
+        tags (int): Số nhãn giả lập.
+        tags_per_todo (int): Số nhãn tối đa của mỗi công việc giả lập.
+        seed (int): Hạt giống ngẫu nhiên để dữ liệu sinh ra luôn giống nhau.
     """
     with engine.begin() as conn:
         # Mở một kết nối đến database
@@ -28,9 +55,10 @@ def ini_db(engine):
         ModelBase.metadata.drop_all(engine)
         print("Đã xóa xong.")
 
-        # Tạo lại tất cả các bảng mới dựa trên các model đã định nghĩa
+        # Tạo lại tất cả các bảng và index bằng cách chạy lại toàn bộ migration từ phiên bản 0
         print("Đang tạo các bảng mới...")
-        ModelBase.metadata.create_all(engine)
+        stamp(engine, 0)
+        migrate(engine)
         print("Đã tạo xong.")
 
         # Bắt đầu thêm dữ liệu mẫu
@@ -75,32 +103,13 @@ def ini_db(engine):
         
         session.commit() # Lưu các mối quan hệ tag-todo
         session.close() # Đóng session sau khi hoàn tất
-        print("Khởi tạo và thêm dữ liệu mẫu cho cơ sở dữ liệu thành công.")
-
-def hash_password(password: str) -> str:
-    """
-    Hàm để băm mật khẩu sử dụng thuật toán SHA256.
-
-    Args:
-        password (str): Mật khẩu ở dạng chuỗi thuần túy (chưa băm).
-
-    Returns:
-        str: Chuỗi hex của mật khẩu đã được băm.
-    """
-    # Mã hóa chuỗi mật khẩu sang UTF-8, sau đó băm bằng SHA256
-    # .hexdigest() để chuyển đổi kết quả băm thành dạng chuỗi hex dễ đọc và lưu trữ
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
-
-def verify_password(stored_password_hash: str, provided_password: str) -> bool:
-    """
-    Hàm để xác thực mật khẩu người dùng cung cấp với mật khẩu đã được băm và lưu trong database.
 
-    Args:
-        stored_password_hash (str): Chuỗi băm mật khẩu lấy từ database.
-        provided_password (str): Mật khẩu người dùng nhập vào (chuỗi thuần túy).
+        # Toàn bộ dữ liệu đã được tạo lại: xóa cache user và làm cũ mọi cache theo phiên bản dữ liệu
+        user_cache.clear()
+        tag_index.clear()
+        bump_global_version(conn)
+        print("Khởi tạo và thêm dữ liệu mẫu cho cơ sở dữ liệu thành công.")
 
-    Returns:
-        bool: True nếu mật khẩu khớp, False nếu không khớp.
-    """
-    # Băm mật khẩu người dùng cung cấp và so sánh với chuỗi băm đã lưu
-    return stored_password_hash == hashlib.sha256(provided_password.encode("utf-8")).hexdigest()
+    # Sinh thêm dữ liệu giả lập (chạy sau khi transaction ở trên đã kết thúc)
+    if users > 0:
+        seed_database(engine, users, todos_per_user, tags, tags_per_todo=tags_per_todo, seed=seed)
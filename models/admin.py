@@ -0,0 +1,165 @@
+# File admin.py trong package models
+# Các truy vấn tổng hợp cho trang quản trị (/admin).
+# - Không nạp collection User.todos: số công việc theo trạng thái lấy từ bảng user_todo_stats (được trigger
+#   duy trì, xem migration 4) bằng MỘT câu GROUP BY cho cả trang.
+# - Phân trang kiểu keyset theo khóa chính (users.id > :after LIMIT n): các user của trang được chọn trước
+#   trong subquery, nên chi phí mỗi trang chỉ phụ thuộc kích thước trang, không phụ thuộc tổng số user
+#   (vẫn nhanh với 100k user, không như OFFSET).
+# - Hoạt động gần nhất của mỗi user là MAX(todos.updated_at), tra bằng index ix_todos_user_updated (migration 6).
+# - Chỉ tính các dòng còn sống (is_deleted = 0): các truy vấn ở đây là SQL thuần, không đi qua bộ lọc xóa mềm
+#   của ORM (models/soft_delete.py).
+# - Xuất CSV đọc theo từng lô keyset, mỗi lô một truy vấn ngắn (không giữ transaction đọc suốt quá trình xuất).
+
+import csv  # Ghi CSV
+import io  # Bộ đệm chuỗi để ghi CSV từng dòng
+from sqlalchemy import text  # Câu lệnh SQL thuần
+
+# Số user trên một trang của bảng quản trị
+ADMIN_PAGE_SIZE = 50
+# Số nhãn trên một trang thống kê nhãn
+TAG_PAGE_SIZE = 50
+# Số user đọc mỗi lần khi xuất CSV
+ADMIN_EXPORT_BATCH_SIZE = 1000
+# Thứ tự cột khi xuất CSV danh sách user
+ADMIN_CSV_FIELDS = ["id", "login", "name", "email", "is_admin", "created_at",
+                    "pending", "in_progress", "completed", "total", "last_activity"]
+
+# Một trang user kèm số công việc theo trạng thái và hoạt động gần nhất
+_USERS_PAGE_SQL = text("""
+    SELECT u.id, u.login, u.name, u.email, u.is_admin, u.created_at,
+           COALESCE(SUM(CASE WHEN s.status = 'pending' THEN s.count END), 0) AS pending,
+           COALESCE(SUM(CASE WHEN s.status = 'in_progress' THEN s.count END), 0) AS in_progress,
+           COALESCE(SUM(CASE WHEN s.status = 'completed' THEN s.count END), 0) AS completed,
+           COALESCE(SUM(s.count), 0) AS total,
+           (SELECT MAX(t.updated_at) FROM todos t WHERE t.user_id = u.id AND t.is_deleted = 0) AS last_activity
+    FROM (SELECT id, login, name, email, is_admin, created_at FROM users
+          WHERE id > :after AND is_deleted = 0 ORDER BY id LIMIT :limit) AS u
+    LEFT JOIN user_todo_stats s ON s.user_id = u.id
+    GROUP BY u.id
+    ORDER BY u.id
+""")
+
+# Một trang nhãn theo số lần dùng giảm dần; con trỏ là (count, tag_id) của dòng cuối trang trước
+_TAGS_PAGE_SQL = text("""
+    SELECT tags.id, tags.name, tag_usage_stats.count
+    FROM tag_usage_stats JOIN tags ON tags.id = tag_usage_stats.tag_id
+    WHERE tag_usage_stats.count > 0
+      AND (:after_count IS NULL OR tag_usage_stats.count < :after_count
+           OR (tag_usage_stats.count = :after_count AND tags.id > :after_id))
+    ORDER BY tag_usage_stats.count DESC, tags.id
+    LIMIT :limit
+""")
+
+# Các công việc được sửa gần đây nhất trên toàn hệ thống (đọc ngược partial index ix_todos_updated_live)
+_RECENT_SQL = text("""
+    SELECT t.id, t.title, t.status, t.updated_at, u.id, u.login
+    FROM todos t JOIN users u ON u.id = t.user_id
+    WHERE t.is_deleted = 0
+    ORDER BY t.updated_at DESC
+    LIMIT :limit
+""")
+
+_TOTALS_SQL = text("""
+    SELECT (SELECT COUNT(*) FROM users WHERE is_deleted = 0),
+           (SELECT COALESCE(SUM(CASE WHEN status = 'pending' THEN count END), 0) FROM user_todo_stats),
+           (SELECT COALESCE(SUM(CASE WHEN status = 'in_progress' THEN count END), 0) FROM user_todo_stats),
+           (SELECT COALESCE(SUM(CASE WHEN status = 'completed' THEN count END), 0) FROM user_todo_stats),
+           (SELECT COUNT(*) FROM tag_usage_stats WHERE count > 0)
+""")
+
+def list_users_page(conn, after: int = 0, limit: int = ADMIN_PAGE_SIZE) -> tuple[list[dict], int | None]:
+    """
+    Lấy một trang user (theo id tăng dần) kèm số công việc theo trạng thái và thời điểm hoạt động gần nhất.
+
+    Args:
+        conn: Connection (hoặc Session) SQLAlchemy.
+        after (int): id của user cuối trang trước (0 để lấy trang đầu).
+        limit (int): Số user tối đa trên một trang.
+
+    Returns:
+        tuple[list[dict], int | None]: Các dòng của trang (khóa như ADMIN_CSV_FIELDS) và con trỏ
+        của trang kế tiếp (None nếu đã hết).
+    """
+    # Lấy dư 1 dòng để biết còn trang sau hay không
+    rows = [dict(row._mapping) for row in conn.execute(_USERS_PAGE_SQL, {"after": after, "limit": limit + 1})]
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_after = rows[-1]["id"]
+    return rows, next_after
+
+def list_tag_usage_page(conn, after: tuple[int, int] | None = None, limit: int = TAG_PAGE_SIZE) -> tuple[list[tuple[int, str, int]], tuple[int, int] | None]:
+    """
+    Lấy một trang nhãn theo số công việc đang dùng (giảm dần), đọc từ bảng tag_usage_stats.
+
+    Args:
+        conn: Connection (hoặc Session) SQLAlchemy.
+        after (tuple[int, int] | None): (count, tag_id) của dòng cuối trang trước.
+        limit (int): Số nhãn tối đa trên một trang.
+
+    Returns:
+        tuple: Danh sách (tag_id, tên nhãn, số công việc) và con trỏ của trang kế tiếp (None nếu đã hết).
+    """
+    after_count, after_id = after if after else (None, None)
+    rows = [tuple(row) for row in conn.execute(
+        _TAGS_PAGE_SQL, {"after_count": after_count, "after_id": after_id, "limit": limit + 1})]
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_after = (rows[-1][2], rows[-1][0])
+    return rows, next_after
+
+def encode_tag_cursor(after: tuple[int, int]) -> str:
+    """Mã hóa con trỏ (count, tag_id) của trang nhãn thành chuỗi "count:tag_id" để đưa vào URL."""
+    return f"{after[0]}:{after[1]}"
+
+def decode_tag_cursor(cursor: str) -> tuple[int, int] | None:
+    """Giải mã chuỗi tạo bởi encode_tag_cursor; trả về None nếu chuỗi rỗng/không hợp lệ."""
+    count, _, tag_id = (cursor or "").partition(":")
+    try:
+        return int(count), int(tag_id)
+    except ValueError:
+        return None
+
+def list_recent_activity(conn, limit: int = 20) -> list[dict]:
+    """Lấy các công việc được tạo/sửa gần đây nhất (kèm login của chủ sở hữu)."""
+    keys = ("todo_id", "title", "status", "updated_at", "user_id", "login")
+    return [dict(zip(keys, row)) for row in conn.execute(_RECENT_SQL, {"limit": limit})]
+
+def get_admin_totals(conn) -> dict:
+    """Tổng số user, số công việc theo trạng thái và số nhãn đang được dùng (đọc từ các bảng thống kê)."""
+    users, pending, in_progress, completed, tags = conn.execute(_TOTALS_SQL).one()
+    return {"users": users, "pending": pending, "in_progress": in_progress, "completed": completed,
+            "total": pending + in_progress + completed, "tags": tags}
+
+def iter_users_csv(engine, batch_size: int = ADMIN_EXPORT_BATCH_SIZE):
+    """
+    Sinh nội dung CSV (có dòng tiêu đề) của toàn bộ danh sách user kèm số liệu, đọc theo lô keyset.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        batch_size (int): Số user đọc mỗi lần.
+
+    Yields:
+        str: Các dòng CSV của từng lô (mỗi lô được gửi ngay khi đọc xong).
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=ADMIN_CSV_FIELDS, extrasaction="ignore")
+
+    def flush() -> str:
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writeheader()
+    yield flush()
+    after = 0
+    while after is not None:
+        # Mỗi lô một kết nối/transaction ngắn
+        with engine.connect() as conn:
+            rows, after = list_users_page(conn, after, batch_size)
+        for row in rows:
+            writer.writerow(row)
+        if rows:
+            yield flush()
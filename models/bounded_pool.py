@@ -0,0 +1,97 @@
+# File bounded_pool.py trong package models
+# Pool thread có giới hạn dùng chung cho các thao tác chặn được gọi từ route async:
+# - Số thread cố định, số thao tác được phép chờ có giới hạn; vượt quá thì từ chối ngay (PoolBusy)
+#   thay vì để request xếp hàng vô hạn và hết bộ nhớ khi quá tải.
+# - Đếm số thao tác đang chờ/chạy, số bị từ chối, tổng thời gian chờ và thời gian chạy (xuất ra /metrics).
+# Dùng bởi PasswordHasherPool (models/passwords.py) và DbExecutor (models/db_executor.py).
+
+import asyncio  # Chờ kết quả từ pool trong route async
+import threading  # Khóa cho bộ đếm
+import time  # Đo thời gian chờ và thời gian chạy
+from concurrent.futures import ThreadPoolExecutor  # Pool thread
+
+class PoolBusy(Exception):
+    """Pool đã đầy (đang chạy + đang chờ vượt quá giới hạn)."""
+
+class BoundedPool:
+    """
+    Pool thread với hàng đợi có giới hạn.
+
+    Args:
+        workers (int): Số thread chạy song song.
+        max_queue (int): Số thao tác được phép chờ khi mọi thread đều bận; vượt quá thì báo busy_error.
+    """
+
+    # Lớp con ghi đè để báo lỗi riêng và đặt tên thread dễ nhận ra
+    busy_error = PoolBusy
+    thread_name_prefix = "pool"
+
+    def __init__(self, workers: int = 2, max_queue: int = 64):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.thread_name_prefix)
+        self._lock = threading.Lock()
+        self.pending = 0            # Đang chạy + đang chờ
+        self.submitted_total = 0
+        self.rejected_total = 0
+        self.wait_seconds_total = 0.0   # Tổng thời gian chờ trong hàng đợi
+        self.run_seconds_total = 0.0    # Tổng thời gian chạy
+        self.completed_total = 0
+
+    def _run(self, func, enqueued_at: float, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.pending -= 1
+                self.completed_total += 1
+                self.wait_seconds_total += started - enqueued_at
+                self.run_seconds_total += finished - started
+
+    def submit(self, func, *args):
+        """
+        Gửi một thao tác vào pool.
+
+        Returns:
+            concurrent.futures.Future: Kết quả của thao tác.
+
+        Raises:
+            PoolBusy: (hoặc busy_error của lớp con) nếu số thao tác đang chạy và đang chờ đã đạt workers + max_queue.
+        """
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected_total += 1
+                raise self.busy_error()
+            self.pending += 1
+            self.submitted_total += 1
+        try:
+            return self._executor.submit(self._run, func, time.perf_counter(), *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+
+    async def run(self, func, *args):
+        """Chạy func(*args) trong pool và chờ kết quả mà không chặn event loop."""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def stats(self) -> dict:
+        """Số liệu của pool: số thread, giới hạn hàng đợi, số thao tác đang chờ/chạy và các bộ đếm tích lũy."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "queued": max(self.pending - self.workers, 0),
+                "submitted_total": self.submitted_total,
+                "completed_total": self.completed_total,
+                "rejected_total": self.rejected_total,
+                "wait_seconds_total": self.wait_seconds_total,
+                "run_seconds_total": self.run_seconds_total,
+            }
+
+    def shutdown(self):
+        """Dừng pool (chờ các thao tác đang chạy xong)."""
+        self._executor.shutdown(wait=True)
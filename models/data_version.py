@@ -0,0 +1,169 @@
+# File data_version.py trong package models
+# Quản lý "phiên bản dữ liệu" cho từng user, dùng chung giữa nhiều tiến trình (worker).
+# Phiên bản được lưu trong bảng data_versions và được trigger tăng lên trong cùng transaction với câu lệnh ghi
+# (xem migration 5 trong models/migrations.py):
+# - todo/todo_tag của một user thay đổi: phiên bản của user đó tăng (scope = user_id).
+# - Bảng tags thay đổi (ví dụ đổi tên nhãn): phiên bản chung tăng (scope = 0), vì nó ảnh hưởng mọi user.
+# - Bảng users thay đổi: phiên bản USERS_SCOPE tăng, để cache user của mọi tiến trình biết mà xóa.
+# - Nhãn bị sửa/xóa (không tính thêm mới): phiên bản TAGS_SCOPE tăng, để chỉ mục nhãn trong bộ nhớ
+#   (models/tag_index.py) biết khi nào phải nạp lại toàn bộ thay vì chỉ nạp thêm nhãn mới.
+# Các cache phía view (fragment cache, ETag) dùng cặp (global, user) làm khóa để biết dữ liệu đã cũ hay chưa.
+#
+# Để không phải đọc bảng ở mỗi request, mỗi tiến trình giữ bản sao các phiên bản đã đọc và một kết nối
+# riêng chỉ dùng để hỏi PRAGMA data_version: giá trị này đổi mỗi khi BẤT KỲ kết nối nào khác
+# (trong tiến trình này hay tiến trình khác) commit vào database. Khi nó chưa đổi, bản sao vẫn đúng
+# và việc kiểm tra không cần transaction hay truy vấn bảng nào.
+
+import sqlite3  # Kết nối riêng để đọc PRAGMA data_version
+import threading  # Khóa để dùng an toàn giữa nhiều thread
+from sqlalchemy import bindparam, text  # Câu lệnh SQL thuần
+
+# Các scope đặc biệt trong bảng data_versions
+GLOBAL_SCOPE = 0
+USERS_SCOPE = -1
+TAGS_SCOPE = -2
+
+_SELECT_VERSIONS = text("SELECT scope, version FROM data_versions WHERE scope IN :scopes").bindparams(
+    bindparam("scopes", expanding=True))
+_BUMP_VERSION = text("""
+    INSERT INTO data_versions (scope, version) VALUES (:scope, 1)
+    ON CONFLICT (scope) DO UPDATE SET version = version + 1
+""")
+
+class DataVersionTracker:
+    """
+    Đọc phiên bản dữ liệu từ bảng data_versions, giữ bản sao trong tiến trình
+    và chỉ đọc lại khi PRAGMA data_version cho biết database đã có commit mới.
+
+    Args:
+        engine: Engine SQLAlchemy của tiến trình hiện tại.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._versions: dict[int, int] = {}
+        self._last_data_version = None
+        self._generation = 0  # Tăng mỗi lần bản sao bị xóa
+        self._probe = None
+        database = engine.url.database
+        if database and database != ":memory:":
+            # Database trong bộ nhớ chỉ có một kết nối (StaticPool), không có kết nối "khác" để so sánh:
+            # khi đó luôn đọc lại bảng
+            self._probe = sqlite3.connect(database, check_same_thread=False, isolation_level=None)
+            self._probe.execute("PRAGMA busy_timeout = 5000")
+
+    def _sync(self):
+        # Gọi khi đang giữ khóa: xóa bản sao nếu database đã có commit mới kể từ lần kiểm tra trước
+        if self._probe is not None:
+            current = self._probe.execute("PRAGMA data_version").fetchone()[0]
+            if current == self._last_data_version:
+                return
+            self._last_data_version = current
+        self._versions.clear()
+        self._generation += 1
+
+    def get(self, *scopes: int) -> tuple[int, ...]:
+        """
+        Lấy phiên bản hiện tại của các scope.
+
+        Args:
+            *scopes (int): Các scope cần đọc (user_id, GLOBAL_SCOPE, USERS_SCOPE).
+
+        Returns:
+            tuple[int, ...]: Phiên bản theo đúng thứ tự scopes (0 nếu scope chưa từng thay đổi).
+        """
+        with self._lock:
+            self._sync()
+            generation = self._generation
+            result = [self._versions.get(scope) for scope in scopes]
+        missing = [scope for scope, version in zip(scopes, result) if version is None]
+        if not missing:
+            return tuple(result)
+        # Đọc bảng ngoài khóa. Chỉ lưu vào bản sao nếu trong lúc đọc không có thread nào phát hiện
+        # commit mới, tránh ghi đè giá trị cũ lên bản sao vừa được làm mới
+        with self.engine.connect() as conn:
+            found = dict(conn.execute(_SELECT_VERSIONS, {"scopes": missing}).all())
+        with self._lock:
+            if generation == self._generation:
+                for scope in missing:
+                    self._versions[scope] = found.get(scope, 0)
+        return tuple(found.get(scope, 0) if version is None else version for scope, version in zip(scopes, result))
+
+    def peek(self, *scopes: int) -> tuple[int, ...] | None:
+        """
+        Như get nhưng không bao giờ đọc bảng (chỉ hỏi PRAGMA data_version, không cần transaction):
+        dùng được ngay trong event loop. Trả về None nếu bản sao chưa có đủ các scope.
+        """
+        with self._lock:
+            self._sync()
+            result = tuple(self._versions.get(scope) for scope in scopes)
+        return None if None in result else result
+
+    def close(self):
+        """Đóng kết nối kiểm tra PRAGMA data_version."""
+        if self._probe is not None:
+            self._probe.close()
+            self._probe = None
+
+# Bộ theo dõi của tiến trình hiện tại, được tạo trong create_app (xem webapp.py)
+_tracker: DataVersionTracker | None = None
+
+def configure_data_versions(engine) -> DataVersionTracker:
+    """
+    Tạo bộ theo dõi phiên bản dữ liệu cho engine của tiến trình hiện tại.
+
+    Args:
+        engine: Engine SQLAlchemy (database đã được migrate).
+
+    Returns:
+        DataVersionTracker: Bộ theo dõi vừa tạo.
+    """
+    global _tracker
+    if _tracker is not None:
+        _tracker.close()
+    _tracker = DataVersionTracker(engine)
+    return _tracker
+
+def get_data_version(user_id: int) -> tuple[int, int]:
+    """
+    Lấy phiên bản dữ liệu hiện tại của một user.
+
+    Args:
+        user_id (int): ID của người dùng.
+
+    Returns:
+        tuple[int, int]: (phiên bản chung, phiên bản của user).
+    """
+    return _tracker.get(GLOBAL_SCOPE, user_id)
+
+def get_scope_version(scope: int) -> int:
+    """Lấy phiên bản hiện tại của một scope (ví dụ USERS_SCOPE)."""
+    return _tracker.get(scope)[0]
+
+def peek_data_version(user_id: int) -> tuple[int, int] | None:
+    """Như get_data_version nhưng trả về None thay vì đọc bảng khi bản sao chưa có (xem DataVersionTracker.peek)."""
+    return _tracker.peek(GLOBAL_SCOPE, user_id)
+
+def peek_scope_version(scope: int) -> int | None:
+    """Như get_scope_version nhưng trả về None thay vì đọc bảng khi bản sao chưa có (hoặc chưa tạo bộ theo dõi)."""
+    version = _tracker.peek(scope) if _tracker is not None else None
+    return None if version is None else version[0]
+
+def read_scope_versions(conn, *scopes: int) -> tuple[int, ...]:
+    """Đọc phiên bản của các scope bằng conn, tức là trong cùng snapshot với các truy vấn khác của conn."""
+    found = dict(conn.execute(_SELECT_VERSIONS, {"scopes": list(scopes)}).all())
+    return tuple(found.get(scope, 0) for scope in scopes)
+
+def bump_user_version(conn, *user_ids: int):
+    """
+    Tăng phiên bản dữ liệu của các user trong transaction của conn. Các thay đổi trên todos/todo_tags
+    đã được trigger tự tăng; chỉ cần gọi hàm này khi trigger bị tạm gỡ (ví dụ lúc nạp dữ liệu hàng loạt).
+    """
+    if user_ids:
+        conn.execute(_BUMP_VERSION, [{"scope": user_id} for user_id in user_ids])
+
+def bump_global_version(conn):
+    """Tăng phiên bản chung trong transaction của conn, làm mọi cache của mọi user (ở mọi tiến trình) trở nên cũ."""
+    # TAGS_SCOPE cũng tăng: bảng tags có thể vừa được tạo lại (drop_all) mà không trigger nào chạy
+    conn.execute(_BUMP_VERSION, [{"scope": GLOBAL_SCOPE}, {"scope": TAGS_SCOPE}])
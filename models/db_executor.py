@@ -0,0 +1,49 @@
+# File db_executor.py trong package models
+# Lớp truy cập database cho các route async.
+# SQLAlchemy/sqlite3 là thư viện đồng bộ: gọi trực tiếp trong route async sẽ chặn event loop, còn route
+# đồng bộ (def) thì chiếm một thread của threadpool chung trong suốt request, kể cả lúc render.
+# DbExecutor chạy riêng phần truy cập database trong một pool thread có kích thước bằng pool kết nối của engine
+# (thread nào cũng lấy được kết nối ngay, không phải chờ pool_timeout) và hàng đợi có giới hạn:
+# - Các request đồng thời chồng phần chờ I/O lên nhau (sqlite3 nhả GIL khi thực thi câu lệnh).
+# - Quá tải thì báo DbExecutorBusy ngay (route trả về 503) thay vì xếp hàng vô hạn.
+# (Không dùng sqlalchemy.ext.asyncio vì nó cần thêm driver aiosqlite, mà driver này cũng chỉ chạy sqlite3 trong thread.)
+
+from models.bounded_pool import BoundedPool, PoolBusy  # Pool thread có hàng đợi giới hạn
+from models.data_version import get_data_version, peek_data_version  # Phiên bản dữ liệu cho ETag/cache
+
+class DbExecutorBusy(PoolBusy):
+    """Hàng đợi truy cập database đã đầy."""
+
+class DbExecutor(BoundedPool):
+    """
+    Pool thread giới hạn chạy các thao tác database đồng bộ cho route async.
+
+    Args:
+        engine: Engine SQLAlchemy của tiến trình hiện tại.
+        workers (int): Số thread (nên bằng pool_size của engine).
+        max_queue (int): Số thao tác được phép chờ khi mọi thread đều bận; vượt quá thì báo DbExecutorBusy.
+    """
+
+    busy_error = DbExecutorBusy
+    thread_name_prefix = "db"
+
+    def __init__(self, engine, workers: int = 10, max_queue: int = 256):
+        super().__init__(workers, max_queue)
+        self.engine = engine
+
+async def get_data_version_async(executor: DbExecutor, user_id: int) -> tuple[int, int]:
+    """
+    Như models.data_version.get_data_version cho route async: khi bản sao trong tiến trình còn đúng
+    (trường hợp thường gặp) thì trả về ngay, chỉ đọc bảng data_versions qua executor khi cần.
+
+    Args:
+        executor (DbExecutor): Pool truy cập database.
+        user_id (int): ID của người dùng.
+
+    Returns:
+        tuple[int, int]: (phiên bản chung, phiên bản của user).
+    """
+    version = peek_data_version(user_id)
+    if version is None:
+        version = await executor.run(get_data_version, user_id)
+    return version
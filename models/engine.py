@@ -0,0 +1,119 @@
+# File engine.py trong package models
+# Chứa hàm tạo engine SQLAlchemy cho SQLite, cấu hình qua biến môi trường.
+# Mỗi kết nối trong pool đều được đặt các PRAGMA phù hợp cho môi trường production:
+# WAL để người đọc không bị chặn bởi người ghi, busy_timeout để chờ khóa thay vì báo lỗi ngay,
+# bộ nhớ đệm (cache_size, mmap_size) lớn hơn và bật kiểm tra khóa ngoại.
+
+import os  # Để đọc biến môi trường
+from sqlalchemy import create_engine, event  # Tạo engine và đăng ký sự kiện
+from sqlalchemy.pool import QueuePool, StaticPool  # Các loại pool kết nối
+
+# Giá trị mặc định cho từng tham số cấu hình.
+# Có thể ghi đè bằng biến môi trường cùng tên với tiền tố "TODO_DB_" (ví dụ TODO_DB_URL, TODO_DB_ECHO).
+DEFAULT_CONFIG = {
+    "url": "sqlite+pysqlite:///todo_app.db",  # Chuỗi kết nối database
+    "echo": False,                  # Không in câu lệnh SQL ra stdout (tốn chi phí), chỉ bật khi gỡ lỗi
+    "slow_query_ms": 100,           # Ngưỡng (ms) ghi log câu lệnh chậm (xem views/metrics.py)
+    "journal_mode": "WAL",          # Write-Ahead Logging: đọc và ghi đồng thời
+    "synchronous": "NORMAL",        # Với WAL, NORMAL an toàn và nhanh hơn FULL
+    "cache_size": -64000,           # Số âm nghĩa là KiB: ~64MB bộ nhớ đệm trang
+    "mmap_size": 268435456,         # 256MB đọc qua memory-mapped I/O
+    "busy_timeout": 5000,           # Chờ tối đa 5 giây khi database đang bị khóa
+    "foreign_keys": True,           # Bật kiểm tra khóa ngoại
+    "pool_size": 10,                # Số kết nối giữ sẵn trong pool cho các request đọc đồng thời
+    "max_overflow": 20,             # Số kết nối được mở thêm khi pool đã hết
+    "pool_timeout": 30,             # Thời gian chờ (giây) để lấy kết nối từ pool
+}
+
+def _parse_value(raw: str, default):
+    """
+    Chuyển chuỗi từ biến môi trường về đúng kiểu của giá trị mặc định.
+
+    Args:
+        raw (str): Giá trị chuỗi đọc từ biến môi trường.
+        default: Giá trị mặc định, dùng để xác định kiểu cần chuyển đổi.
+    """
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(raw)
+    return raw
+
+def load_db_config(overrides: dict | None = None) -> dict:
+    """
+    Đọc cấu hình database: giá trị mặc định < biến môi trường < tham số overrides.
+
+    Args:
+        overrides (dict | None): Các giá trị muốn ghi đè trực tiếp.
+
+    Returns:
+        dict: Cấu hình đầy đủ.
+    """
+    config = dict(DEFAULT_CONFIG)
+    for key, default in DEFAULT_CONFIG.items():
+        raw = os.environ.get(f"TODO_DB_{key.upper()}")
+        if raw is not None:
+            config[key] = _parse_value(raw, default)
+    if overrides:
+        config.update(overrides)
+    return config
+
+def _is_memory_db(url: str) -> bool:
+    # Database trong bộ nhớ: "sqlite://" hoặc "sqlite+pysqlite:///:memory:"
+    return url.rstrip("/").endswith(":memory:") or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:")
+
+def apply_sqlite_pragmas(dbapi_connection, config: dict):
+    """
+    Đặt các PRAGMA cho một kết nối SQLite vừa được mở.
+
+    Args:
+        dbapi_connection: Kết nối DB-API (sqlite3.Connection).
+        config (dict): Cấu hình database (xem load_db_config).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(config['busy_timeout'])}")
+        cursor.execute(f"PRAGMA journal_mode = {config['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous = {config['synchronous']}")
+        cursor.execute(f"PRAGMA cache_size = {int(config['cache_size'])}")
+        cursor.execute(f"PRAGMA mmap_size = {int(config['mmap_size'])}")
+        cursor.execute(f"PRAGMA foreign_keys = {'ON' if config['foreign_keys'] else 'OFF'}")
+    finally:
+        cursor.close()
+
+def make_engine(config: dict | None = None):
+    """
+    Tạo engine SQLAlchemy cho SQLite theo cấu hình.
+
+    Args:
+        config (dict | None): Các giá trị ghi đè cấu hình (ví dụ {"url": "sqlite://", "echo": True}).
+
+    Returns:
+        Engine: Engine đã đăng ký sự kiện đặt PRAGMA cho mọi kết nối trong pool.
+    """
+    config = load_db_config(config)
+    url = config["url"]
+    # check_same_thread=False: kết nối có thể được dùng ở thread khác với thread đã tạo nó
+    # (các route đồng bộ của Starlette chạy trong threadpool)
+    connect_args = {"check_same_thread": False}
+
+    if _is_memory_db(url):
+        # Database trong bộ nhớ chỉ tồn tại trong một kết nối, nên dùng chung một kết nối duy nhất
+        engine = create_engine(url, echo=config["echo"], connect_args=connect_args, poolclass=StaticPool)
+    else:
+        engine = create_engine(
+            url,
+            echo=config["echo"],
+            connect_args=connect_args,
+            poolclass=QueuePool,
+            pool_size=config["pool_size"],
+            max_overflow=config["max_overflow"],
+            pool_timeout=config["pool_timeout"],
+            pool_pre_ping=False,  # Kết nối SQLite cục bộ không bị "rớt", không cần ping
+        )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, config)
+
+    return engine
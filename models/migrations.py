@@ -0,0 +1,400 @@
+# File migrations.py trong package models
+# Cơ chế migration theo phiên bản cho database SQLite, thay cho việc xóa và tạo lại bảng (ini_db).
+# - Phiên bản schema hiện tại được lưu trong PRAGMA user_version của file database.
+# - Mỗi migration có một số phiên bản tăng dần và một danh sách câu lệnh SQL (hoặc một hàm).
+# - migrate(engine) chỉ chạy các migration chưa được áp dụng, mỗi migration trong một transaction riêng,
+#   nên có thể chạy trên database đang có dữ liệu thật.
+#
+# Chạy từ dòng lệnh (xem cli.py):
+#   python cli.py migrate           # Áp dụng các migration còn thiếu
+#   python cli.py migrate --check   # Áp dụng và kiểm tra các truy vấn chính có dùng index
+
+from sqlalchemy import text  # Để chạy câu lệnh SQL thuần
+
+# Danh sách migration: (phiên bản, mô tả, danh sách câu lệnh SQL hoặc hàm nhận connection)
+# QUY TẮC: không bao giờ sửa một migration đã phát hành, chỉ thêm migration mới ở cuối danh sách.
+# Các migration 1-9 được thêm cùng loạt thay đổi đưa cơ chế migration vào và CHƯA phát hành: cho đến khi loạt
+# này được merge, chúng còn được sửa tại chỗ (ví dụ migration 1 ghi cố định DDL thay vì create_all).
+# Sau khi merge, quy tắc trên áp dụng cho cả các migration này.
+MIGRATIONS = [
+    (1, "Tạo các bảng ban đầu", [
+        # Schema ban đầu của các model (users, tags, todos, todo_tags), ghi cố định bằng DDL: migration này không
+        # được đi theo model. Cột mới thêm vào model phải đi kèm một migration ALTER TABLE mới ở cuối danh sách.
+        # IF NOT EXISTS: database tạo trước khi có migration (bằng ini_db cũ) đã có sẵn các bảng này
+        """CREATE TABLE IF NOT EXISTS tags (
+            name VARCHAR(50) NOT NULL,
+            description VARCHAR(200),
+            id INTEGER NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            deleted_at DATETIME,
+            is_deleted INTEGER,
+            PRIMARY KEY (id),
+            UNIQUE (name)
+        )""",
+        """CREATE TABLE IF NOT EXISTS users (
+            login VARCHAR(20) NOT NULL,
+            password VARCHAR(256) NOT NULL,
+            name VARCHAR(50) NOT NULL,
+            email VARCHAR(100) NOT NULL,
+            is_admin BOOLEAN NOT NULL,
+            id INTEGER NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            deleted_at DATETIME,
+            is_deleted INTEGER,
+            PRIMARY KEY (id),
+            UNIQUE (login),
+            UNIQUE (email)
+        )""",
+        """CREATE TABLE IF NOT EXISTS todos (
+            title VARCHAR(100) NOT NULL,
+            description VARCHAR(500),
+            status VARCHAR(20) NOT NULL CHECK (status IN ('pending', 'in_progress', 'completed')),
+            due_date DATETIME,
+            priority INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            deleted_at DATETIME,
+            is_deleted INTEGER,
+            PRIMARY KEY (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )""",
+        """CREATE TABLE IF NOT EXISTS todo_tags (
+            todo_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            created_at DATETIME,
+            updated_at DATETIME,
+            deleted_at DATETIME,
+            is_deleted INTEGER,
+            PRIMARY KEY (id),
+            FOREIGN KEY (todo_id) REFERENCES todos (id),
+            FOREIGN KEY (tag_id) REFERENCES tags (id)
+        )""",
+    ]),
+    (2, "Thêm index cho các khóa ngoại và bộ lọc chính", [
+        # Danh sách todo của user theo thứ tự (due_date, id): phục vụ phân trang keyset ở trang chủ
+        "CREATE INDEX IF NOT EXISTS ix_todos_user_due ON todos (user_id, due_date, id)",
+        # Lọc theo trạng thái trong các todo chưa bị xóa (partial index chỉ chứa các dòng còn sống)
+        "CREATE INDEX IF NOT EXISTS ix_todos_user_status_live ON todos (user_id, status, due_date) WHERE is_deleted = 0",
+        # Các todo sắp đến hạn chưa hoàn thành, trên toàn bộ user
+        "CREATE INDEX IF NOT EXISTS ix_todos_due_open ON todos (due_date) WHERE is_deleted = 0 AND status != 'completed'",
+        # Bảng trung gian: tra cứu theo cả hai chiều
+        "CREATE INDEX IF NOT EXISTS ix_todo_tags_todo ON todo_tags (todo_id, tag_id)",
+        "CREATE INDEX IF NOT EXISTS ix_todo_tags_tag ON todo_tags (tag_id, todo_id)",
+        "ANALYZE",
+    ]),
+    (3, "Tìm kiếm toàn văn (FTS5) trên tiêu đề và mô tả công việc", [
+        # Bảng ảo FTS5 dùng "external content": chỉ lưu chỉ mục, nội dung vẫn đọc từ bảng todos.
+        # Cột user_id cũng được đánh chỉ mục để truy vấn "user_id: 5 AND ..." chỉ duyệt các todo của user đó.
+        # remove_diacritics 2: tìm "cong viec" vẫn khớp "Công việc".
+        """CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+            title, description, user_id,
+            content='todos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        # Trigger giữ chỉ mục đồng bộ với bảng todos
+        """CREATE TRIGGER IF NOT EXISTS todos_fts_ai AFTER INSERT ON todos BEGIN
+            INSERT INTO todos_fts (rowid, title, description, user_id) VALUES (new.id, new.title, new.description, new.user_id);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todos_fts_ad AFTER DELETE ON todos BEGIN
+            INSERT INTO todos_fts (todos_fts, rowid, title, description, user_id) VALUES ('delete', old.id, old.title, old.description, old.user_id);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todos_fts_au AFTER UPDATE OF title, description, user_id ON todos BEGIN
+            INSERT INTO todos_fts (todos_fts, rowid, title, description, user_id) VALUES ('delete', old.id, old.title, old.description, old.user_id);
+            INSERT INTO todos_fts (rowid, title, description, user_id) VALUES (new.id, new.title, new.description, new.user_id);
+        END""",
+        # Đánh chỉ mục cho các dòng đã có sẵn
+        "INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')",
+    ]),
+    (4, "Bảng thống kê được cập nhật tăng dần bằng trigger", [
+        # Số todo còn sống (is_deleted = 0) của mỗi user theo từng trạng thái
+        """CREATE TABLE IF NOT EXISTS user_todo_stats (
+            user_id INTEGER NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, status)
+        ) WITHOUT ROWID""",
+        # Số liên kết todo-tag còn sống của mỗi nhãn
+        """CREATE TABLE IF NOT EXISTS tag_usage_stats (
+            tag_id INTEGER PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )""",
+        # Trigger chạy trong cùng transaction với câu lệnh ghi, nên số liệu luôn khớp với dữ liệu đã commit
+        # (kể cả khi ghi bằng Core executemany như khi nhập hàng loạt)
+        """CREATE TRIGGER IF NOT EXISTS todos_stats_ai AFTER INSERT ON todos
+        WHEN COALESCE(new.is_deleted, 0) = 0 AND new.user_id IS NOT NULL BEGIN
+            INSERT INTO user_todo_stats (user_id, status, count) VALUES (new.user_id, new.status, 1)
+            ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todos_stats_ad AFTER DELETE ON todos
+        WHEN COALESCE(old.is_deleted, 0) = 0 BEGIN
+            UPDATE user_todo_stats SET count = count - 1 WHERE user_id = old.user_id AND status = old.status;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todos_stats_au AFTER UPDATE OF user_id, status, is_deleted ON todos BEGIN
+            UPDATE user_todo_stats SET count = count - 1
+            WHERE COALESCE(old.is_deleted, 0) = 0 AND user_id = old.user_id AND status = old.status;
+            INSERT INTO user_todo_stats (user_id, status, count)
+            SELECT new.user_id, new.status, 1 WHERE COALESCE(new.is_deleted, 0) = 0 AND new.user_id IS NOT NULL
+            ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todo_tags_stats_ai AFTER INSERT ON todo_tags
+        WHEN COALESCE(new.is_deleted, 0) = 0 AND new.tag_id IS NOT NULL BEGIN
+            INSERT INTO tag_usage_stats (tag_id, count) VALUES (new.tag_id, 1)
+            ON CONFLICT (tag_id) DO UPDATE SET count = count + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todo_tags_stats_ad AFTER DELETE ON todo_tags
+        WHEN COALESCE(old.is_deleted, 0) = 0 BEGIN
+            UPDATE tag_usage_stats SET count = count - 1 WHERE tag_id = old.tag_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todo_tags_stats_au AFTER UPDATE OF tag_id, is_deleted ON todo_tags BEGIN
+            UPDATE tag_usage_stats SET count = count - 1
+            WHERE COALESCE(old.is_deleted, 0) = 0 AND tag_id = old.tag_id;
+            INSERT INTO tag_usage_stats (tag_id, count)
+            SELECT new.tag_id, 1 WHERE COALESCE(new.is_deleted, 0) = 0 AND new.tag_id IS NOT NULL
+            ON CONFLICT (tag_id) DO UPDATE SET count = count + 1;
+        END""",
+        # Tính số liệu ban đầu cho dữ liệu đã có
+        "DELETE FROM user_todo_stats",
+        """INSERT INTO user_todo_stats (user_id, status, count)
+        SELECT user_id, status, COUNT(*) FROM todos WHERE COALESCE(is_deleted, 0) = 0 AND user_id IS NOT NULL GROUP BY user_id, status""",
+        "DELETE FROM tag_usage_stats",
+        """INSERT INTO tag_usage_stats (tag_id, count)
+        SELECT tag_id, COUNT(*) FROM todo_tags WHERE COALESCE(is_deleted, 0) = 0 AND tag_id IS NOT NULL GROUP BY tag_id""",
+    ]),
+    (5, "Phiên bản dữ liệu dùng chung giữa các tiến trình (cho cache và ETag)", [
+        # scope > 0: phiên bản dữ liệu của user có id = scope; 0: bảng tags (chung); -1: bảng users
+        # (xem models/data_version.py). Bảng nằm ngoài metadata nên ini_db (drop_all) không xóa nó
+        # và phiên bản không bao giờ quay lại giá trị cũ.
+        """CREATE TABLE IF NOT EXISTS data_versions (
+            scope INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )""",
+        # Phiên bản chung bắt đầu từ một số ngẫu nhiên: database mới tạo không bao giờ trùng ETag
+        # mà trình duyệt còn giữ từ một database cũ
+        "INSERT OR IGNORE INTO data_versions (scope, version) VALUES (0, abs(random() % 1000000000))",
+        "INSERT OR IGNORE INTO data_versions (scope, version) VALUES (-1, 0)",
+        # Trigger chạy trong cùng transaction với câu lệnh ghi (kể cả ghi bằng Core hoặc từ tiến trình khác),
+        # nên phiên bản chỉ đổi khi dữ liệu thực sự được commit
+        """CREATE TRIGGER IF NOT EXISTS todos_version_ai AFTER INSERT ON todos
+        WHEN new.user_id IS NOT NULL BEGIN
+            INSERT INTO data_versions (scope, version) VALUES (new.user_id, 1)
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todos_version_ad AFTER DELETE ON todos
+        WHEN old.user_id IS NOT NULL BEGIN
+            INSERT INTO data_versions (scope, version) VALUES (old.user_id, 1)
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+        END""",
+        # Todo chuyển sang user khác thì cả user cũ và user mới đều bị ảnh hưởng
+        """CREATE TRIGGER IF NOT EXISTS todos_version_au AFTER UPDATE ON todos BEGIN
+            INSERT INTO data_versions (scope, version)
+            SELECT old.user_id, 1 WHERE old.user_id IS NOT NULL
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+            INSERT INTO data_versions (scope, version)
+            SELECT new.user_id, 1 WHERE new.user_id IS NOT NULL AND new.user_id IS NOT old.user_id
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todo_tags_version_ai AFTER INSERT ON todo_tags BEGIN
+            INSERT INTO data_versions (scope, version)
+            SELECT user_id, 1 FROM todos WHERE id = new.todo_id AND user_id IS NOT NULL
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todo_tags_version_ad AFTER DELETE ON todo_tags BEGIN
+            INSERT INTO data_versions (scope, version)
+            SELECT user_id, 1 FROM todos WHERE id = old.todo_id AND user_id IS NOT NULL
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS todo_tags_version_au AFTER UPDATE ON todo_tags BEGIN
+            INSERT INTO data_versions (scope, version)
+            SELECT user_id, 1 FROM todos WHERE id IN (old.todo_id, new.todo_id) AND user_id IS NOT NULL
+            ON CONFLICT (scope) DO UPDATE SET version = version + 1;
+        END""",
+        # Đổi tên/xóa nhãn ảnh hưởng tới mọi user
+        "CREATE TRIGGER IF NOT EXISTS tags_version_ai AFTER INSERT ON tags BEGIN UPDATE data_versions SET version = version + 1 WHERE scope = 0; END",
+        "CREATE TRIGGER IF NOT EXISTS tags_version_au AFTER UPDATE ON tags BEGIN UPDATE data_versions SET version = version + 1 WHERE scope = 0; END",
+        "CREATE TRIGGER IF NOT EXISTS tags_version_ad AFTER DELETE ON tags BEGIN UPDATE data_versions SET version = version + 1 WHERE scope = 0; END",
+        # Thông tin user (tên, quyền admin) được cache trong từng tiến trình (models/user_cache.py)
+        "CREATE TRIGGER IF NOT EXISTS users_version_au AFTER UPDATE ON users BEGIN UPDATE data_versions SET version = version + 1 WHERE scope = -1; END",
+        "CREATE TRIGGER IF NOT EXISTS users_version_ad AFTER DELETE ON users BEGIN UPDATE data_versions SET version = version + 1 WHERE scope = -1; END",
+    ]),
+    (6, "Index theo thời điểm sửa cho trang quản trị", [
+        # Hoạt động gần nhất của từng user: MAX(updated_at) WHERE user_id = ? chỉ cần đọc một mục của index
+        "CREATE INDEX IF NOT EXISTS ix_todos_user_updated ON todos (user_id, updated_at)",
+        # Các công việc được sửa gần đây nhất trên toàn hệ thống: đọc ngược index, dừng sau LIMIT dòng
+        "CREATE INDEX IF NOT EXISTS ix_todos_updated ON todos (updated_at)",
+        "ANALYZE",
+    ]),
+    (7, "Lọc xóa mềm: partial index cho dòng còn sống và dòng chờ xóa hẳn", [
+        # Bộ lọc xóa mềm dùng điều kiện is_deleted = 0 (models/soft_delete.py): dòng cũ có is_deleted NULL
+        # sẽ bị ẩn, nên đưa về 0 trước (trigger thống kê coi NULL là còn sống, nên số liệu không đổi)
+        "UPDATE users SET is_deleted = 0 WHERE is_deleted IS NULL",
+        "UPDATE tags SET is_deleted = 0 WHERE is_deleted IS NULL",
+        "UPDATE todos SET is_deleted = 0 WHERE is_deleted IS NULL",
+        "UPDATE todo_tags SET is_deleted = 0 WHERE is_deleted IS NULL",
+        # Danh sách todo của trang chủ (user_id, due_date, id) chỉ trên dòng còn sống, thay cho index đầy đủ.
+        # ix_todos_user_updated (migration 6) vẫn là index đầy đủ theo user_id, dùng khi xóa hẳn todo của user
+        "DROP INDEX IF EXISTS ix_todos_user_due",
+        "CREATE INDEX IF NOT EXISTS ix_todos_user_due_live ON todos (user_id, due_date, id) WHERE is_deleted = 0",
+        # Hoạt động gần đây trên trang quản trị chỉ tính dòng còn sống
+        "DROP INDEX IF EXISTS ix_todos_updated",
+        "CREATE INDEX IF NOT EXISTS ix_todos_updated_live ON todos (updated_at) WHERE is_deleted = 0",
+        # Tìm các dòng đã xóa mềm quá hạn lưu giữ (models/purge.py): index chỉ chứa dòng đã xóa, rất nhỏ
+        "CREATE INDEX IF NOT EXISTS ix_users_purge ON users (deleted_at) WHERE is_deleted = 1",
+        "CREATE INDEX IF NOT EXISTS ix_tags_purge ON tags (deleted_at) WHERE is_deleted = 1",
+        "CREATE INDEX IF NOT EXISTS ix_todos_purge ON todos (deleted_at) WHERE is_deleted = 1",
+        "CREATE INDEX IF NOT EXISTS ix_todo_tags_purge ON todo_tags (deleted_at) WHERE is_deleted = 1",
+        "ANALYZE",
+    ]),
+    (8, "Phiên bản riêng cho việc sửa/xóa nhãn (đồng bộ chỉ mục nhãn trong bộ nhớ)", [
+        # scope -2: tăng khi một nhãn bị sửa hoặc xóa (không tính thêm mới). Chỉ mục nhãn (models/tag_index.py)
+        # thấy phiên bản chung đổi mà scope này không đổi thì chỉ cần nạp thêm các nhãn có id mới
+        "INSERT OR IGNORE INTO data_versions (scope, version) VALUES (-2, 0)",
+        "CREATE TRIGGER IF NOT EXISTS tags_changed_au AFTER UPDATE ON tags BEGIN UPDATE data_versions SET version = version + 1 WHERE scope = -2; END",
+        "CREATE TRIGGER IF NOT EXISTS tags_changed_ad AFTER DELETE ON tags BEGIN UPDATE data_versions SET version = version + 1 WHERE scope = -2; END",
+    ]),
+    (9, "Index kết hợp cho bộ lọc danh sách công việc", [
+        # Danh sách todo của trang chủ theo (due_date, id), kèm status và priority trong index: bộ lọc trạng thái/
+        # mức ưu tiên (models/todo_filter.py) được kiểm tra trên index, dòng không khớp không phải đọc từ bảng.
+        # Thay cho ix_todos_user_due_live (migration 7), index này có cùng tiền tố nên phục vụ được mọi truy vấn cũ
+        "CREATE INDEX IF NOT EXISTS ix_todos_user_due_filter ON todos (user_id, due_date, id, status, priority) WHERE is_deleted = 0",
+        "DROP INDEX IF EXISTS ix_todos_user_due_live",
+        # Lọc theo nhãn: EXISTS (todo_id = ? AND tag_id IN (...)) chỉ trên liên kết còn sống, không đọc bảng todo_tags
+        "CREATE INDEX IF NOT EXISTS ix_todo_tags_todo_live ON todo_tags (todo_id, tag_id) WHERE is_deleted = 0",
+        "ANALYZE",
+    ]),
+]
+
+# Phiên bản schema mới nhất
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn) -> int:
+    """Đọc phiên bản schema hiện tại (PRAGMA user_version) của database."""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+def _set_schema_version(conn, version: int):
+    # PRAGMA không nhận tham số ràng buộc, nên phải ghép số trực tiếp (đã ép kiểu int)
+    conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+def migrate(engine, target: int | None = None) -> list[int]:
+    """
+    Áp dụng các migration chưa chạy, theo thứ tự phiên bản.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        target (int | None): Phiên bản muốn nâng lên (mặc định là phiên bản mới nhất).
+
+    Returns:
+        list[int]: Các phiên bản migration đã được áp dụng trong lần gọi này.
+    """
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if version > target:
+            break
+        # Mỗi migration chạy trong một transaction riêng: lỗi ở giữa sẽ được rollback toàn bộ
+        with engine.begin() as conn:
+            if get_schema_version(conn) >= version:
+                continue
+            print(f"Đang áp dụng migration {version}: {description}...")
+            if callable(steps):
+                steps(conn)
+            else:
+                for statement in steps:
+                    conn.execute(text(statement))
+            _set_schema_version(conn, version)
+        applied.append(version)
+    return applied
+
+def stamp(engine, version: int | None = None):
+    """
+    Ghi nhận database đang ở một phiên bản schema mà không chạy migration
+    (dùng sau khi ini_db tạo mới toàn bộ bảng).
+    """
+    with engine.begin() as conn:
+        _set_schema_version(conn, LATEST_VERSION if version is None else version)
+
+def explain_query_plan(conn, statement) -> list[str]:
+    """
+    Trả về kế hoạch thực thi (EXPLAIN QUERY PLAN) của một câu truy vấn.
+
+    Args:
+        conn: Connection SQLAlchemy.
+        statement: Câu truy vấn SQLAlchemy (select(...)) hoặc chuỗi SQL.
+
+    Returns:
+        list[str]: Các dòng "detail" của kế hoạch, ví dụ "SEARCH todos USING INDEX ix_todos_user_due_filter (user_id=?)".
+    """
+    if isinstance(statement, str):
+        sql, params = statement, ()
+    else:
+        compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+        sql = str(compiled)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).all()
+    return [row[-1] for row in rows]
+
+def hot_queries(user_id: int = 1) -> dict:
+    """
+    Các truy vấn theo user quan trọng nhất của ứng dụng, dùng để kiểm tra việc sử dụng index.
+
+    Returns:
+        dict: Tên truy vấn -> câu truy vấn SQLAlchemy.
+    """
+    from datetime import datetime
+    from sqlalchemy import and_, or_, select
+    from models.todo import Todo
+    from models.todo_tag import TodoTag
+    from models.purge import _PURGE_STATEMENTS
+    from models.reminders import reminder_window_query
+    from models.tag_index import _LOAD_TAGS
+    from models.todo_filter import TodoFilter, todo_filter_conditions
+    from models.soft_delete import live
+
+    # Truy vấn ORM được thêm điều kiện is_deleted = 0 (models/soft_delete.py), ở đây ghi rõ bằng live()
+    # vì câu lệnh được biên dịch trực tiếp, không đi qua Session
+    first_page = select(Todo).where(Todo.user_id == user_id, live(Todo)).order_by(Todo.due_date, Todo.id).limit(51)
+    next_page = first_page.where(or_(Todo.due_date > datetime(2024, 1, 1), and_(Todo.due_date == datetime(2024, 1, 1), Todo.id > 10)))
+    # Trang đầu với bộ lọc (models/todo_filter.py): điều kiện được thêm vào cùng câu truy vấn phân trang
+    def filtered(**fields):
+        return first_page.where(*todo_filter_conditions(TodoFilter(**fields), [[1], [2]]))
+    return {
+        "todo_first_page": first_page,
+        "todo_next_page": next_page,
+        "todo_by_status": select(Todo.id).where(Todo.user_id == user_id, Todo.status == "pending", live(Todo)),
+        "filter_status": filtered(statuses=("pending",)),
+        "filter_statuses_priority": filtered(statuses=("pending", "in_progress"), priority_min=2, priority_max=4),
+        "filter_due_window": filtered(due_from=datetime(2024, 1, 1), due_to=datetime(2024, 2, 1)),
+        "filter_tags_any": filtered(tags=("a", "b")),
+        "filter_tags_all": filtered(tags=("a", "b"), tag_mode="all"),
+        "todo_tags_of_todos": select(TodoTag).where(TodoTag.todo_id.in_([1, 2, 3]), live(TodoTag)),
+        "todos_of_tag": select(TodoTag.todo_id).where(TodoTag.tag_id == 1),
+        # Nạp cửa sổ nhắc việc (models/reminders.py): đọc một khoảng của partial index ix_todos_due_open
+        "reminder_window": reminder_window_query(datetime(2024, 1, 1), datetime(2024, 1, 2)),
+        # Đồng bộ chỉ mục nhãn (models/tag_index.py): chỉ đọc các nhãn mới (id lớn hơn id đã biết)
+        "tag_index_new_tags": _LOAD_TAGS.bindparams(after=0),
+        # Các câu chọn lô cần xóa hẳn của models/purge.py
+        **{f"purge_{index}": stmt for index, (stmt, _) in enumerate(_PURGE_STATEMENTS)},
+    }
+
+def check_query_plans(engine) -> list[str]:
+    """
+    Kiểm tra các truy vấn trong hot_queries() không quét toàn bộ bảng (SCAN) và không dùng
+    B-tree tạm để sắp xếp.
+
+    Returns:
+        list[str]: Danh sách lỗi (rỗng nếu mọi truy vấn đều dùng index).
+    """
+    problems = []
+    with engine.connect() as conn:
+        for name, stmt in hot_queries().items():
+            plan = explain_query_plan(conn, stmt)
+            print(f"{name}:")
+            for line in plan:
+                print(f"    {line}")
+                if line.startswith("SCAN ") or "USE TEMP B-TREE" in line:
+                    problems.append(f"{name}: {line}")
+    return problems
@@ -0,0 +1,117 @@
+# File passwords.py trong package models
+# Băm và kiểm tra mật khẩu bằng scrypt (hashlib), có salt ngẫu nhiên cho từng mật khẩu.
+# - Định dạng lưu trong cột users.password: "scrypt$n$r$p$salt$hash" (salt và hash mã hóa base64),
+#   nên có thể tăng tham số sau này mà các mật khẩu cũ vẫn kiểm tra được.
+# - Mật khẩu cũ (SHA-256 không salt, 64 ký tự hex) vẫn đăng nhập được; needs_rehash() cho biết cần băm lại
+#   bằng scrypt ngay sau khi đăng nhập thành công.
+# - scrypt tốn hàng chục mili giây CPU và ~16MB bộ nhớ mỗi lần: PasswordHasherPool chạy nó trong một số
+#   thread giới hạn (hashlib.scrypt nhả GIL nên các thread chạy song song thật sự), hàng đợi có giới hạn
+#   và từ chối ngay (PasswordPoolBusy) khi quá tải thay vì để request xếp hàng vô hạn.
+
+import base64  # Mã hóa salt/hash
+import hashlib  # scrypt và SHA-256 (định dạng cũ)
+import hmac  # So sánh hằng thời gian
+import os  # Sinh salt ngẫu nhiên
+from models.bounded_pool import BoundedPool, PoolBusy  # Pool thread có hàng đợi giới hạn
+
+# Tham số scrypt: n = 2^14, r = 8 dùng 16MB bộ nhớ mỗi lần băm
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+SCRYPT_SALT_BYTES = 16
+_SCRYPT_MAXMEM = 64 * 1024 * 1024
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int, dklen: int) -> bytes:
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=_SCRYPT_MAXMEM, dklen=dklen)
+
+def hash_password(password: str) -> str:
+    """
+    Băm mật khẩu bằng scrypt với salt ngẫu nhiên.
+
+    Args:
+        password (str): Mật khẩu ở dạng chuỗi thuần túy (chưa băm).
+
+    Returns:
+        str: Chuỗi "scrypt$n$r$p$salt$hash" để lưu vào cột users.password.
+    """
+    salt = os.urandom(SCRYPT_SALT_BYTES)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P, SCRYPT_DKLEN)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+def _legacy_sha256(password: str) -> str:
+    # Định dạng cũ: SHA-256 không salt
+    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+def verify_password(stored_password_hash: str, provided_password: str) -> bool:
+    """
+    Hàm để xác thực mật khẩu người dùng cung cấp với mật khẩu đã được băm và lưu trong database.
+    Hỗ trợ cả định dạng scrypt và định dạng SHA-256 cũ.
+
+    Args:
+        stored_password_hash (str): Chuỗi băm mật khẩu lấy từ database.
+        provided_password (str): Mật khẩu người dùng nhập vào (chuỗi thuần túy).
+
+    Returns:
+        bool: True nếu mật khẩu khớp, False nếu không khớp.
+    """
+    if stored_password_hash.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, digest = stored_password_hash.split("$")
+            expected = _unb64(digest)
+            actual = _scrypt(provided_password, _unb64(salt), int(n), int(r), int(p), len(expected))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+    return hmac.compare_digest(_legacy_sha256(provided_password).encode("ascii"), stored_password_hash.encode("utf-8"))
+
+def needs_rehash(stored_password_hash: str) -> bool:
+    """Cho biết mật khẩu đang lưu có cần băm lại (định dạng cũ hoặc tham số scrypt cũ) hay không."""
+    return not stored_password_hash.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+# Chuỗi băm giả dùng khi không tìm thấy user: vẫn tốn đúng chi phí scrypt, để thời gian phản hồi
+# không tiết lộ tên đăng nhập có tồn tại hay không (tạo muộn ở lần dùng đầu tiên)
+_dummy_hash = None
+
+def dummy_hash() -> str:
+    """Trả về một chuỗi băm scrypt của mật khẩu ngẫu nhiên (để so sánh khi user không tồn tại)."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(_b64(os.urandom(16)))
+    return _dummy_hash
+
+def verify_password_or_dummy(stored_password_hash: str | None, provided_password: str) -> bool:
+    """Như verify_password; nếu không có chuỗi băm (user không tồn tại) thì vẫn băm với chuỗi giả và trả về False."""
+    if stored_password_hash is None:
+        verify_password(dummy_hash(), provided_password)
+        return False
+    return verify_password(stored_password_hash, provided_password)
+
+class PasswordPoolBusy(PoolBusy):
+    """Pool băm mật khẩu đã đầy (đang xử lý + đang chờ vượt quá giới hạn)."""
+
+class PasswordHasherPool(BoundedPool):
+    """
+    Pool thread giới hạn để băm/kiểm tra mật khẩu mà không chặn event loop hay threadpool của request.
+
+    Args:
+        workers (int): Số thread băm chạy song song (nên xấp xỉ số nhân CPU).
+        max_queue (int): Số thao tác được phép chờ khi mọi thread đều bận; vượt quá thì báo PasswordPoolBusy.
+    """
+
+    busy_error = PasswordPoolBusy
+    thread_name_prefix = "password"
+
+    async def verify(self, stored_password_hash: str | None, provided_password: str) -> bool:
+        """Kiểm tra mật khẩu trong pool (xem verify_password_or_dummy)."""
+        return await self.run(verify_password_or_dummy, stored_password_hash, provided_password)
+
+    async def hash(self, password: str) -> str:
+        """Băm mật khẩu trong pool (xem hash_password)."""
+        return await self.run(hash_password, password)
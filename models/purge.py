@@ -0,0 +1,146 @@
+# File purge.py trong package models
+# Xóa hẳn (hard delete) các dòng đã bị xóa mềm quá thời gian lưu giữ, để các bảng không phình ra mãi.
+# - Làm theo từng lô nhỏ, MỖI LÔ MỘT TRANSACTION ngắn: SQLite chỉ có một người ghi tại một thời điểm,
+#   nên lô nhỏ giúp khóa ghi được nhả ra thường xuyên cho các request khác (giữa các lô có thể nghỉ thêm `pause`).
+# - Dòng cần xóa được tìm qua partial index (deleted_at) WHERE is_deleted = 1 (migration 7): chỉ chứa các dòng
+#   đã xóa, không phải quét bảng.
+# - Xóa theo quan hệ: todo_tags của các todo/nhãn bị xóa được xóa trước, todo của user bị xóa được xóa trước user.
+#   Liên kết của nhãn và todo của user được xóa theo lô riêng, vì số lượng của chúng không bị giới hạn.
+# - Trigger thống kê chỉ trừ khi dòng bị xóa còn sống, nên xóa hẳn dòng đã xóa mềm không làm lệch bảng thống kê.
+#
+# Chạy tay: python cli.py purge --retention-days 30; trong ứng dụng: DeletedRowPurger chạy nền (xem webapp.py).
+
+import logging  # Ghi log kết quả dọn dẹp
+import threading  # Thread nền
+import time  # Nghỉ giữa các lô
+from datetime import datetime, timedelta  # Mốc thời gian lưu giữ
+from sqlalchemy import DateTime, bindparam, text  # Câu lệnh SQL thuần
+
+purge_logger = logging.getLogger("todo.purge")
+
+# Số dòng xóa trong mỗi transaction
+PURGE_BATCH_SIZE = 500
+# Thời gian lưu giữ dòng đã xóa mềm trước khi xóa hẳn (ngày)
+PURGE_RETENTION_DAYS = 30
+
+def _expired(table: str) -> str:
+    # Các id đã xóa mềm trước mốc :cutoff (đọc partial index ix_<table>_purge)
+    return f"SELECT id FROM {table} WHERE is_deleted = 1 AND deleted_at < :cutoff LIMIT :limit"
+
+# Mỗi bước: (câu chọn id của một lô, các câu DELETE theo thứ tự: (bảng, câu lệnh với tham số :ids))
+_PURGE_STEPS = [
+    (_expired("todo_tags"), [
+        ("todo_tags", "DELETE FROM todo_tags WHERE id IN :ids"),
+    ]),
+    (_expired("todos"), [
+        ("todo_tags", "DELETE FROM todo_tags WHERE todo_id IN :ids"),
+        ("todos", "DELETE FROM todos WHERE id IN :ids"),
+    ]),
+    # Liên kết của các nhãn sắp bị xóa hẳn: một nhãn có thể gắn với rất nhiều công việc, nên xóa theo lô
+    # (mỗi lô tối đa :limit liên kết) trước khi xóa nhãn
+    ("""SELECT id FROM todo_tags WHERE tag_id IN (
+            SELECT id FROM tags WHERE is_deleted = 1 AND deleted_at < :cutoff)
+        LIMIT :limit""", [
+        ("todo_tags", "DELETE FROM todo_tags WHERE id IN :ids"),
+    ]),
+    (_expired("tags"), [
+        # Chỉ còn liên kết được tạo sau bước trên (thường không có), để không vi phạm khóa ngoại
+        ("todo_tags", "DELETE FROM todo_tags WHERE tag_id IN :ids"),
+        ("tags", "DELETE FROM tags WHERE id IN :ids"),
+    ]),
+    # Todo (kể cả còn sống) của các user sắp bị xóa hẳn: xóa theo lô trước khi xóa user
+    ("""SELECT id FROM todos WHERE user_id IN (
+            SELECT id FROM users WHERE is_deleted = 1 AND deleted_at < :cutoff)
+        LIMIT :limit""", [
+        ("todo_tags", "DELETE FROM todo_tags WHERE todo_id IN :ids"),
+        ("todos", "DELETE FROM todos WHERE id IN :ids"),
+    ]),
+    (_expired("users"), [
+        ("users", "DELETE FROM users WHERE id IN :ids"),
+    ]),
+]
+
+def _prepare(select_sql: str, delete_sqls: list[tuple[str, str]]):
+    select_stmt = text(select_sql).bindparams(bindparam("cutoff", type_=DateTime))
+    deletes = [(table, text(sql).bindparams(bindparam("ids", expanding=True))) for table, sql in delete_sqls]
+    return select_stmt, deletes
+
+_PURGE_STATEMENTS = [_prepare(select_sql, delete_sqls) for select_sql, delete_sqls in _PURGE_STEPS]
+
+def purge_deleted(engine, retention: timedelta = timedelta(days=PURGE_RETENTION_DAYS),
+                  batch_size: int = PURGE_BATCH_SIZE, pause: float = 0.0, stop: threading.Event | None = None) -> dict:
+    """
+    Xóa hẳn các dòng đã xóa mềm trước (hiện tại - retention), theo từng lô.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        retention (timedelta): Thời gian lưu giữ dòng đã xóa mềm.
+        batch_size (int): Số dòng (của bảng chính) xóa trong mỗi transaction.
+        pause (float): Thời gian nghỉ (giây) giữa hai lô, để nhường khóa ghi cho các request.
+        stop (threading.Event | None): Dừng sớm (giữa hai lô) khi được set.
+
+    Returns:
+        dict: Số dòng đã xóa hẳn theo bảng, ví dụ {"todo_tags": 0, "todos": 120, "tags": 0, "users": 1, "batches": 2}.
+    """
+    cutoff = datetime.now() - retention
+    counts = {"todo_tags": 0, "todos": 0, "tags": 0, "users": 0, "batches": 0}
+    for select_stmt, deletes in _PURGE_STATEMENTS:
+        while stop is None or not stop.is_set():
+            with engine.begin() as conn:
+                ids = list(conn.execute(select_stmt, {"cutoff": cutoff, "limit": batch_size}).scalars())
+                if not ids:
+                    break
+                for table, delete_stmt in deletes:
+                    counts[table] += conn.execute(delete_stmt, {"ids": ids}).rowcount
+            counts["batches"] += 1
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return counts
+
+class DeletedRowPurger:
+    """
+    Thread nền định kỳ gọi purge_deleted.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        interval (float): Khoảng thời gian (giây) giữa hai lần dọn.
+        retention (timedelta): Thời gian lưu giữ dòng đã xóa mềm.
+        batch_size (int): Số dòng xóa trong mỗi transaction.
+        pause (float): Thời gian nghỉ (giây) giữa hai lô.
+    """
+
+    def __init__(self, engine, interval: float = 3600.0, retention: timedelta = timedelta(days=PURGE_RETENTION_DAYS),
+                 batch_size: int = PURGE_BATCH_SIZE, pause: float = 0.05):
+        self.engine = engine
+        self.interval = interval
+        self.retention = retention
+        self.batch_size = batch_size
+        self.pause = pause
+        self.last_result: dict | None = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Bắt đầu thread dọn dẹp (gọi khi ứng dụng khởi động)."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="deleted-row-purger", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Dừng thread dọn dẹp (gọi khi ứng dụng tắt); lô đang chạy được làm xong."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_result = purge_deleted(self.engine, self.retention, self.batch_size, self.pause, self._stop)
+                if any(self.last_result[table] for table in ("todo_tags", "todos", "tags", "users")):
+                    purge_logger.info("Đã xóa hẳn các dòng đã xóa mềm: %s", self.last_result)
+            except Exception:
+                purge_logger.exception("Lỗi khi xóa hẳn các dòng đã xóa mềm")
@@ -0,0 +1,294 @@
+# File reminders.py trong package models
+# Bộ lập lịch nhắc việc theo hạn chót (Todo.due_date), đẩy nhắc việc tới người dùng đang mở trang (SSE).
+# - Các công việc chưa hoàn thành có hạn trong một "cửa sổ" phía trước (mặc định 24 giờ) được nạp MỘT LẦN bằng
+#   truy vấn theo khoảng due_date trên partial index ix_todos_due_open (migration 2) vào một min-heap (heapq)
+#   theo (due_date, todo_id). Bộ nhớ chỉ tỉ lệ với số công việc đến hạn trong cửa sổ, không phải toàn bộ bảng,
+#   nên vẫn chạy được khi có hàng triệu công việc đang chờ.
+# - Không quét bảng định kỳ: thread nền ngủ tới đúng hạn chót gần nhất (đỉnh heap), mỗi lần thức dậy chỉ lấy ra
+#   các mục đã đến hạn (tối đa max_batch mục), chi phí mỗi mục O(log n).
+# - Khi công việc được tạo/sửa/xóa, route gọi todo_changed/todo_removed để cập nhật heap ngay. Mục cũ không bị
+#   tìm và xóa khỏi heap (tốn O(n)) mà được bỏ qua khi lấy ra, nhờ dict _entries giữ phiên bản hiện tại của từng todo
+#   ("xóa lười"); heap được dựng lại khi số mục cũ vượt quá số mục còn hiệu lực.
+# - Nạp lại cửa sổ (resync) khi khởi động, khi cửa sổ đã trôi qua một nửa, sau khi nhập hàng loạt và định kỳ
+#   (resync_interval, để thấy cả thay đổi do worker khác ghi). Nhắc việc đã gửi không bị gửi lại: chỉ các mục
+#   đứng sau mục cuối cùng đã gửi (theo thứ tự của heap) mới được nạp.
+
+import asyncio  # Hàng đợi của từng kết nối SSE
+import heapq  # Min-heap theo hạn chót
+import logging  # Ghi log lỗi của thread nền
+import threading  # Thread nền và khóa
+import time  # Đồng hồ đơn điệu cho chu kỳ resync
+from datetime import datetime, timedelta  # Hạn chót và cửa sổ thời gian
+from typing import NamedTuple  # Kiểu dữ liệu của một nhắc việc
+from sqlalchemy import literal_column, select  # Truy vấn theo khoảng due_date
+from models.soft_delete import live  # Điều kiện dòng còn sống
+from models.todo import Todo  # Model Todo
+
+reminder_logger = logging.getLogger("todo.reminders")
+
+# Độ dài cửa sổ công việc sắp đến hạn được giữ trong heap
+REMINDER_HORIZON = timedelta(hours=24)
+# Khi khởi động lại, vẫn nhắc các công việc vừa quá hạn trong khoảng thời gian này (lúc server đang tắt)
+REMINDER_GRACE = timedelta(minutes=5)
+# Thời gian ngủ tối đa của thread nền (phòng khi đồng hồ hệ thống bị chỉnh)
+_MAX_WAIT_SECONDS = 60.0
+
+class Reminder(NamedTuple):
+    """Một nhắc việc: công việc todo_id của user_id đến hạn lúc due_date."""
+    todo_id: int
+    user_id: int
+    title: str
+    due_date: datetime
+
+def reminder_window_query(start: datetime, end: datetime):
+    """
+    Truy vấn các công việc còn sống, chưa hoàn thành, có hạn trong [start, end).
+    Điều kiện viết đúng như partial index ix_todos_due_open để SQLite chỉ đọc một khoảng của index.
+    """
+    return select(Todo.id, Todo.user_id, Todo.title, Todo.due_date).where(
+        Todo.due_date >= start,
+        Todo.due_date < end,
+        live(Todo),
+        Todo.status != literal_column("'completed'"),
+        Todo.user_id.is_not(None),
+    )
+
+class ReminderScheduler:
+    """
+    Lập lịch nhắc việc trong bộ nhớ (min-heap) và gửi tới các kết nối SSE của người dùng trong tiến trình này.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        horizon (timedelta): Độ dài cửa sổ công việc sắp đến hạn được nạp vào heap.
+        grace (timedelta): Khi nạp lần đầu, vẫn nhắc các công việc đã quá hạn trong khoảng này.
+        resync_interval (float): Chu kỳ (giây) nạp lại cửa sổ; 0 = chỉ nạp khi cần (một worker).
+        max_batch (int): Số nhắc việc tối đa lấy ra trong một lần thức dậy.
+        queue_size (int): Số nhắc việc tối đa chờ gửi trên một kết nối (đầy thì bỏ bớt).
+    """
+
+    def __init__(self, engine, horizon: timedelta = REMINDER_HORIZON, grace: timedelta = REMINDER_GRACE,
+                 resync_interval: float = 300.0, max_batch: int = 1000, queue_size: int = 100):
+        self.engine = engine
+        self.horizon = horizon
+        self.grace = grace
+        self.resync_interval = resync_interval
+        self.max_batch = max_batch
+        self.queue_size = queue_size
+        self._cond = threading.Condition()
+        self._heap: list[tuple[datetime, int]] = []  # (due_date, todo_id), có thể chứa mục cũ
+        self._entries: dict[int, Reminder] = {}  # Mục còn hiệu lực của từng todo
+        self._window_end: datetime | None = None  # Heap chứa mọi công việc có hạn trước mốc này
+        self._fired_key: tuple[datetime, int] | None = None  # (due_date, todo_id) của nhắc việc cuối cùng đã lấy ra
+        self._touched: set[int] | None = None  # Các todo được sửa trong lúc đang nạp lại cửa sổ
+        self._resync_requested = False
+        self._subscribers: dict[int, dict[asyncio.Queue, asyncio.AbstractEventLoop]] = {}
+        self._stopping = False
+        self._thread = None
+        self.counters = {"resyncs_total": 0, "loaded_total": 0, "fired_total": 0, "delivered_total": 0, "dropped_total": 0}
+
+    # --- Cập nhật heap khi công việc thay đổi (gọi từ route, sau khi transaction đã commit) ---
+
+    def _accepts(self, key: tuple[datetime, int]) -> bool:
+        # Gọi khi đang giữ khóa: công việc thuộc cửa sổ và chưa được nhắc
+        return (self._window_end is not None and key[0] < self._window_end
+                and (self._fired_key is None or key > self._fired_key))
+
+    def todo_changed(self, todo):
+        """
+        Cập nhật lịch nhắc của một công việc vừa được tạo/sửa.
+
+        Args:
+            todo: Đối tượng có id, user_id, title, due_date, status (ví dụ Todo vừa nạp lại).
+        """
+        with self._cond:
+            if self._touched is not None:
+                self._touched.add(todo.id)
+            self._entries.pop(todo.id, None)
+            if todo.due_date is None or todo.status == "completed" or todo.user_id is None:
+                return
+            key = (todo.due_date, todo.id)
+            if not self._accepts(key):
+                return
+            self._entries[todo.id] = Reminder(todo.id, todo.user_id, todo.title, todo.due_date)
+            heapq.heappush(self._heap, key)
+            self._compact()
+            if self._heap[0] == key:
+                # Hạn chót mới sớm hơn lúc thread nền định thức dậy
+                self._cond.notify()
+
+    def todo_removed(self, todo_id: int):
+        """Hủy lịch nhắc của một công việc vừa bị xóa (mục trong heap sẽ được bỏ qua khi lấy ra)."""
+        with self._cond:
+            if self._touched is not None:
+                self._touched.add(todo_id)
+            self._entries.pop(todo_id, None)
+            self._compact()
+
+    def request_resync(self):
+        """Yêu cầu thread nền nạp lại cửa sổ (ví dụ sau khi nhập hàng loạt công việc)."""
+        with self._cond:
+            self._resync_requested = True
+            self._cond.notify()
+
+    def _compact(self):
+        # Gọi khi đang giữ khóa: dựng lại heap khi mục cũ chiếm quá nửa
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            self._heap = [(entry.due_date, todo_id) for todo_id, entry in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    # --- Nạp cửa sổ từ database ---
+
+    def resync(self, now: datetime | None = None) -> int:
+        """
+        Nạp lại các công việc có hạn trong cửa sổ [nhắc việc cuối đã gửi, now + horizon) bằng một truy vấn theo khoảng.
+
+        Returns:
+            int: Số công việc trong heap sau khi nạp.
+        """
+        now = now or datetime.now()
+        end = now + self.horizon
+        with self._cond:
+            if self._fired_key is None:
+                self._fired_key = (now - self.grace, 0)
+            start = self._fired_key[0]
+            # Mở rộng cửa sổ trước khi truy vấn: công việc được sửa trong lúc truy vấn được ghi nhận qua todo_changed
+            self._window_end = max(self._window_end or end, end)
+            self._touched = set()
+        with self.engine.connect() as conn:
+            rows = conn.execute(reminder_window_query(start, end)).all()
+        with self._cond:
+            touched, self._touched = self._touched, None
+            entries = {todo_id: Reminder(todo_id, user_id, title, due_date)
+                       for todo_id, user_id, title, due_date in rows
+                       if todo_id not in touched and (due_date, todo_id) > self._fired_key}
+            # Công việc được sửa trong lúc truy vấn: giữ trạng thái mới nhất do todo_changed/todo_removed ghi
+            entries.update((todo_id, self._entries[todo_id]) for todo_id in touched if todo_id in self._entries)
+            self._entries = entries
+            self._heap = [(entry.due_date, todo_id) for todo_id, entry in entries.items()]
+            heapq.heapify(self._heap)
+            self.counters["resyncs_total"] += 1
+            self.counters["loaded_total"] += len(rows)
+            self._cond.notify()
+            return len(entries)
+
+    # --- Lấy nhắc việc đến hạn ---
+
+    def pop_due(self, now: datetime) -> list[Reminder]:
+        """Lấy ra (tối đa max_batch) các nhắc việc đã đến hạn tại thời điểm now, theo thứ tự hạn chót."""
+        fired = []
+        with self._cond:
+            heap, entries = self._heap, self._entries
+            while heap and heap[0][0] <= now and len(fired) < self.max_batch:
+                due, todo_id = heapq.heappop(heap)
+                entry = entries.get(todo_id)
+                if entry is None or entry.due_date != due:
+                    continue  # Mục cũ (công việc đã bị sửa hạn, hoàn thành hoặc xóa)
+                del entries[todo_id]
+                self._fired_key = (due, todo_id)
+                fired.append(entry)
+            self.counters["fired_total"] += len(fired)
+        return fired
+
+    def _wait_seconds(self, now: datetime, next_resync: float) -> float:
+        # Gọi khi đang giữ khóa: ngủ tới hạn chót gần nhất, lúc cần mở rộng cửa sổ hoặc lúc resync định kỳ
+        wake_at = self._window_end - self.horizon / 2 if self._window_end else now
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0])
+        seconds = min((wake_at - now).total_seconds(), next_resync - time.monotonic(), _MAX_WAIT_SECONDS)
+        return max(seconds, 0.0)
+
+    # --- Gửi nhắc việc tới các kết nối SSE ---
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """
+        Đăng ký nhận nhắc việc của một user (gọi trong event loop, từ route SSE).
+
+        Returns:
+            asyncio.Queue: Hàng đợi nhận các Reminder (None khi bộ lập lịch dừng).
+        """
+        queue = asyncio.Queue(self.queue_size)
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            self._subscribers.setdefault(user_id, {})[queue] = loop
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        """Hủy đăng ký (khi kết nối SSE đóng)."""
+        with self._cond:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.pop(queue, None)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def scheduled_count(self) -> int:
+        """Số công việc đang chờ nhắc trong cửa sổ hiện tại."""
+        with self._cond:
+            return len(self._entries)
+
+    def subscriber_count(self) -> int:
+        """Số kết nối SSE đang nhận nhắc việc."""
+        with self._cond:
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def _offer(self, queue: asyncio.Queue, item):
+        # Chạy trong event loop của kết nối: bỏ nhắc việc nếu trình duyệt không đọc kịp
+        if queue.full():
+            self.counters["dropped_total"] += 1
+        else:
+            queue.put_nowait(item)
+            self.counters["delivered_total"] += 1
+
+    def deliver(self, reminders: list[Reminder]):
+        """Gửi các nhắc việc tới mọi kết nối SSE của chủ sở hữu công việc trong tiến trình này."""
+        with self._cond:
+            targets = [(reminder, list(self._subscribers.get(reminder.user_id, {}).items())) for reminder in reminders]
+        for reminder, queues in targets:
+            for queue, loop in queues:
+                loop.call_soon_threadsafe(self._offer, queue, reminder)
+
+    # --- Thread nền ---
+
+    def start(self):
+        """Nạp cửa sổ đầu tiên và bắt đầu thread nền (gọi khi ứng dụng khởi động)."""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Dừng thread nền và báo cho các kết nối SSE kết thúc (gọi khi ứng dụng tắt)."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            subscribers = [item for queues in self._subscribers.values() for item in queues.items()]
+        for queue, loop in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, None)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        next_resync = 0.0
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                now = datetime.now()
+                due_resync = (self._resync_requested or time.monotonic() >= next_resync
+                              or self._window_end is None or now >= self._window_end - self.horizon / 2)
+                self._resync_requested = False
+            try:
+                if due_resync:
+                    self.resync(now)
+                    next_resync = time.monotonic() + (self.resync_interval or float("inf"))
+                fired = self.pop_due(datetime.now())
+                if fired:
+                    self.deliver(fired)
+                    continue
+            except Exception:
+                reminder_logger.exception("Lỗi trong bộ lập lịch nhắc việc")
+                next_resync = time.monotonic() + _MAX_WAIT_SECONDS
+            with self._cond:
+                if not self._stopping and not self._resync_requested:
+                    self._cond.wait(self._wait_seconds(datetime.now(), next_resync))
@@ -0,0 +1,272 @@
+# File repository.py trong package models
+# Chứa các hàm truy vấn (repository) dùng chung cho các route/view.
+# Mục tiêu là nạp dữ liệu theo lô (eager loading) với số câu lệnh SQL cố định,
+# tránh lỗi N+1 query khi duyệt user.todos -> todo.tags.
+# Tên nhãn không đọc từ bảng tags mà từ chỉ mục nhãn trong bộ nhớ (models/tag_index.py): view dùng
+# tag_index.name(link.tag_id) thay cho link.tag.name.
+# Danh sách công việc cũng có thể được nạp dưới dạng tuple thuần (load_todo_rows) cho renderer nhanh
+# (views/Home/rows.py): không tạo đối tượng ORM nào, chỉ đọc đúng các cột được hiển thị.
+
+from datetime import datetime  # Để giải mã due_date trong con trỏ phân trang
+from typing import Iterator  # Kiểu trả về của iter_todo_row_pages
+from sqlalchemy import and_, or_, select  # Dùng để xây dựng câu truy vấn kiểu SQLAlchemy 2.0
+from sqlalchemy.orm import Session, selectinload  # Các chiến lược nạp dữ liệu
+from models.tag_index import tag_index  # Chỉ mục nhãn trong bộ nhớ (id -> tên)
+from models.todo_filter import TodoFilter, todo_filter_conditions  # Bộ lọc danh sách công việc
+from models.todo import Todo  # Model Todo
+from models.todo_tag import TodoTag  # Model TodoTag (nạp id nhãn cho dòng công việc)
+from models.user import User  # Model User
+
+def todo_load_options():
+    """
+    Trả về tùy chọn nạp sẵn (eager loading) cho Todo cùng các TodoTag liên quan.
+
+    - selectinload(Todo.tags): nạp tất cả TodoTag của các todo bằng MỘT câu SELECT ... WHERE todo_id IN (...)
+    - Không JOIN bảng tags: tên nhãn được lấy từ tag_index (xem index_todo_tags).
+
+    Returns:
+        Tùy chọn loader dùng được với select(Todo).options(...).
+    """
+    return selectinload(Todo.tags)
+
+def index_todo_tags(db: Session, todos) -> None:
+    """
+    Bảo đảm chỉ mục nhãn có tên của mọi nhãn gắn với các todo (thường không tốn câu lệnh nào,
+    xem TagIndex.ensure). Gọi sau khi nạp todos bằng todo_load_options, trước khi render.
+
+    Args:
+        db (Session): Session đã dùng để nạp todos (đọc cùng snapshot).
+        todos: Các todo đã nạp sẵn tags.
+    """
+    tag_index.ensure(db.connection(), {link.tag_id for todo in todos for link in todo.tags})
+
+def load_user_with_todos(db: Session, user_id: int) -> User | None:
+    """
+    Nạp một user cùng toàn bộ todos và TodoTag của user đó.
+
+    Số câu lệnh SQL luôn cố định (3 câu: users, todos, todo_tags)
+    bất kể user có bao nhiêu công việc hay nhãn; tên nhãn lấy từ tag_index.
+
+    Args:
+        db (Session): Session SQLAlchemy đang mở.
+        user_id (int): ID của người dùng cần nạp.
+
+    Returns:
+        User | None: Đối tượng User đã được nạp đầy đủ, hoặc None nếu không tìm thấy.
+    """
+    stmt = (
+        select(User)
+        .where(User.id == user_id)
+        .options(selectinload(User.todos).options(todo_load_options()))
+    )
+    user = db.scalars(stmt).first()
+    if user is not None:
+        index_todo_tags(db, user.todos)
+    return user
+
+def load_user_todos(db: Session, user_id: int) -> list[Todo]:
+    """
+    Nạp danh sách todos của một user cùng TodoTag (2 câu lệnh SQL cố định).
+
+    Args:
+        db (Session): Session SQLAlchemy đang mở.
+        user_id (int): ID của người dùng.
+
+    Returns:
+        list[Todo]: Danh sách công việc, thuộc tính tags đã được nạp sẵn.
+    """
+    stmt = (
+        select(Todo)
+        .where(Todo.user_id == user_id)
+        .order_by(Todo.id)
+        .options(todo_load_options())
+    )
+    todos = list(db.scalars(stmt).all())
+    index_todo_tags(db, todos)
+    return todos
+
+def load_todo(db: Session, user_id: int, todo_id: int) -> Todo | None:
+    """
+    Nạp một công việc của user cùng TodoTag (2 câu lệnh SQL), dùng để render lại
+    đúng một thẻ Li sau khi sửa mà không nạp lại cả danh sách.
+
+    Args:
+        db (Session): Session SQLAlchemy đang mở.
+        user_id (int): ID của người dùng (công việc của user khác trả về None).
+        todo_id (int): ID của công việc.
+
+    Returns:
+        Todo | None: Công việc, hoặc None nếu không tìm thấy.
+    """
+    stmt = select(Todo).where(Todo.id == todo_id, Todo.user_id == user_id).options(todo_load_options())
+    todo = db.scalars(stmt).first()
+    if todo is not None:
+        index_todo_tags(db, [todo])
+    return todo
+
+# --- Phân trang kiểu keyset (seek) ---
+# Thay vì OFFSET (phải quét bỏ qua các dòng trước đó), ta ghi nhớ (due_date, id) của dòng cuối
+# trang trước làm "con trỏ" (cursor) và chỉ lấy các dòng đứng sau nó theo thứ tự (due_date, id).
+# Thời gian lấy một trang vì thế không phụ thuộc vào tổng số todo của user.
+# Lưu ý: SQLite sắp xếp NULL lên đầu khi ORDER BY tăng dần, nên các todo không có due_date đứng trước.
+
+# Số todo trên mỗi trang
+TODO_PAGE_SIZE = 50
+
+def encode_todo_cursor(todo: Todo) -> str:
+    """
+    Mã hóa vị trí (due_date, id) của một todo thành chuỗi con trỏ để đưa vào URL.
+
+    Args:
+        todo (Todo): Todo cuối cùng của trang hiện tại.
+
+    Returns:
+        str: Chuỗi dạng "<due_date ISO>|<id>" (due_date rỗng nếu NULL).
+    """
+    return encode_todo_position(todo.due_date, todo.id)
+
+def encode_todo_position(due_date: datetime | None, todo_id: int) -> str:
+    """Như encode_todo_cursor, nhưng nhận trực tiếp (due_date, id) (dùng cho dòng dạng tuple)."""
+    due = due_date.isoformat() if due_date else ""
+    return f"{due}|{todo_id}"
+
+def decode_todo_cursor(cursor: str) -> tuple[datetime | None, int] | None:
+    """
+    Giải mã chuỗi con trỏ tạo bởi encode_todo_cursor.
+
+    Args:
+        cursor (str): Chuỗi con trỏ.
+
+    Returns:
+        tuple | None: (due_date hoặc None, id), hoặc None nếu chuỗi rỗng/không hợp lệ.
+    """
+    if not cursor or "|" not in cursor:
+        return None
+    due, _, todo_id = cursor.rpartition("|")
+    try:
+        return (datetime.fromisoformat(due) if due else None, int(todo_id))
+    except ValueError:
+        return None
+
+def _todo_page_conditions(db: Session, user_id: int, cursor: str | None, filters: TodoFilter | None) -> list | None:
+    # Điều kiện WHERE của một trang: user, bộ lọc và vị trí sau con trỏ (None nếu chắc chắn không có dòng nào)
+    conditions = [Todo.user_id == user_id]
+    if filters is not None and not filters.is_empty():
+        if filters.tags:
+            # Tên nhãn -> id bằng chỉ mục nhãn trong bộ nhớ (không truy vấn bảng tags)
+            tag_index.sync(db.connection())
+            filter_conditions = todo_filter_conditions(filters, [tag_index.find_ids(name) for name in filters.tags])
+        else:
+            filter_conditions = todo_filter_conditions(filters, [])
+        if filter_conditions is None:
+            return None
+        conditions += filter_conditions
+    position = decode_todo_cursor(cursor)
+    if position is not None:
+        due, todo_id = position
+        if due is None:
+            # Đang ở nhóm due_date NULL: lấy phần còn lại của nhóm NULL, rồi toàn bộ các todo có due_date
+            conditions.append(or_(and_(Todo.due_date.is_(None), Todo.id > todo_id), Todo.due_date.is_not(None)))
+        else:
+            conditions.append(or_(Todo.due_date > due, and_(Todo.due_date == due, Todo.id > todo_id)))
+    return conditions
+
+def load_todo_page(db: Session, user_id: int, cursor: str | None = None, limit: int = TODO_PAGE_SIZE,
+                   filters: TodoFilter | None = None) -> tuple[list[Todo], str | None]:
+    """
+    Nạp một trang todos của user theo thứ tự (due_date, id), kèm TodoTag.
+    Bộ lọc (nếu có) được thêm vào điều kiện WHERE của cùng câu truy vấn (xem models/todo_filter.py).
+
+    Args:
+        db (Session): Session SQLAlchemy đang mở.
+        user_id (int): ID của người dùng.
+        cursor (str | None): Con trỏ của trang trước (None để lấy trang đầu).
+        limit (int): Số todo tối đa trên một trang.
+        filters (TodoFilter | None): Bộ lọc trạng thái, mức ưu tiên, hạn chót, nhãn.
+
+    Returns:
+        tuple[list[Todo], str | None]: Danh sách todo của trang và con trỏ của trang kế tiếp
+        (None nếu đã hết dữ liệu).
+    """
+    conditions = _todo_page_conditions(db, user_id, cursor, filters)
+    if conditions is None:
+        return [], None
+    stmt = (
+        select(Todo)
+        .where(*conditions)
+        .order_by(Todo.due_date, Todo.id)
+        .limit(limit + 1)  # Lấy dư 1 dòng để biết còn trang sau hay không
+        .options(todo_load_options())
+    )
+    todos = list(db.scalars(stmt).all())
+    index_todo_tags(db, todos)
+    next_cursor = None
+    if len(todos) > limit:
+        todos = todos[:limit]
+        next_cursor = encode_todo_cursor(todos[-1])
+    return todos, next_cursor
+
+def load_todo_rows(db: Session, user_id: int, cursor: str | None = None, limit: int = TODO_PAGE_SIZE,
+                   filters: TodoFilter | None = None) -> tuple[list[tuple], str | None]:
+    """
+    Như load_todo_page, nhưng trả về các dòng tuple thuần thay cho đối tượng Todo (cho renderer nhanh,
+    xem views/Home/rows.py): cùng thứ tự, cùng con trỏ, cùng bộ lọc, cũng chỉ 2 câu lệnh SQL.
+
+    Args:
+        db (Session): Session SQLAlchemy đang mở.
+        user_id (int): ID của người dùng.
+        cursor (str | None): Con trỏ của trang trước (None để lấy trang đầu).
+        limit (int): Số dòng tối đa trên một trang.
+        filters (TodoFilter | None): Bộ lọc trạng thái, mức ưu tiên, hạn chót, nhãn.
+
+    Returns:
+        tuple[list[tuple], str | None]: Các dòng (id, title, status, due_date, tuple id nhãn theo thứ tự tag_id)
+        và con trỏ của trang kế tiếp (None nếu đã hết dữ liệu).
+    """
+    conditions = _todo_page_conditions(db, user_id, cursor, filters)
+    if conditions is None:
+        return [], None
+    stmt = (
+        select(Todo.id, Todo.title, Todo.status, Todo.due_date)
+        .where(*conditions)
+        .order_by(Todo.due_date, Todo.id)
+        .limit(limit + 1)
+    )
+    rows = db.execute(stmt).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_todo_position(rows[-1][3], rows[-1][0])
+    if not rows:
+        return [], None
+    # Id nhãn của cả trang bằng một câu lệnh (như selectinload), gom theo công việc
+    tag_ids: dict[int, list[int]] = {}
+    links = select(TodoTag.todo_id, TodoTag.tag_id).where(TodoTag.todo_id.in_([row[0] for row in rows]))
+    for todo_id, tag_id in db.execute(links.order_by(TodoTag.todo_id, TodoTag.tag_id)):
+        tag_ids.setdefault(todo_id, []).append(tag_id)
+    tag_index.ensure(db.connection(), {tag_id for ids in tag_ids.values() for tag_id in ids})
+    return [(todo_id, title, status, due, tuple(tag_ids.get(todo_id, ())))
+            for todo_id, title, status, due in rows], next_cursor
+
+def iter_todo_row_pages(engine, user_id: int, filters: TodoFilter | None = None,
+                        page_size: int = 500) -> Iterator[list[tuple]]:
+    """
+    Duyệt toàn bộ danh sách công việc của user theo từng trang dòng tuple (xem load_todo_rows).
+    Mỗi trang dùng một Session riêng, nên không giữ kết nối giữa hai lần lấy trang (ví dụ khi đang gửi response).
+
+    Args:
+        engine: Engine SQLAlchemy.
+        user_id (int): ID của người dùng.
+        filters (TodoFilter | None): Bộ lọc.
+        page_size (int): Số dòng mỗi trang.
+
+    Yields:
+        list[tuple]: Các dòng của từng trang (trang cuối có thể rỗng nếu user không có công việc nào).
+    """
+    cursor = None
+    while True:
+        with Session(engine) as db:
+            rows, cursor = load_todo_rows(db, user_id, cursor, page_size, filters)
+        yield rows
+        if cursor is None:
+            return
@@ -0,0 +1,74 @@
+# File search.py trong package models
+# Tìm kiếm toàn văn trên tiêu đề và mô tả công việc bằng bảng ảo FTS5 todos_fts
+# (được tạo và đồng bộ bằng trigger trong migration 3, xem models/migrations.py).
+
+import re  # Tách từ khóa người dùng nhập
+from sqlalchemy import text  # Câu lệnh SQL thuần cho truy vấn FTS5
+from sqlalchemy.orm import Session  # Session SQLAlchemy
+from models.repository import index_todo_tags, todo_load_options  # Nạp sẵn tags của các todo tìm được
+from models.todo import Todo  # Model Todo
+
+# Số kết quả trên mỗi trang tìm kiếm
+SEARCH_PAGE_SIZE = 20
+
+# Truy vấn FTS5: lọc theo user ngay trong chỉ mục (cột user_id), xếp hạng theo bm25
+# (tiêu đề được đánh trọng số cao hơn mô tả), bỏ qua các todo đã bị xóa mềm.
+_SEARCH_SQL = text("""
+    SELECT todos_fts.rowid
+    FROM todos_fts
+    JOIN todos ON todos.id = todos_fts.rowid
+    WHERE todos_fts MATCH :match
+      AND todos.user_id = :user_id
+      AND todos.is_deleted = 0
+    ORDER BY bm25(todos_fts, 10.0, 1.0, 0.0), todos_fts.rowid
+    LIMIT :limit OFFSET :offset
+""")
+
+def build_match_query(user_id: int, query: str) -> str | None:
+    """
+    Chuyển chuỗi người dùng nhập thành biểu thức MATCH an toàn của FTS5.
+    Mỗi từ được đặt trong dấu nháy kép (không để người dùng dùng cú pháp FTS5 gây lỗi),
+    từ cuối cùng được tìm theo tiền tố để hỗ trợ gõ tới đâu tìm tới đó.
+
+    Args:
+        user_id (int): ID của người dùng (giới hạn kết quả trong các todo của user này).
+        query (str): Chuỗi tìm kiếm.
+
+    Returns:
+        str | None: Biểu thức MATCH, hoặc None nếu chuỗi không có từ nào.
+    """
+    words = re.findall(r"\w+", query or "")
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return f'user_id : "{int(user_id)}" AND {{title description}} : ({" ".join(terms)})'
+
+def search_todos(db: Session, user_id: int, query: str, page: int = 1, limit: int = SEARCH_PAGE_SIZE) -> tuple[list[Todo], bool]:
+    """
+    Tìm các công việc của user có tiêu đề/mô tả khớp với chuỗi tìm kiếm, sắp xếp theo độ liên quan.
+
+    Args:
+        db (Session): Session SQLAlchemy đang mở.
+        user_id (int): ID của người dùng.
+        query (str): Chuỗi tìm kiếm.
+        page (int): Số trang (bắt đầu từ 1).
+        limit (int): Số kết quả trên mỗi trang.
+
+    Returns:
+        tuple[list[Todo], bool]: Các todo của trang (đã nạp sẵn tags) và cờ cho biết còn trang sau hay không.
+    """
+    match = build_match_query(user_id, query)
+    if match is None:
+        return [], False
+    page = max(page, 1)
+    params = {"match": match, "user_id": user_id, "limit": limit + 1, "offset": (page - 1) * limit}
+    ids = db.execute(_SEARCH_SQL, params).scalars().all()
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+    if not ids:
+        return [], False
+    # Nạp các todo theo id rồi sắp xếp lại đúng thứ tự xếp hạng của FTS5
+    todos = {todo.id: todo for todo in db.query(Todo).filter(Todo.id.in_(ids)).options(todo_load_options())}
+    index_todo_tags(db, todos.values())
+    return [todos[todo_id] for todo_id in ids if todo_id in todos], has_more
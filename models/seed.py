@@ -0,0 +1,156 @@
+# File seed.py trong package models
+# Tạo dữ liệu giả lập với kích thước như môi trường production (hàng triệu dòng) để đo hiệu năng.
+# - Ghi bằng executemany của Connection (câu INSERT tạo một lần, tham số dạng tuple), mỗi transaction
+#   chứa hàng trăm nghìn dòng.
+# - Dùng random.Random(seed) nên cùng tham số luôn sinh ra cùng một bộ dữ liệu.
+# - Trong lúc nạp, các trigger (FTS5, thống kê) được tạm gỡ bỏ rồi tạo lại, sau đó chỉ mục FTS5
+#   và bảng thống kê được tính lại một lần: nhanh hơn nhiều so với chạy trigger cho từng dòng.
+
+import random  # Sinh dữ liệu ngẫu nhiên có thể lặp lại
+import time  # Đo thời gian
+from datetime import datetime, timedelta  # Tạo các mốc thời gian
+from sqlalchemy import text  # Câu lệnh SQL thuần
+from models.data_version import bump_global_version  # Làm cũ mọi cache (của mọi tiến trình) sau khi nạp
+from models.stats import reconcile_stats  # Tính lại bảng thống kê
+from models.tag import Tag  # Model Tag
+from models.todo import Todo  # Model Todo
+from models.todo_tag import TodoTag  # Model TodoTag
+from models.user import User  # Model User
+
+# Số dòng trong mỗi transaction
+SEED_BATCH_SIZE = 200_000
+# Mật khẩu của mọi user được sinh ra
+SEED_PASSWORD = "123456"
+# Định dạng chuỗi mà SQLAlchemy dùng để lưu cột DateTime trong SQLite
+_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_TITLE_WORDS = ["Hoàn thành", "Chuẩn bị", "Kiểm tra", "Gửi", "Viết", "Đọc", "Họp", "Mua", "Sửa", "Lên kế hoạch"]
+_OBJECT_WORDS = ["báo cáo", "tài liệu", "email", "hợp đồng", "bài tập", "đồ tạp hóa", "dự án", "thiết kế", "hóa đơn", "slide"]
+_STATUSES = ("pending", "in_progress", "completed")
+
+def _insert_sql(table, columns: list[str]) -> str:
+    # Tạo câu INSERT một lần theo đúng thứ tự cột của tuple dữ liệu, dùng lại cho mọi lô
+    for name in columns:
+        table.c[name]  # Báo lỗi ngay nếu tên cột không tồn tại trong model
+    return f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+
+def _executemany(conn, sql: str, rows: list[tuple]):
+    # executemany ở mức driver: bỏ qua việc xử lý tham số kiểu dict của SQLAlchemy cho mỗi dòng
+    # (danh sách rỗng sẽ bị hiểu là câu lệnh không có tham số, nên bỏ qua)
+    if rows:
+        conn.exec_driver_sql(sql, rows)
+
+def _next_id(conn, table: str) -> int:
+    return (conn.exec_driver_sql(f"SELECT COALESCE(MAX(id), 0) FROM {table}").scalar() or 0) + 1
+
+def _drop_triggers(conn) -> list[str]:
+    # Gỡ các trigger trên todos/todo_tags, trả về câu lệnh CREATE để tạo lại sau khi nạp xong
+    rows = conn.exec_driver_sql("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('todos', 'todo_tags')").all()
+    for name, _ in rows:
+        conn.exec_driver_sql(f'DROP TRIGGER "{name}"')
+    return [sql for _, sql in rows]
+
+def seed_database(engine, users: int, todos_per_user: int, tags: int, tags_per_todo: int = 2,
+                  seed: int = 42, batch_size: int = SEED_BATCH_SIZE, log=print) -> dict:
+    """
+    Thêm dữ liệu giả lập vào database (không xóa dữ liệu hiện có).
+
+    Args:
+        engine: Engine SQLAlchemy (database đã được migrate).
+        users (int): Số user cần tạo.
+        todos_per_user (int): Số công việc của mỗi user.
+        tags (int): Số nhãn cần tạo.
+        tags_per_todo (int): Số nhãn tối đa gán cho mỗi công việc (ngẫu nhiên từ 0 đến giá trị này).
+        seed (int): Hạt giống ngẫu nhiên, để dữ liệu sinh ra luôn giống nhau.
+        batch_size (int): Số dòng trong mỗi transaction.
+        log: Hàm in tiến độ (mặc định print; truyền None để không in).
+
+    Returns:
+        dict: Số dòng đã tạo cho từng bảng và thời gian chạy (giây).
+    """
+    from models import hash_password  # Import muộn để tránh vòng lặp import với models/__init__.py
+    log = log or (lambda *args: None)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    now = datetime.now()
+    now_str = now.strftime(_DATETIME_FORMAT)
+    # Bảng các ngày hết hạn dựng sẵn (từ 60 ngày trước tới 120 ngày sau), tránh format datetime cho từng dòng
+    due_dates = [(now + timedelta(minutes=15 * i)).strftime(_DATETIME_FORMAT) for i in range(-60 * 96, 120 * 96)]
+    # Băm một lần rồi dùng chung cho mọi user giả lập (scrypt tốn hàng chục ms mỗi lần; dữ liệu chỉ để đo)
+    password = hash_password(SEED_PASSWORD)
+    counts = {"users": 0, "tags": 0, "todos": 0, "todo_tags": 0}
+
+    with engine.begin() as conn:
+        triggers = _drop_triggers(conn)
+        user_sql = _insert_sql(User.__table__, ["id", "login", "password", "name", "email", "is_admin", "created_at", "updated_at", "is_deleted"])
+        tag_sql = _insert_sql(Tag.__table__, ["id", "name", "description", "created_at", "updated_at", "is_deleted"])
+        todo_sql = _insert_sql(Todo.__table__, ["id", "title", "description", "status", "due_date", "priority", "user_id", "created_at", "updated_at", "is_deleted"])
+        link_sql = _insert_sql(TodoTag.__table__, ["todo_id", "tag_id", "created_at", "updated_at", "is_deleted"])
+        first_user = _next_id(conn, "users")
+        first_tag = _next_id(conn, "tags")
+        next_todo = _next_id(conn, "todos")
+
+    # Gỡ trigger xong thì mới bắt đầu nạp; dù lỗi giữa chừng vẫn tạo lại trigger và tính lại dữ liệu phụ
+    try:
+        with engine.begin() as conn:
+            for offset in range(first_user, first_user + users, batch_size):
+                _executemany(conn, user_sql, [
+                    (user_id, f"seed{user_id}", password, f"Người dùng {user_id}", f"seed{user_id}@example.com", 0, now_str, now_str, 0)
+                    for user_id in range(offset, min(offset + batch_size, first_user + users))
+                ])
+            counts["users"] = users
+            _executemany(conn, tag_sql, [(first_tag + i, f"seed-tag-{first_tag + i}", None, now_str, now_str, 0) for i in range(tags)])
+            counts["tags"] = tags
+        log(f"Đã tạo {users} user và {tags} nhãn.")
+
+        tag_ids = range(first_tag, first_tag + tags)
+        todo_rows, link_rows = [], []
+        conn = engine.connect()
+        try:
+            # Tắt fsync cho kết nối nạp dữ liệu: nếu máy sập giữa chừng thì chỉ cần chạy lại
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            for user_id in range(first_user, first_user + users):
+                for _ in range(todos_per_user):
+                    title = f"{rng.choice(_TITLE_WORDS)} {rng.choice(_OBJECT_WORDS)} {next_todo}"
+                    todo_rows.append((next_todo, title, f"Mô tả cho {title.lower()}", rng.choice(_STATUSES),
+                                      rng.choice(due_dates), rng.randint(1, 5), user_id, now_str, now_str, 0))
+                    if tags:
+                        for tag_id in rng.sample(tag_ids, rng.randint(0, min(tags_per_todo, tags))):
+                            link_rows.append((next_todo, tag_id, now_str, now_str, 0))
+                    next_todo += 1
+                if len(todo_rows) + len(link_rows) >= batch_size:
+                    _executemany(conn, todo_sql, todo_rows)
+                    _executemany(conn, link_sql, link_rows)
+                    conn.commit()
+                    counts["todos"] += len(todo_rows)
+                    counts["todo_tags"] += len(link_rows)
+                    todo_rows, link_rows = [], []
+                    log(f"    {counts['todos']} công việc, {counts['todo_tags']} liên kết nhãn ({time.perf_counter() - start:.1f}s)")
+            if todo_rows:
+                _executemany(conn, todo_sql, todo_rows)
+            if link_rows:
+                _executemany(conn, link_sql, link_rows)
+            conn.commit()
+            counts["todos"] += len(todo_rows)
+            counts["todo_tags"] += len(link_rows)
+        finally:
+            conn.rollback()
+            # Trả lại chế độ đồng bộ mặc định trước khi kết nối quay về pool
+            conn.exec_driver_sql("PRAGMA synchronous = NORMAL")
+            conn.close()
+    finally:
+        log("Đang tạo lại trigger, chỉ mục tìm kiếm và bảng thống kê...")
+        with engine.begin() as conn:
+            for sql in triggers:
+                conn.exec_driver_sql(sql)
+            if conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'todos_fts'").first():
+                conn.execute(text("INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')"))
+        reconcile_stats(engine, fix=True)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+            # Trigger phiên bản dữ liệu đã bị gỡ trong lúc nạp
+            bump_global_version(conn)
+
+    counts["seconds"] = round(time.perf_counter() - start, 2)
+    log(f"Hoàn tất: {counts}")
+    return counts
@@ -0,0 +1,241 @@
+# File session_store.py trong package models
+# Nơi lưu session phía server. Cookie của trình duyệt chỉ chứa một ID ngẫu nhiên (không đoán được),
+# nội dung session (login, user_id, name, ...) nằm ở đây (xem views/sessions.py cho middleware).
+# Có hai loại:
+# - MemorySessionStore: LRU trong bộ nhớ tiến trình; nhanh nhất nhưng chỉ dùng được với 1 worker
+#   và mất hết khi khởi động lại.
+# - SqliteSessionStore: bảng sessions trong một file SQLite RIÊNG (mặc định <tên database>.sessions.db, xem
+#   session_db_url), dùng chung giữa các worker và giữ được qua khởi động lại. Không đặt chung file với dữ liệu:
+#   mỗi lần ghi session (save/touch) sẽ đổi PRAGMA data_version của file đó, làm bản sao phiên bản dữ liệu
+#   (models/data_version.py) của mọi worker bị xóa và các đường đi nhanh (304 không truy vấn, chỉ mục nhãn)
+#   phải đọc lại bảng ở gần như mọi request.
+# Mỗi session có thời điểm hết hạn expires_at; khi người dùng còn hoạt động thì được gia hạn (touch),
+# nhưng việc gia hạn chỉ được ghi tối đa một lần mỗi touch_interval (không ghi ở mỗi request).
+
+import json  # Lưu nội dung session dạng JSON
+import os  # Tách phần mở rộng của tên file database
+import secrets  # Sinh ID session ngẫu nhiên
+import threading  # Khóa cho store trong bộ nhớ
+import time  # Thời gian hết hạn
+from abc import ABC, abstractmethod  # Giao diện chung của các store
+from collections import OrderedDict  # LRU
+from sqlalchemy import text  # Câu lệnh SQL thuần
+from sqlalchemy.engine import make_url  # Đổi tên file trong chuỗi kết nối
+from models.engine import _is_memory_db, make_engine  # Engine của database session
+
+# Không hoạt động quá 15 phút thì session hết hạn (giữ đúng hành vi cũ của require_login)
+SESSION_IDLE_TIMEOUT = 15 * 60
+# Chỉ ghi lại thời điểm hoạt động (gia hạn) tối đa một lần mỗi 60 giây cho mỗi session
+SESSION_TOUCH_INTERVAL = 60
+# Số session bị xóa trong mỗi lô khi dọn dẹp
+SWEEP_BATCH_SIZE = 1000
+
+# Schema của database session (tạo nếu chưa có khi mở store)
+_SESSION_SCHEMA = [
+    # data: nội dung session dạng JSON; expires_at: thời điểm hết hạn (giây kể từ epoch),
+    # được gia hạn khi người dùng còn hoạt động
+    """CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID""",
+    # Dọn các session hết hạn theo lô mà không quét toàn bảng
+    "CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions (expires_at)",
+]
+
+def session_db_url(db_url: str) -> str:
+    """
+    Chuỗi kết nối mặc định của database session, nằm cạnh database dữ liệu:
+    "sqlite+pysqlite:///todo_app.db" -> "sqlite+pysqlite:///todo_app.sessions.db".
+    Database trong bộ nhớ thì dùng một database trong bộ nhớ khác (engine riêng).
+    """
+    if _is_memory_db(db_url):
+        return db_url
+    url = make_url(db_url)
+    stem, ext = os.path.splitext(url.database)
+    return url.set(database=f"{stem}.sessions{ext or '.db'}").render_as_string(hide_password=False)
+
+def make_session_engine(db_config: dict, url: str = ""):
+    """
+    Tạo engine cho database session với cùng cấu hình (PRAGMA, pool) như database dữ liệu.
+
+    Args:
+        db_config (dict): Cấu hình database dữ liệu (xem models.engine.load_db_config).
+        url (str): Chuỗi kết nối của database session (rỗng = session_db_url(db_config["url"])).
+    """
+    return make_engine({**db_config, "url": url or session_db_url(db_config["url"])})
+
+def new_session_id() -> str:
+    """Sinh một ID session mới (256 bit ngẫu nhiên, an toàn để đặt trong URL/cookie)."""
+    return secrets.token_urlsafe(32)
+
+class SessionStore(ABC):
+    """
+    Giao diện chung của các nơi lưu session. Lớp con phải cài đặt đủ các phương thức trừu tượng,
+    nếu thiếu thì báo TypeError ngay khi tạo store (không phải giữa chừng một request).
+
+    Args:
+        idle_timeout (float): Số giây không hoạt động trước khi session hết hạn.
+    """
+
+    # True nếu các thao tác có thể chặn (I/O database): middleware sẽ chạy chúng trong threadpool
+    blocking = False
+
+    def __init__(self, idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+
+    @abstractmethod
+    def load(self, session_id: str) -> tuple[dict, float] | None:
+        """Đọc session còn hạn; trả về (nội dung, thời điểm hết hạn) hoặc None."""
+
+    @abstractmethod
+    def save(self, session_id: str, data: dict) -> float:
+        """Ghi (tạo mới hoặc thay thế) nội dung session và gia hạn nó; trả về thời điểm hết hạn mới."""
+
+    @abstractmethod
+    def touch(self, session_id: str) -> float:
+        """Gia hạn session mà không ghi lại nội dung; trả về thời điểm hết hạn mới."""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Xóa session (đăng xuất)."""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Xóa các session đã hết hạn; trả về số session đã xóa."""
+
+class MemorySessionStore(SessionStore):
+    """
+    Lưu session trong bộ nhớ tiến trình (LRU): session ít được dùng gần đây nhất bị loại khi vượt quá maxsize.
+    Chỉ phù hợp khi chạy một worker.
+
+    Args:
+        maxsize (int): Số session tối đa.
+        idle_timeout (float): Số giây không hoạt động trước khi session hết hạn.
+    """
+
+    def __init__(self, maxsize: int = 100_000, idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        super().__init__(idle_timeout)
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, list] = OrderedDict()  # id -> [nội dung, thời điểm hết hạn]
+        self._lock = threading.Lock()
+
+    def load(self, session_id):
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._data[session_id]
+                return None
+            self._data.move_to_end(session_id)
+            # Trả về bản sao để thay đổi trong request không lọt vào store trước khi save
+            return dict(entry[0]), entry[1]
+
+    def save(self, session_id, data):
+        expires_at = time.time() + self.idle_timeout
+        with self._lock:
+            self._data[session_id] = [dict(data), expires_at]
+            self._data.move_to_end(session_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return expires_at
+
+    def touch(self, session_id):
+        expires_at = time.time() + self.idle_timeout
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is not None:
+                entry[1] = expires_at
+        return expires_at
+
+    def delete(self, session_id):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [session_id for session_id, entry in self._data.items() if entry[1] <= now]
+            for session_id in expired:
+                del self._data[session_id]
+        return len(expired)
+
+class SqliteSessionStore(SessionStore):
+    """
+    Lưu session trong bảng sessions của database session (dùng chung giữa các worker).
+
+    Args:
+        engine: Engine SQLAlchemy của database session (xem make_session_engine), không phải database dữ liệu.
+            Bảng sessions được tạo nếu chưa có.
+        idle_timeout (float): Số giây không hoạt động trước khi session hết hạn.
+    """
+
+    blocking = True
+
+    def __init__(self, engine, idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        super().__init__(idle_timeout)
+        self.engine = engine
+        with engine.begin() as conn:
+            for statement in _SESSION_SCHEMA:
+                conn.execute(text(statement))
+
+    def load(self, session_id):
+        with self.engine.connect() as conn:
+            row = conn.execute(text("SELECT data, expires_at FROM sessions WHERE id = :id AND expires_at > :now"),
+                               {"id": session_id, "now": time.time()}).first()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def save(self, session_id, data):
+        expires_at = time.time() + self.idle_timeout
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO sessions (id, data, expires_at) VALUES (:id, :data, :expires_at)
+                ON CONFLICT (id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at
+            """), {"id": session_id, "data": json.dumps(data, ensure_ascii=False), "expires_at": expires_at})
+        return expires_at
+
+    def touch(self, session_id):
+        expires_at = time.time() + self.idle_timeout
+        with self.engine.begin() as conn:
+            conn.execute(text("UPDATE sessions SET expires_at = :expires_at WHERE id = :id"),
+                         {"id": session_id, "expires_at": expires_at})
+        return expires_at
+
+    def delete(self, session_id):
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM sessions WHERE id = :id"), {"id": session_id})
+
+    def sweep(self):
+        # Xóa theo lô, mỗi lô một transaction ngắn để không giữ khóa ghi lâu
+        deleted = 0
+        while True:
+            with self.engine.begin() as conn:
+                count = conn.execute(text("""
+                    DELETE FROM sessions WHERE id IN (
+                        SELECT id FROM sessions WHERE expires_at <= :now LIMIT :limit
+                    )
+                """), {"now": time.time(), "limit": SWEEP_BATCH_SIZE}).rowcount
+            deleted += count
+            if count < SWEEP_BATCH_SIZE:
+                return deleted
+
+def make_session_store(backend: str, engine=None, idle_timeout: float = SESSION_IDLE_TIMEOUT) -> SessionStore:
+    """
+    Tạo nơi lưu session theo tên.
+
+    Args:
+        backend (str): "sqlite" hoặc "memory".
+        engine: Engine SQLAlchemy của database session (bắt buộc với "sqlite", xem make_session_engine).
+        idle_timeout (float): Số giây không hoạt động trước khi session hết hạn.
+
+    Returns:
+        SessionStore: Nơi lưu session.
+    """
+    if backend == "memory":
+        return MemorySessionStore(idle_timeout=idle_timeout)
+    if backend == "sqlite":
+        return SqliteSessionStore(engine, idle_timeout=idle_timeout)
+    raise ValueError(f"Không hỗ trợ session backend: {backend}")
@@ -0,0 +1,49 @@
+# File soft_delete.py trong package models
+# Lọc "xóa mềm" (soft delete) mặc định cho mọi truy vấn ORM.
+# - Mọi bảng có cột is_deleted/deleted_at (xem ModelBase). Xóa mềm là UPDATE is_deleted = 1, deleted_at = now;
+#   các dòng này được models/purge.py xóa hẳn sau thời gian lưu giữ.
+# - Sự kiện do_orm_execute của Session thêm điều kiện is_deleted = 0 cho MỌI câu SELECT của ORM, kể cả
+#   các câu nạp quan hệ (selectinload, joinedload, lazy load), nên trang chủ không còn hiện dòng đã xóa.
+#   Muốn đọc cả dòng đã xóa: .execution_options(include_deleted=True).
+# - Điều kiện được viết thành "is_deleted = 0" (hằng số trong câu SQL, không phải tham số ?) để khớp đúng
+#   điều kiện của các partial index trên dòng còn sống (migration 2 và 8).
+# - Truy vấn Core (conn.execute(select(...)), text(...)) không đi qua Session: dùng live(...) hoặc ghi rõ điều kiện.
+
+from datetime import datetime  # Thời điểm xóa
+from sqlalchemy import event, literal_column  # Sự kiện ORM, hằng số SQL
+from sqlalchemy.orm import Session, with_loader_criteria  # Thêm điều kiện cho mọi entity của câu truy vấn
+from models.model_base import ModelBase  # Lớp cơ sở có cột is_deleted
+
+# Tùy chọn thực thi để bỏ qua bộ lọc (trang quản trị, công cụ dọn dẹp)
+INCLUDE_DELETED = "include_deleted"
+
+def live(model):
+    """
+    Điều kiện "dòng còn sống" cho một model hoặc bảng, dùng trong truy vấn Core.
+
+    Args:
+        model: Lớp model (ví dụ Todo) hoặc đối tượng Table/alias.
+
+    Returns:
+        Biểu thức SQL "<bảng>.is_deleted = 0".
+    """
+    column = model.is_deleted if hasattr(model, "is_deleted") else model.c.is_deleted
+    return column == literal_column("0")
+
+def soft_delete_values() -> dict:
+    """Giá trị cần ghi khi xóa mềm một dòng (dùng với update(...).values(**soft_delete_values()))."""
+    return {"is_deleted": 1, "deleted_at": datetime.now()}
+
+@event.listens_for(Session, "do_orm_execute")
+def _filter_deleted(execute_state):
+    # Chỉ áp dụng cho câu SELECT gốc: các câu nạp cột/quan hệ sau đó tự nhận điều kiện từ câu gốc
+    # (with_loader_criteria được truyền tiếp cho các loader)
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get(INCLUDE_DELETED, False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(ModelBase, lambda cls: cls.is_deleted == literal_column("0"), include_aliases=True)
+        )
@@ -0,0 +1,91 @@
+# File stats.py trong package models
+# Đọc và đối soát (reconcile) các bảng thống kê được duy trì tăng dần bằng trigger
+# (user_todo_stats, tag_usage_stats — xem migration 4 trong models/migrations.py).
+# Đọc số liệu chỉ là tra cứu theo khóa chính, không cần GROUP BY trên bảng todos/todo_tags.
+
+from datetime import datetime  # Thời điểm hiện tại để tính công việc quá hạn
+from sqlalchemy import DateTime, bindparam, text  # Câu lệnh SQL thuần
+
+# Các trạng thái công việc (khớp với CheckConstraint của cột Todo.status)
+STATUSES = ("pending", "in_progress", "completed")
+
+# Đếm công việc quá hạn; tham số :now được chuyển đổi theo kiểu DateTime của SQLAlchemy
+# để có cùng định dạng chuỗi với cột due_date
+_OVERDUE_SQL = text("""
+    SELECT COUNT(*) FROM todos
+    WHERE user_id = :user_id AND status IN ('pending', 'in_progress')
+      AND due_date < :now AND is_deleted = 0
+""").bindparams(bindparam("now", type_=DateTime))
+
+def get_user_stats(conn, user_id: int) -> dict:
+    """
+    Lấy số công việc của một user theo trạng thái và số công việc quá hạn.
+
+    Số theo trạng thái đọc từ bảng user_todo_stats (tối đa 3 dòng theo khóa chính).
+    Số quá hạn phụ thuộc vào thời điểm hiện tại nên không thể lưu sẵn; nó được đếm bằng
+    một lần quét theo khoảng trên partial index ix_todos_user_status_live (user_id, status, due_date),
+    chỉ chạm tới các todo thực sự quá hạn.
+
+    Args:
+        conn: Connection (hoặc Session) SQLAlchemy.
+        user_id (int): ID của người dùng.
+
+    Returns:
+        dict: {"pending": n, "in_progress": n, "completed": n, "total": n, "overdue": n}
+    """
+    stats = dict.fromkeys(STATUSES, 0)
+    rows = conn.execute(text("SELECT status, count FROM user_todo_stats WHERE user_id = :user_id"), {"user_id": user_id})
+    for status, count in rows:
+        stats[status] = count
+    stats["total"] = sum(stats[status] for status in STATUSES)
+    stats["overdue"] = conn.execute(_OVERDUE_SQL, {"user_id": user_id, "now": datetime.now()}).scalar()
+    return stats
+
+# Câu truy vấn tính lại số liệu từ đầu (dùng khi đối soát)
+_USER_STATS_SQL = """
+    SELECT user_id, status, COUNT(*) FROM todos
+    WHERE COALESCE(is_deleted, 0) = 0 AND user_id IS NOT NULL
+    GROUP BY user_id, status
+"""
+_TAG_STATS_SQL = """
+    SELECT tag_id, COUNT(*) FROM todo_tags
+    WHERE COALESCE(is_deleted, 0) = 0 AND tag_id IS NOT NULL
+    GROUP BY tag_id
+"""
+
+def _diff(expected: dict, stored: dict) -> list[tuple]:
+    # So sánh hai dict khóa -> số đếm, bỏ qua các khóa có giá trị 0 ở cả hai phía
+    drift = []
+    for key in sorted(set(expected) | set(stored), key=repr):
+        if expected.get(key, 0) != stored.get(key, 0):
+            drift.append((key, stored.get(key, 0), expected.get(key, 0)))
+    return drift
+
+def reconcile_stats(engine, fix: bool = True) -> dict:
+    """
+    Tính lại toàn bộ số liệu thống kê từ bảng gốc, so sánh với bảng thống kê và báo sai lệch.
+    Toàn bộ việc so sánh (và sửa, nếu fix=True) diễn ra trong một transaction ghi,
+    nên không có thay đổi nào chen vào giữa lúc tính và lúc ghi lại.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        fix (bool): Ghi lại bảng thống kê bằng số liệu vừa tính nếu có sai lệch.
+
+    Returns:
+        dict: {"users": [((user_id, status), đang lưu, đúng), ...], "tags": [(tag_id, đang lưu, đúng), ...]}
+    """
+    with engine.begin() as conn:
+        # Giữ khóa ghi ngay từ đầu để số liệu không thay đổi trong lúc đối soát
+        conn.exec_driver_sql("UPDATE user_todo_stats SET count = count WHERE 0")
+        expected_users = {(user_id, status): count for user_id, status, count in conn.execute(text(_USER_STATS_SQL))}
+        stored_users = {(user_id, status): count for user_id, status, count in conn.execute(text("SELECT user_id, status, count FROM user_todo_stats"))}
+        expected_tags = {tag_id: count for tag_id, count in conn.execute(text(_TAG_STATS_SQL))}
+        stored_tags = {tag_id: count for tag_id, count in conn.execute(text("SELECT tag_id, count FROM tag_usage_stats"))}
+
+        drift = {"users": _diff(expected_users, stored_users), "tags": _diff(expected_tags, stored_tags)}
+        if fix and (drift["users"] or drift["tags"]):
+            conn.execute(text("DELETE FROM user_todo_stats"))
+            conn.execute(text(f"INSERT INTO user_todo_stats (user_id, status, count) {_USER_STATS_SQL}"))
+            conn.execute(text("DELETE FROM tag_usage_stats"))
+            conn.execute(text(f"INSERT INTO tag_usage_stats (tag_id, count) {_TAG_STATS_SQL}"))
+    return drift
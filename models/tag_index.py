@@ -0,0 +1,225 @@
+# File tag_index.py trong package models
+# Chỉ mục nhãn (tag) trong bộ nhớ, dùng chung cho toàn tiến trình.
+# Bảng tags nhỏ, được đọc ở mọi trang nhưng hiếm khi thay đổi, nên thay vì JOIN/lazy load bảng tags mỗi lần
+# hiển thị công việc, ta giữ sẵn:
+# - id -> tên và tên -> id (dict, tra cứu O(1)),
+# - danh sách (khóa so sánh, id) đã sắp xếp để tìm theo tiền tố bằng bisect (O(log n) + số kết quả).
+#   Khóa so sánh là tên viết thường, bỏ dấu tiếng Việt ("Công việc" -> "cong viec"), nên gõ "cong" vẫn tìm thấy.
+# Cập nhật:
+# - Mọi thay đổi trên bảng tags (ở bất kỳ tiến trình nào) đều tăng phiên bản chung (trigger tags_version_*,
+#   xem models/data_version.py). Khi phiên bản đổi, chỉ nạp thêm các nhãn có id lớn hơn id lớn nhất đã biết
+#   (nhãn mới tạo); nếu phiên bản TAGS_SCOPE cũng đổi (nhãn bị sửa/xóa, hoặc database được khởi tạo lại,
+#   migration 8) thì nạp lại toàn bộ.
+# - Nhãn chưa có trong chỉ mục (ví dụ vừa được tạo trong transaction đang đọc) được nạp theo id khi cần
+#   (xem TagIndex.ensure), nên việc hiển thị không bao giờ thiếu tên nhãn.
+
+import threading  # Khóa để dùng an toàn giữa nhiều thread
+import unicodedata  # Bỏ dấu tiếng Việt trong khóa so sánh
+from bisect import bisect_left, insort  # Tìm/chèn trong danh sách đã sắp xếp
+from sqlalchemy import bindparam, text  # Câu lệnh SQL thuần
+from models.data_version import GLOBAL_SCOPE, TAGS_SCOPE, peek_scope_version, read_scope_versions  # Phát hiện thay đổi bảng tags
+
+# Số gợi ý tối đa trả về cho một tiền tố
+TAG_SUGGESTION_LIMIT = 10
+
+_LOAD_TAGS = text("SELECT id, name FROM tags WHERE is_deleted = 0 AND id > :after ORDER BY id")
+_LOAD_TAGS_BY_ID = text("SELECT id, name FROM tags WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+
+def _build_fold_table() -> dict[int, int | None]:
+    # Bảng thay ký tự Latin có dấu (kể cả tiếng Việt: U+00C0-U+024F, U+1E00-U+1EFF) bằng chữ không dấu,
+    # và bỏ các dấu rời (U+0300-U+036F); str.translate nhanh hơn nhiều so với normalize("NFD") cho từng tên
+    table = {ord("đ"): "d", ord("Đ"): "D"}
+    for code in (*range(0xC0, 0x250), *range(0x1E00, 0x1F00)):
+        base = "".join(ch for ch in unicodedata.normalize("NFD", chr(code)) if not unicodedata.combining(ch))
+        if base and base != chr(code):
+            table[code] = base
+    table.update({code: None for code in range(0x300, 0x370)})
+    return table
+
+_FOLD_TABLE = _build_fold_table()
+
+def fold_tag_name(name: str) -> str:
+    """
+    Khóa so sánh của một tên nhãn: viết thường và bỏ dấu ("Đi chợ" -> "di cho").
+
+    Args:
+        name (str): Tên nhãn hoặc tiền tố người dùng gõ.
+
+    Returns:
+        str: Khóa dùng để sắp xếp và tìm theo tiền tố.
+    """
+    if name.isascii():
+        return name.lower()
+    return name.casefold().translate(_FOLD_TABLE)
+
+class TagIndex:
+    """
+    Chỉ mục id <-> tên của các nhãn còn sống, kèm danh sách đã sắp xếp để gợi ý theo tiền tố.
+    Đọc (name, search_prefix) không truy vấn database; ensure/sync đọc database khi dữ liệu đã đổi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names: dict[int, str] = {}  # id -> tên
+        self._ids: dict[str, int] = {}  # tên -> id
+        self._sorted: list[tuple[str, int]] = []  # (khóa so sánh, id), sắp xếp tăng dần
+        self._max_id = 0  # id lớn nhất đã nạp bằng _LOAD_TAGS
+        self._changes = None  # Phiên bản TAGS_SCOPE (sửa/xóa nhãn) của dữ liệu trong chỉ mục
+        self.version = None  # Phiên bản chung (GLOBAL_SCOPE) của dữ liệu trong chỉ mục
+        self.reloads = 0  # Số lần nạp lại toàn bộ
+        self.refreshes = 0  # Số lần chỉ nạp thêm nhãn mới
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def is_current(self) -> bool:
+        """True nếu chỉ mục chắc chắn đã khớp phiên bản chung hiện tại (chỉ hỏi bản sao của bộ theo dõi, không truy vấn)."""
+        return self.version is not None and peek_scope_version(GLOBAL_SCOPE) == self.version
+
+    # --- Đọc (không truy vấn database) ---
+
+    def name(self, tag_id: int) -> str:
+        """Tên của nhãn theo id (chuỗi rỗng nếu không có trong chỉ mục)."""
+        return self._names.get(tag_id, "")
+
+    def tag_id(self, name: str) -> int | None:
+        """Id của nhãn theo tên chính xác (None nếu không có)."""
+        return self._ids.get(name)
+
+    def find_ids(self, name: str) -> list[int]:
+        """
+        Các id nhãn ứng với một tên người dùng gõ: đúng tên nếu có, nếu không thì mọi nhãn có cùng khóa
+        so sánh (không phân biệt hoa thường và dấu, ví dụ "cong viec" -> "Công việc").
+
+        Returns:
+            list[int]: Các id tìm được (rỗng nếu không có nhãn nào).
+        """
+        tag_id = self._ids.get(name)
+        if tag_id is not None:
+            return [tag_id]
+        key = fold_tag_name(name.strip())
+        if not key:
+            return []
+        with self._lock:
+            entries = self._sorted
+            start = bisect_left(entries, (key,))
+            end = bisect_left(entries, (key, float("inf")), lo=start)
+            return [tag_id for _, tag_id in entries[start:end]]
+
+    def search_prefix(self, prefix: str, limit: int = TAG_SUGGESTION_LIMIT) -> list[tuple[int, str]]:
+        """
+        Tìm các nhãn có tên bắt đầu bằng prefix (không phân biệt hoa thường và dấu).
+
+        Args:
+            prefix (str): Tiền tố người dùng gõ.
+            limit (int): Số kết quả tối đa.
+
+        Returns:
+            list[tuple[int, str]]: Các cặp (id, tên) theo thứ tự khóa so sánh.
+        """
+        key = fold_tag_name(prefix.strip())
+        if not key:
+            return []
+        with self._lock:
+            entries = self._sorted
+            start = bisect_left(entries, (key,))
+            found = []
+            for folded, tag_id in entries[start:start + limit]:
+                if not folded.startswith(key):
+                    break
+                found.append((tag_id, self._names[tag_id]))
+        return found
+
+    # --- Nạp/cập nhật từ database ---
+
+    def load(self, conn, versions: tuple[int, int] | None = None):
+        """
+        Nạp lại toàn bộ chỉ mục từ bảng tags (một truy vấn), rồi thay cấu trúc cũ bằng cấu trúc mới.
+
+        Args:
+            conn: Connection SQLAlchemy.
+            versions (tuple[int, int] | None): Phiên bản (GLOBAL_SCOPE, TAGS_SCOPE) tương ứng với dữ liệu vừa đọc.
+        """
+        rows = conn.execute(_LOAD_TAGS, {"after": 0}).all()
+        names = dict(rows)
+        entries = sorted(zip(map(fold_tag_name, names.values()), names))
+        with self._lock:
+            self._names = names
+            self._ids = dict(zip(names.values(), names))
+            self._sorted = entries
+            self._max_id = rows[-1][0] if rows else 0
+            self.version, self._changes = versions or (None, None)
+            self.reloads += 1
+
+    def _add(self, tag_id: int, name: str):
+        # Gọi khi đang giữ khóa: thêm/cập nhật một nhãn
+        old = self._names.get(tag_id)
+        if old == name:
+            return
+        if old is not None:
+            self._sorted.remove((fold_tag_name(old), tag_id))
+            self._ids.pop(old, None)
+        self._names[tag_id] = name
+        self._ids[name] = tag_id
+        insort(self._sorted, (fold_tag_name(name), tag_id))
+
+    def sync(self, conn):
+        """
+        Cập nhật chỉ mục nếu bảng tags đã thay đổi kể từ lần đồng bộ trước (theo phiên bản chung).
+        Thường không tốn truy vấn nào; khi có nhãn mới chỉ đọc các dòng có id lớn hơn id đã biết.
+
+        Args:
+            conn: Connection SQLAlchemy (nên là kết nối đang dùng để đọc công việc, để cùng một snapshot).
+        """
+        # Hỏi bản sao của bộ theo dõi trước (không tốn truy vấn); nếu có vẻ đã đổi thì đọc phiên bản bằng conn,
+        # để phiên bản ghi nhận khớp đúng với snapshot mà conn nhìn thấy
+        if self.is_current():
+            return
+        versions = read_scope_versions(conn, GLOBAL_SCOPE, TAGS_SCOPE)
+        if versions[0] == self.version:
+            return
+        if self.version is None or versions[1] != self._changes:
+            # Chưa nạp lần nào, hoặc nhãn bị sửa/xóa: nạp lại toàn bộ
+            self.load(conn, versions)
+            return
+        rows = conn.execute(_LOAD_TAGS, {"after": self._max_id}).all()
+        with self._lock:
+            for tag_id, name in rows:
+                self._add(tag_id, name)
+            if rows:
+                self._max_id = rows[-1][0]
+            self.version = versions[0]
+            self.refreshes += 1
+
+    def ensure(self, conn, tag_ids):
+        """
+        Đồng bộ chỉ mục rồi nạp thêm (theo id) các nhãn còn thiếu, để mọi id trong tag_ids đều có tên.
+
+        Args:
+            conn: Connection SQLAlchemy.
+            tag_ids: Các id nhãn cần hiển thị.
+        """
+        self.sync(conn)
+        missing = {tag_id for tag_id in tag_ids if tag_id not in self._names}
+        if missing:
+            rows = conn.execute(_LOAD_TAGS_BY_ID, {"ids": sorted(missing)}).all()
+            with self._lock:
+                for tag_id, name in rows:
+                    self._add(tag_id, name)
+
+    def clear(self):
+        """Xóa toàn bộ chỉ mục (lần đồng bộ sau sẽ nạp lại từ đầu)."""
+        with self._lock:
+            self._names = {}
+            self._ids = {}
+            self._sorted = []
+            self._max_id = 0
+            self._changes = None
+            self.version = None
+
+    def stats(self) -> dict:
+        """Trả về số liệu: số nhãn, số lần nạp lại toàn bộ và số lần nạp thêm."""
+        return {"size": len(self._names), "reloads": self.reloads, "refreshes": self.refreshes}
+
+# Chỉ mục dùng chung cho toàn tiến trình
+tag_index = TagIndex()
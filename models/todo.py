@@ -58,7 +58,9 @@ class Todo(ModelBase):
     # - relationship("TodoTag", ...): Thiết lập mối quan hệ một-nhiều (one-to-many) từ Todo đến TodoTag.
     #   + "TodoTag": Tên lớp của bảng trung gian.
     #   + back_populates="todo": Liên kết hai chiều với thuộc tính 'todo' trong lớp 'TodoTag'.
-    tags: Mapped[list["TodoTag"]] = relationship("TodoTag", back_populates="todo")
+    #   + order_by="TodoTag.tag_id": Thứ tự nhãn cố định (đi theo index (todo_id, tag_id)), giống thứ tự
+    #     mà renderer nhanh dùng (views/Home/rows.py), nên hai cách render cho ra cùng một HTML.
+    tags: Mapped[list["TodoTag"]] = relationship("TodoTag", back_populates="todo", order_by="TodoTag.tag_id")
 
     # Mối quan hệ với bảng 'users'.
     # - Mapped["User"]: 'user' là một đối tượng User duy nhất.
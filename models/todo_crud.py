@@ -0,0 +1,189 @@
+# File todo_crud.py trong package models
+# Các thao tác ghi trên một công việc (tạo, sửa, đổi trạng thái, xóa, gắn/bỏ nhãn) cho các route HTMX.
+# Mỗi thao tác chỉ chạm tới các dòng thực sự thay đổi:
+# - Sửa/đổi trạng thái là MỘT câu UPDATE theo (id, user_id), không nạp lại danh sách công việc của user.
+#   Cột updated_at được cập nhật bởi onupdate của ModelBase (Core cũng áp dụng onupdate của cột).
+# - Điều kiện user_id nằm ngay trong câu lệnh, nên user không thể sửa công việc của người khác.
+# - Các câu lệnh ở đây là Core (không qua bộ lọc xóa mềm của ORM): công việc đã xóa được loại bằng live(Todo).
+#   Xóa công việc là xóa mềm; models/purge.py xóa hẳn sau thời gian lưu giữ.
+# Bảng thống kê, chỉ mục FTS và phiên bản dữ liệu (cache, ETag) được các trigger cập nhật trong cùng transaction.
+# Mọi hàm nhận conn là Connection SQLAlchemy đang mở transaction (ví dụ engine.begin()).
+
+from datetime import datetime  # Thời điểm tạo/sửa và chuyển đổi due_date
+from sqlalchemy import DateTime, bindparam, case, delete, insert, select, text, update  # Câu lệnh Core
+from models.todo import Todo  # Model Todo
+from models.soft_delete import live, soft_delete_values  # Điều kiện dòng còn sống, giá trị khi xóa mềm
+from models.todo_io import VALID_STATUSES, ensure_tags  # Trạng thái hợp lệ, tạo nhãn còn thiếu
+from models.todo_tag import TodoTag  # Model TodoTag
+
+# Thứ tự chuyển trạng thái khi bấm nút "đổi trạng thái"
+STATUS_CYCLE = {"pending": "in_progress", "in_progress": "completed", "completed": "pending"}
+
+# Gắn nhãn: chỉ thêm khi công việc thuộc về user và chưa có liên kết này (một câu lệnh, không cần đọc trước)
+_LINK_TAG = text("""
+    INSERT INTO todo_tags (todo_id, tag_id, created_at, updated_at, is_deleted)
+    SELECT :todo_id, :tag_id, :now, :now, 0
+    WHERE EXISTS (SELECT 1 FROM todos WHERE id = :todo_id AND user_id = :user_id AND is_deleted = 0)
+      AND NOT EXISTS (SELECT 1 FROM todo_tags WHERE todo_id = :todo_id AND tag_id = :tag_id)
+""").bindparams(bindparam("now", type_=DateTime))
+
+def clean_todo_values(record: dict) -> dict:
+    """
+    Kiểm tra và chuẩn hóa các trường của công việc có trong record (dữ liệu form).
+    Chỉ các trường có mặt mới được trả về, nên dùng được cho cả sửa một phần.
+
+    Args:
+        record (dict): Dữ liệu gửi lên (title, description, status, priority, due_date).
+
+    Returns:
+        dict: Các giá trị đã chuẩn hóa, dùng trực tiếp cho INSERT/UPDATE.
+
+    Raises:
+        ValueError: Nếu một trường không hợp lệ (thông báo dùng được để hiển thị cho người dùng).
+    """
+    values = {}
+    if "title" in record:
+        title = (record["title"] or "").strip()
+        if not title:
+            raise ValueError("Tiêu đề không được để trống.")
+        values["title"] = title[:100]
+    if "description" in record:
+        values["description"] = (record["description"] or "").strip()[:500] or None
+    if "status" in record:
+        if record["status"] not in VALID_STATUSES:
+            raise ValueError(f"Trạng thái không hợp lệ: {record['status']}")
+        values["status"] = record["status"]
+    if "priority" in record:
+        try:
+            values["priority"] = int(record["priority"] or 1)
+        except (TypeError, ValueError):
+            raise ValueError("Mức ưu tiên phải là số nguyên.") from None
+    if "due_date" in record:
+        due = (record["due_date"] or "").strip()
+        try:
+            values["due_date"] = datetime.fromisoformat(due) if due else None
+        except ValueError:
+            raise ValueError(f"Ngày hết hạn không hợp lệ: {due}") from None
+    return values
+
+def parse_tag_names(raw: str | None) -> list[str]:
+    """Tách chuỗi nhãn ngăn cách bằng dấu phẩy thành danh sách tên (bỏ trùng, giữ thứ tự)."""
+    names = [name.strip()[:50] for name in (raw or "").split(",")]
+    return list(dict.fromkeys(name for name in names if name))
+
+def create_todo(conn, user_id: int, record: dict) -> int:
+    """
+    Tạo một công việc (và gắn các nhãn của nó, tạo nhãn mới nếu cần).
+
+    Args:
+        conn: Connection SQLAlchemy đang mở transaction.
+        user_id (int): Chủ sở hữu.
+        record (dict): Dữ liệu form; bắt buộc có title, "tags" là chuỗi tên nhãn ngăn cách bằng dấu phẩy.
+
+    Returns:
+        int: ID của công việc vừa tạo.
+
+    Raises:
+        ValueError: Nếu dữ liệu không hợp lệ.
+    """
+    values = clean_todo_values(record)
+    if "title" not in values:
+        raise ValueError("Tiêu đề không được để trống.")
+    todo_id = conn.execute(insert(Todo).values(user_id=user_id, **values).returning(Todo.id)).scalar_one()
+    names = parse_tag_names(record.get("tags"))
+    if names:
+        now = datetime.now()
+        tag_map = {}
+        ensure_tags(conn, set(names), tag_map, now)
+        conn.execute(insert(TodoTag), [
+            {"todo_id": todo_id, "tag_id": tag_map[name], "created_at": now, "updated_at": now, "is_deleted": 0}
+            for name in names
+        ])
+    return todo_id
+
+def update_todo(conn, user_id: int, todo_id: int, values: dict) -> bool:
+    """
+    Sửa các trường của một công việc bằng một câu UPDATE.
+
+    Args:
+        conn: Connection SQLAlchemy đang mở transaction.
+        user_id (int): Chủ sở hữu (công việc của user khác không bị sửa).
+        todo_id (int): ID của công việc.
+        values (dict): Giá trị mới (xem clean_todo_values).
+
+    Returns:
+        bool: True nếu công việc tồn tại và thuộc về user.
+    """
+    stmt = update(Todo).where(Todo.id == todo_id, Todo.user_id == user_id, live(Todo)).values(**values)
+    return conn.execute(stmt).rowcount > 0
+
+def set_todo_status(conn, user_id: int, todo_id: int, status: str | None = None) -> bool:
+    """
+    Đổi trạng thái của một công việc bằng một câu UPDATE.
+
+    Args:
+        conn: Connection SQLAlchemy đang mở transaction.
+        user_id (int): Chủ sở hữu.
+        todo_id (int): ID của công việc.
+        status (str | None): Trạng thái mới; None để chuyển sang trạng thái kế tiếp theo STATUS_CYCLE
+            (tính ngay trong câu UPDATE, không cần đọc trạng thái hiện tại trước).
+
+    Returns:
+        bool: True nếu công việc tồn tại và thuộc về user.
+
+    Raises:
+        ValueError: Nếu status không hợp lệ.
+    """
+    if status is None:
+        value = case(STATUS_CYCLE, value=Todo.status, else_="pending")
+    else:
+        value = clean_todo_values({"status": status})["status"]
+    return update_todo(conn, user_id, todo_id, {"status": value})
+
+def delete_todo(conn, user_id: int, todo_id: int) -> bool:
+    """
+    Xóa mềm một công việc cùng các liên kết nhãn của nó (trigger trừ số liệu thống kê ngay,
+    dòng được xóa hẳn sau thời gian lưu giữ).
+
+    Returns:
+        bool: True nếu công việc tồn tại, còn sống và thuộc về user.
+    """
+    values = soft_delete_values()
+    stmt = update(Todo).where(Todo.id == todo_id, Todo.user_id == user_id, live(Todo)).values(**values)
+    if conn.execute(stmt).rowcount == 0:
+        return False
+    conn.execute(update(TodoTag).where(TodoTag.todo_id == todo_id, live(TodoTag)).values(**values))
+    return True
+
+def add_todo_tag(conn, user_id: int, todo_id: int, name: str) -> bool:
+    """
+    Gắn một nhãn (theo tên, tạo mới nếu chưa có) vào công việc. Gắn lại nhãn đã có thì không làm gì.
+
+    Returns:
+        bool: True nếu công việc tồn tại và thuộc về user.
+
+    Raises:
+        ValueError: Nếu tên nhãn rỗng.
+    """
+    names = parse_tag_names(name)
+    if not names:
+        raise ValueError("Tên nhãn không được để trống.")
+    if conn.execute(select(Todo.id).where(Todo.id == todo_id, Todo.user_id == user_id, live(Todo))).first() is None:
+        return False
+    now = datetime.now()
+    tag_map = {}
+    ensure_tags(conn, {names[0]}, tag_map, now)
+    conn.execute(_LINK_TAG, {"todo_id": todo_id, "tag_id": tag_map[names[0]], "user_id": user_id, "now": now})
+    return True
+
+def remove_todo_tag(conn, user_id: int, todo_id: int, tag_id: int) -> bool:
+    """
+    Bỏ một nhãn khỏi công việc bằng một câu DELETE (chỉ khi công việc thuộc về user).
+
+    Returns:
+        bool: True nếu có liên kết bị xóa.
+    """
+    # Liên kết nhãn không mang dữ liệu của người dùng nên được xóa hẳn ngay (gắn lại thì tạo dòng mới)
+    owned = select(Todo.id).where(Todo.id == todo_id, Todo.user_id == user_id, live(Todo)).scalar_subquery()
+    stmt = delete(TodoTag).where(TodoTag.todo_id == owned, TodoTag.tag_id == tag_id)
+    return conn.execute(stmt).rowcount > 0
@@ -0,0 +1,164 @@
+# File todo_filter.py trong package models
+# Bộ lọc danh sách công việc ở trang chủ: trạng thái, khoảng mức ưu tiên, khoảng hạn chót và nhãn
+# (khớp MỘT trong các nhãn hoặc TẤT CẢ các nhãn). Bộ lọc được chuyển thành điều kiện WHERE của đúng câu
+# truy vấn phân trang keyset (models.repository.load_todo_page), không lọc trong Python.
+# - Câu truy vấn đi theo index (user_id, due_date, id, status, priority) WHERE is_deleted = 0 (migration 9):
+#   trạng thái và mức ưu tiên được kiểm tra ngay trên index, chỉ dòng khớp mới phải đọc từ bảng; với một
+#   trạng thái duy nhất, SQLite dùng ix_todos_user_status_live (user_id, status, due_date) và không đọc thừa dòng nào.
+# - Nhãn được kiểm tra bằng EXISTS tương quan trên ix_todo_tags_todo_live (todo_id, tag_id) WHERE is_deleted = 0:
+#   mỗi dòng chỉ tốn một lần tìm trên index.
+# Nhờ LIMIT và thứ tự theo index, thời gian lấy một trang phụ thuộc vào tỷ lệ công việc khớp bộ lọc,
+# không phụ thuộc vào tổng số công việc của user (xem bench/filters.py).
+
+from datetime import datetime, time  # Khoảng hạn chót
+from typing import NamedTuple  # Bộ lọc bất biến, dùng làm giá trị
+from sqlalchemy import and_, exists  # Điều kiện SQL
+from models.soft_delete import live  # Điều kiện dòng còn sống
+from models.todo import Todo  # Model Todo
+from models.todo_crud import parse_tag_names  # Tách chuỗi nhãn ngăn cách bằng dấu phẩy
+from models.todo_io import VALID_STATUSES  # Các trạng thái hợp lệ
+from models.todo_tag import TodoTag  # Model TodoTag (bảng trung gian)
+
+# Cách kết hợp nhiều nhãn: "any" = có ít nhất một nhãn, "all" = có đủ mọi nhãn
+TAG_MODES = ("any", "all")
+
+class TodoFilter(NamedTuple):
+    """Bộ lọc danh sách công việc (mọi trường đều không bắt buộc)."""
+    statuses: tuple[str, ...] = ()  # Các trạng thái được chọn (rỗng = mọi trạng thái)
+    priority_min: int | None = None  # Mức ưu tiên nhỏ nhất (bao gồm)
+    priority_max: int | None = None  # Mức ưu tiên lớn nhất (bao gồm)
+    due_from: datetime | None = None  # Hạn chót từ (bao gồm)
+    due_to: datetime | None = None  # Hạn chót đến (bao gồm; ngày không có giờ tính đến hết ngày)
+    tags: tuple[str, ...] = ()  # Tên các nhãn
+    tag_mode: str = "any"  # Cách kết hợp các nhãn (xem TAG_MODES)
+
+    def is_empty(self) -> bool:
+        """True nếu bộ lọc không có điều kiện nào (danh sách đầy đủ, dùng được fragment cache)."""
+        return not (self.statuses or self.tags or self.priority_min is not None or self.priority_max is not None
+                    or self.due_from is not None or self.due_to is not None)
+
+    def to_params(self) -> list[tuple[str, str]]:
+        """
+        Chuyển bộ lọc thành tham số URL (parse_todo_filter đọc lại đúng bộ lọc này), dùng cho link trang kế tiếp.
+
+        Returns:
+            list[tuple[str, str]]: Các cặp (tên, giá trị) cho urlencode.
+        """
+        params = [("status", status) for status in self.statuses]
+        if self.priority_min is not None:
+            params.append(("priority_min", str(self.priority_min)))
+        if self.priority_max is not None:
+            params.append(("priority_max", str(self.priority_max)))
+        if self.due_from is not None:
+            params.append(("due_from", self.due_from.isoformat()))
+        if self.due_to is not None:
+            params.append(("due_to", self.due_to.isoformat()))
+        params += [("tag", name) for name in self.tags]
+        if self.tags and self.tag_mode != "any":
+            params.append(("tag_mode", self.tag_mode))
+        return params
+
+def _getlist(params, key: str) -> list[str]:
+    # QueryParams/FormData của Starlette có getlist; dict thường chỉ có một giá trị cho mỗi khóa
+    if hasattr(params, "getlist"):
+        return [value for value in params.getlist(key) if value != ""]
+    value = params.get(key)
+    return [value] if value not in (None, "") else []
+
+def _parse_int(params, key: str, label: str) -> int | None:
+    values = _getlist(params, key)
+    if not values:
+        return None
+    try:
+        return int(values[-1])
+    except ValueError:
+        raise ValueError(f"{label} phải là số nguyên.") from None
+
+def _parse_datetime(params, key: str, label: str, end_of_day: bool = False) -> datetime | None:
+    values = _getlist(params, key)
+    if not values:
+        return None
+    try:
+        value = datetime.fromisoformat(values[-1].strip())
+    except ValueError:
+        raise ValueError(f"{label} không hợp lệ: {values[-1]}") from None
+    # Chỉ có ngày (input type="date"): mốc cuối tính đến hết ngày đó
+    if end_of_day and len(values[-1].strip()) == 10:
+        value = datetime.combine(value.date(), time.max)
+    return value
+
+def parse_todo_filter(params) -> TodoFilter:
+    """
+    Đọc bộ lọc từ tham số của request.
+
+    Tham số: status (lặp lại được), priority_min, priority_max, due_from, due_to (ngày hoặc ngày giờ ISO),
+    tag (lặp lại được, hoặc tags là chuỗi ngăn cách bằng dấu phẩy), tag_mode (any/all).
+
+    Args:
+        params: QueryParams/FormData của Starlette, hoặc dict.
+
+    Returns:
+        TodoFilter: Bộ lọc (rỗng nếu không có tham số nào).
+
+    Raises:
+        ValueError: Nếu một tham số không hợp lệ (thông báo dùng được để hiển thị cho người dùng).
+    """
+    statuses = tuple(dict.fromkeys(_getlist(params, "status")))
+    for status in statuses:
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Trạng thái không hợp lệ: {status}")
+    tag_mode = (_getlist(params, "tag_mode") or ["any"])[-1]
+    if tag_mode not in TAG_MODES:
+        raise ValueError(f"Cách kết hợp nhãn không hợp lệ: {tag_mode}")
+    names = [name for raw in _getlist(params, "tag") + _getlist(params, "tags") for name in parse_tag_names(raw)]
+    return TodoFilter(
+        statuses=statuses if len(statuses) < len(VALID_STATUSES) else (),  # Chọn đủ mọi trạng thái = không lọc
+        priority_min=_parse_int(params, "priority_min", "Mức ưu tiên nhỏ nhất"),
+        priority_max=_parse_int(params, "priority_max", "Mức ưu tiên lớn nhất"),
+        due_from=_parse_datetime(params, "due_from", "Hạn chót từ ngày"),
+        due_to=_parse_datetime(params, "due_to", "Hạn chót đến ngày", end_of_day=True),
+        tags=tuple(dict.fromkeys(names)),
+        tag_mode=tag_mode,
+    )
+
+def todo_filter_conditions(filters: TodoFilter, tag_ids: list[list[int]]) -> list | None:
+    """
+    Chuyển bộ lọc thành các điều kiện WHERE trên bảng todos.
+
+    Args:
+        filters (TodoFilter): Bộ lọc.
+        tag_ids (list[list[int]]): Với mỗi tên trong filters.tags, các id nhãn ứng với tên đó
+            (xem models.tag_index.TagIndex.find_ids).
+
+    Returns:
+        list | None: Các điều kiện (nối bằng AND), hoặc None nếu chắc chắn không có công việc nào khớp
+        (ví dụ nhãn không tồn tại), khi đó không cần truy vấn.
+    """
+    conditions = []
+    if len(filters.statuses) == 1:
+        conditions.append(Todo.status == filters.statuses[0])  # So sánh bằng: dùng được ix_todos_user_status_live
+    elif filters.statuses:
+        conditions.append(Todo.status.in_(filters.statuses))
+    if filters.priority_min is not None:
+        conditions.append(Todo.priority >= filters.priority_min)
+    if filters.priority_max is not None:
+        conditions.append(Todo.priority <= filters.priority_max)
+    if filters.due_from is not None:
+        conditions.append(Todo.due_date >= filters.due_from)
+    if filters.due_to is not None:
+        conditions.append(Todo.due_date <= filters.due_to)
+    if filters.tags:
+        # Mỗi tên nhãn là một "nhóm" id (thường chỉ một id)
+        groups = [ids for ids in tag_ids if ids]
+        if filters.tag_mode == "all":
+            if len(groups) < len(filters.tags):
+                return None  # Có nhãn không tồn tại: không công việc nào có đủ mọi nhãn
+        elif not groups:
+            return None
+        else:
+            groups = [sorted({tag_id for ids in groups for tag_id in ids})]
+        conditions.append(and_(*[
+            exists().where(TodoTag.todo_id == Todo.id, TodoTag.tag_id.in_(ids), live(TodoTag))
+            for ids in groups
+        ]))
+    return conditions
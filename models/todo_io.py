@@ -0,0 +1,305 @@
+# File todo_io.py trong package models
+# Nhập (import) và xuất (export) hàng loạt công việc dưới dạng CSV hoặc JSON Lines.
+# - Import: đọc dữ liệu theo dòng (streaming), gom thành từng lô (chunk) và ghi bằng Core executemany,
+#   mỗi lô trong một transaction. Tên nhãn được ánh xạ sang tag_id qua một dict trong bộ nhớ,
+#   nhãn chưa có sẽ được tạo theo lô.
+# - Export: đọc từ con trỏ phía server (stream_results + yield_per) và sinh ra từng dòng văn bản,
+#   nên bộ nhớ sử dụng không đổi dù dữ liệu lớn tới đâu.
+#
+# Định dạng một dòng dữ liệu:
+#   CSV:   title,description,status,priority,due_date,tags   (tags ngăn cách bằng dấu phẩy, ví dụ "Công việc, Cá nhân")
+#   JSONL: {"title": ..., "description": ..., "status": ..., "priority": ..., "due_date": ..., "tags": [...]}
+
+import csv  # Đọc/ghi CSV
+import io  # Bộ đệm chuỗi để ghi CSV từng dòng
+import json  # Đọc/ghi JSON Lines
+from datetime import datetime  # Chuyển đổi due_date
+from itertools import islice  # Cắt dữ liệu thành từng lô
+from sqlalchemy import func, insert, select, update  # Câu lệnh Core
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # INSERT ... ON CONFLICT của SQLite
+from models.soft_delete import live  # Điều kiện dòng còn sống cho truy vấn Core
+from models.tag import Tag  # Model Tag
+from models.todo import Todo  # Model Todo
+from models.todo_tag import TodoTag  # Model TodoTag
+
+# Các định dạng được hỗ trợ
+FORMATS = ("csv", "jsonl")
+# Thứ tự cột khi xuất/nhập CSV
+CSV_FIELDS = ["title", "description", "status", "priority", "due_date", "tags"]
+# Các trạng thái hợp lệ (khớp với CheckConstraint của cột Todo.status)
+VALID_STATUSES = ("pending", "in_progress", "completed")
+# Số dòng trong một lô ghi (một transaction)
+IMPORT_CHUNK_SIZE = 5000
+# Số dòng đọc mỗi lần từ con trỏ phía server khi xuất
+EXPORT_BATCH_SIZE = 1000
+
+class TodoImportError(ValueError):
+    """
+    Dữ liệu nhập không đọc được (ví dụ không phải UTF-8, CSV hỏng). Các lô trước lỗi đã được commit:
+    stats là kết quả của chúng.
+    """
+
+    def __init__(self, message: str, stats: dict):
+        super().__init__(message)
+        self.stats = stats
+
+# --- Đọc dữ liệu đầu vào ---
+
+def iter_csv_records(lines):
+    """
+    Đọc các bản ghi từ một nguồn dòng CSV (có dòng tiêu đề).
+
+    Args:
+        lines: Iterable các dòng văn bản (ví dụ file mở ở chế độ text).
+
+    Yields:
+        dict: Mỗi dòng dưới dạng dict, 'tags' là danh sách tên nhãn.
+    """
+    for row in csv.DictReader(lines):
+        tags = row.get("tags") or ""
+        row["tags"] = [name.strip() for name in tags.split(",") if name.strip()]
+        yield row
+
+def iter_jsonl_records(lines):
+    """
+    Đọc các bản ghi từ một nguồn JSON Lines (mỗi dòng là một object JSON).
+
+    Args:
+        lines: Iterable các dòng văn bản.
+
+    Yields:
+        Giá trị JSON của mỗi dòng (thường là dict; dòng không phải object được _to_row coi là không hợp lệ).
+        Dòng không phải JSON hợp lệ cho ra None, để được đếm vào 'skipped' như các bản ghi không hợp lệ khác
+        (thay vì dừng cả lần nhập khi các lô trước đã được commit).
+    """
+    for line in lines:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+def iter_records(lines, fmt: str):
+    """Chọn bộ đọc theo định dạng ('csv' hoặc 'jsonl')."""
+    if fmt == "csv":
+        return iter_csv_records(lines)
+    if fmt == "jsonl":
+        return iter_jsonl_records(lines)
+    raise ValueError(f"Định dạng không được hỗ trợ: {fmt}")
+
+def _text(value) -> str | None:
+    # Giá trị văn bản của một trường (None nếu trống); báo TypeError nếu không phải chuỗi (ví dụ số trong JSON)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise TypeError(f"Cần chuỗi, nhận {type(value).__name__}")
+    return value.strip() or None
+
+def _tag_names(value) -> list[str]:
+    # Danh sách tên nhãn (chuỗi ngăn cách bằng dấu phẩy hoặc danh sách chuỗi), bỏ tên rỗng;
+    # báo TypeError nếu có giá trị không phải chuỗi
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    elif not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise TypeError("tags phải là chuỗi hoặc danh sách chuỗi")
+    return [name.strip()[:50] for name in value if name.strip()]
+
+def _to_row(record, user_id: int, now: datetime) -> tuple[dict, list[str]] | None:
+    # Chuẩn hóa một bản ghi thành dòng của bảng todos; trả về None nếu bản ghi không hợp lệ
+    # (không phải object, thiếu tiêu đề, hoặc trường có kiểu/giá trị sai, ví dụ {"title": 5} trong JSON Lines)
+    if not isinstance(record, dict):
+        return None
+    try:
+        title = _text(record.get("title"))
+        status = _text(record.get("status")) or "pending"
+        description = record.get("description")
+        if description is not None and not isinstance(description, str):
+            return None
+        priority = record.get("priority") or 1
+        if isinstance(priority, bool):
+            return None
+        priority = int(priority)
+        due = _text(record.get("due_date"))
+        due_date = datetime.fromisoformat(due) if due else None
+        tags = _tag_names(record.get("tags"))
+    except (TypeError, ValueError):
+        return None
+    if not title or status not in VALID_STATUSES:
+        return None
+    row = {
+        "title": title[:100],
+        "description": description or None,
+        "status": status,
+        "priority": priority,
+        "due_date": due_date,
+        "user_id": user_id,
+        "created_at": now,
+        "updated_at": now,
+        "is_deleted": 0,
+    }
+    return row, tags
+
+# --- Ghi dữ liệu ---
+
+def load_tag_map(conn) -> dict[str, int]:
+    """Nạp các nhãn còn sống thành dict tên nhãn -> id (nhãn đã xóa mềm được ensure_tags khôi phục khi cần)."""
+    return {name: tag_id for tag_id, name in conn.execute(select(Tag.id, Tag.name).where(live(Tag)))}
+
+def ensure_tags(conn, names: set[str], tag_map: dict[str, int], now: datetime) -> int:
+    """
+    Tạo các nhãn chưa có trong tag_map (bỏ qua nếu tiến trình khác vừa tạo), rồi cập nhật tag_map.
+    Tên nhãn là duy nhất kể cả với dòng đã xóa mềm: nhãn đã xóa mềm trùng tên được khôi phục thay vì tạo mới.
+
+    Returns:
+        int: Số nhãn chưa có trong tag_map trước khi gọi.
+    """
+    missing = [name for name in names if name not in tag_map]
+    if not missing:
+        return 0
+    conn.execute(
+        update(Tag).where(Tag.name.in_(missing), Tag.is_deleted == 1)
+        .values(is_deleted=0, deleted_at=None, updated_at=now)
+    )
+    stmt = sqlite_insert(Tag.__table__).on_conflict_do_nothing(index_elements=["name"])
+    conn.execute(stmt, [{"name": name, "created_at": now, "updated_at": now, "is_deleted": 0} for name in missing])
+    for tag_id, name in conn.execute(select(Tag.id, Tag.name).where(Tag.name.in_(missing), live(Tag))):
+        tag_map[name] = tag_id
+    return len(missing)
+
+def import_chunk(conn, user_id: int, records, tag_map: dict[str, int], stats: dict):
+    """
+    Ghi một lô bản ghi vào database trong transaction hiện tại của conn.
+
+    Args:
+        conn: Connection SQLAlchemy đang mở transaction.
+        user_id (int): Chủ sở hữu của các công việc được nhập.
+        records: Danh sách bản ghi (dict) của lô.
+        tag_map (dict[str, int]): Ánh xạ tên nhãn -> id, được cập nhật khi tạo nhãn mới.
+        stats (dict): Bộ đếm kết quả (todos, tags_created, links, skipped), được cập nhật tại chỗ.
+    """
+    now = datetime.now()
+    rows, row_tags = [], []
+    for record in records:
+        converted = _to_row(record, user_id, now)
+        if converted is None:
+            stats["skipped"] += 1
+            continue
+        rows.append(converted[0])
+        row_tags.append(converted[1])
+    if not rows:
+        return
+
+    stats["tags_created"] += ensure_tags(conn, {name for names in row_tags for name in names}, tag_map, now)
+
+    # executemany có RETURNING (SQLAlchemy "insertmanyvalues"): lấy id theo đúng thứ tự các dòng đã gửi
+    stmt = insert(Todo.__table__).returning(Todo.__table__.c.id, sort_by_parameter_order=True)
+    todo_ids = conn.execute(stmt, rows).scalars().all()
+    stats["todos"] += len(todo_ids)
+
+    links = [
+        {"todo_id": todo_id, "tag_id": tag_map[name], "created_at": now, "updated_at": now, "is_deleted": 0}
+        for todo_id, names in zip(todo_ids, row_tags)
+        for name in dict.fromkeys(names)  # Bỏ nhãn trùng lặp trong cùng một dòng
+    ]
+    if links:
+        conn.execute(insert(TodoTag.__table__), links)
+        stats["links"] += len(links)
+
+def new_import_stats() -> dict:
+    """Tạo bộ đếm kết quả nhập dữ liệu."""
+    return {"todos": 0, "tags_created": 0, "links": 0, "skipped": 0}
+
+def import_todos(engine, user_id: int, records, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    Nhập hàng loạt công việc cho một user từ một nguồn bản ghi (đọc dần, không nạp hết vào bộ nhớ).
+
+    Args:
+        engine: Engine SQLAlchemy.
+        user_id (int): Chủ sở hữu của các công việc được nhập.
+        records: Iterable các bản ghi (xem iter_records).
+        chunk_size (int): Số bản ghi trong mỗi transaction.
+
+    Returns:
+        dict: Kết quả (todos, tags_created, links, skipped).
+
+    Raises:
+        TodoImportError: Nếu nguồn dữ liệu không đọc được giữa chừng; kèm kết quả của các lô đã commit.
+    """
+    stats = new_import_stats()
+    records = iter(records)
+    with engine.connect() as conn:
+        tag_map = load_tag_map(conn)
+    while True:
+        try:
+            chunk = list(islice(records, chunk_size))
+        except (ValueError, csv.Error) as e:
+            raise TodoImportError(str(e), stats) from e
+        if not chunk:
+            break
+        with engine.begin() as conn:
+            import_chunk(conn, user_id, chunk, tag_map, stats)
+    return stats
+
+# --- Xuất dữ liệu ---
+
+def _export_query(user_id: int):
+    # Gom tên nhãn của mỗi todo bằng subquery tương quan (dùng index ix_todo_tags_todo).
+    # Câu lệnh Core không qua bộ lọc xóa mềm của ORM: chỉ xuất các dòng còn sống (live)
+    tag_names = (
+        select(func.group_concat(Tag.name, ", "))
+        .select_from(TodoTag.__table__.join(Tag.__table__, TodoTag.tag_id == Tag.id))
+        .where(TodoTag.todo_id == Todo.id, live(TodoTag), live(Tag))
+        .scalar_subquery()
+    )
+    return (
+        select(Todo.title, Todo.description, Todo.status, Todo.priority, Todo.due_date, tag_names.label("tags"))
+        .where(Todo.user_id == user_id, live(Todo))
+        .order_by(Todo.due_date, Todo.id)
+    )
+
+def iter_export_rows(engine, user_id: int, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Đọc các công việc của một user từ con trỏ phía server, từng lô batch_size dòng.
+
+    Yields:
+        dict: Mỗi công việc dưới dạng dict (tags là danh sách tên nhãn).
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(_export_query(user_id))
+        for title, description, status, priority, due_date, tags in result:
+            yield {
+                "title": title,
+                "description": description,
+                "status": status,
+                "priority": priority,
+                "due_date": due_date.isoformat() if due_date else None,
+                "tags": tags.split(", ") if tags else [],
+            }
+
+def iter_export_lines(engine, user_id: int, fmt: str):
+    """
+    Sinh dữ liệu xuất từng dòng văn bản theo định dạng ('csv' hoặc 'jsonl').
+
+    Yields:
+        str: Một dòng (đã có ký tự xuống dòng).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Định dạng không được hỗ trợ: {fmt}")
+    if fmt == "jsonl":
+        for row in iter_export_rows(engine, user_id):
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+        return
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for row in iter_export_rows(engine, user_id):
+        row["tags"] = ", ".join(row["tags"])
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.getvalue():
+        yield buffer.getvalue()
@@ -0,0 +1,128 @@
+# File user_cache.py trong package models
+# Bộ nhớ đệm (cache) trong tiến trình cho thông tin người dùng, khóa theo user_id.
+# - Giới hạn số phần tử (LRU: phần tử ít được dùng gần đây nhất bị loại ra trước).
+# - Mỗi phần tử có thời gian sống (TTL), hết hạn thì phải đọc lại từ database.
+# - Tự động xóa khỏi cache khi bản ghi User bị cập nhật/xóa (qua sự kiện của SQLAlchemy),
+#   và khi tiến trình khác sửa bảng users (qua phiên bản dữ liệu, xem UserCache.sync).
+# - Đếm số lần trúng (hit) / trượt (miss) để theo dõi hiệu quả.
+
+import threading  # Khóa để dùng an toàn giữa nhiều thread
+import time  # Đồng hồ đơn điệu để tính TTL
+from collections import OrderedDict  # Giữ thứ tự truy cập cho chính sách LRU
+from sqlalchemy import event  # Đăng ký sự kiện ORM
+from sqlalchemy.orm import Session  # Session để lắng nghe sự kiện commit
+from models.user import User  # Model User
+
+class UserSnapshot:
+    """
+    Bản sao chỉ-đọc các cột của một User, an toàn khi dùng chung giữa các request
+    (không gắn với Session nào nên không bao giờ phát sinh lazy load).
+    """
+    __slots__ = ("id", "login", "name", "email", "is_admin")
+
+    def __init__(self, id: int, login: str, name: str, email: str, is_admin: bool):
+        self.id = id
+        self.login = login
+        self.name = name
+        self.email = email
+        self.is_admin = bool(is_admin)
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        """Tạo snapshot từ một đối tượng User đã nạp từ database."""
+        return cls(user.id, user.login, user.name, user.email, user.is_admin)
+
+    def __repr__(self):
+        return f"UserSnapshot(id={self.id!r}, login={self.login!r})"
+
+class UserCache:
+    """
+    Cache LRU + TTL cho UserSnapshot, khóa theo user_id.
+
+    Args:
+        maxsize (int): Số user tối đa giữ trong cache.
+        ttl (float): Thời gian sống (giây) của mỗi phần tử.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[int, tuple[float, UserSnapshot]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.version = None  # Phiên bản bảng users (models.data_version.USERS_SCOPE) của dữ liệu trong cache
+
+    def sync(self, version: int):
+        """
+        Xóa toàn bộ cache nếu bảng users đã thay đổi (ở bất kỳ tiến trình nào) kể từ lần đồng bộ trước.
+
+        Args:
+            version (int): Phiên bản hiện tại của bảng users (xem models.data_version.get_scope_version).
+        """
+        with self._lock:
+            if version != self.version:
+                self._data.clear()
+                self.version = version
+
+    def get(self, user_id: int) -> UserSnapshot | None:
+        """Lấy snapshot theo user_id; trả về None nếu không có hoặc đã hết hạn."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[user_id]  # Phần tử đã hết hạn
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)  # Đánh dấu vừa được dùng
+            self.hits += 1
+            return entry[1]
+
+    def put(self, snapshot: UserSnapshot):
+        """Thêm/cập nhật snapshot; loại phần tử cũ nhất nếu vượt quá maxsize."""
+        with self._lock:
+            self._data[snapshot.id] = (time.monotonic() + self.ttl, snapshot)
+            self._data.move_to_end(snapshot.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """Xóa một user khỏi cache (gọi khi bản ghi user thay đổi)."""
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        """Xóa toàn bộ cache và đặt lại bộ đếm."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Trả về số liệu thống kê: hits, misses, size, maxsize."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+# Cache dùng chung cho toàn tiến trình
+user_cache = UserCache()
+
+# --- Tự động xóa cache khi User thay đổi ---
+# Xóa ngay khi flush (để request hiện tại không đọc lại dữ liệu cũ)
+# và xóa lần nữa sau khi commit (tránh trường hợp request khác đã nạp lại bản cũ giữa flush và commit).
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("dirty_user_ids", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("dirty_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("dirty_user_ids", None)
@@ -0,0 +1,199 @@
+# File write_batcher.py trong package models
+# Gộp các thao tác ghi công việc/nhãn (models/todo_crud.py) của nhiều request vào một transaction (write-behind).
+# SQLite chỉ cho một người ghi tại một thời điểm: khi nhiều request cùng ghi, mỗi transaction riêng phải chờ
+# khóa ghi (busy_timeout) rồi tự fsync WAL khi commit. WriteBatcher thay thế việc đó bằng MỘT thread ghi duy nhất:
+# - Request gửi thao tác vào hàng đợi có giới hạn (đầy thì báo WriteBatcherBusy, route trả về 503).
+# - Thread ghi lấy thao tác đầu tiên, chờ thêm tối đa window giây (hoặc đến khi đủ max_batch thao tác),
+#   rồi chạy cả lô trong một transaction BEGIN IMMEDIATE (giữ khóa ghi ngay từ đầu, không phải nâng cấp khóa
+#   giữa chừng) và commit một lần.
+# - Mỗi thao tác chạy trong một SAVEPOINT riêng: thao tác báo lỗi (ví dụ ValueError do dữ liệu không hợp lệ)
+#   chỉ hoàn tác phần của nó, các thao tác khác trong lô vẫn được commit.
+# - Kết quả của từng thao tác chỉ được trả về SAU KHI lô đã commit, nên request gửi thao tác đọc lại ngay
+#   (ở bất kỳ kết nối nào) đều thấy dữ liệu mình vừa ghi (read-your-writes).
+# Số liệu (số lô, phân bố kích thước lô, thời gian chờ trong hàng đợi) được xuất ra /metrics
+# (xem views.metrics.write_batcher_collector).
+
+import asyncio  # Chờ kết quả trong route async
+import bisect  # Tìm bucket của phân bố
+import logging  # Ghi log lỗi của lô
+import queue  # Hàng đợi giữa các request và thread ghi
+import threading  # Thread ghi và khóa cho bộ đếm
+import time  # Đo thời gian chờ
+from concurrent.futures import Future  # Kết quả của từng thao tác
+from models.bounded_pool import PoolBusy  # Lỗi quá tải dùng chung (route trả về 503)
+
+write_batcher_logger = logging.getLogger("todo.write_batcher")
+
+# Các mốc của phân bố kích thước lô (số thao tác trong một transaction)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+# Các mốc (giây) của phân bố thời gian chờ trong hàng đợi (từ lúc gửi đến lúc lô bắt đầu chạy)
+QUEUE_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class WriteBatcherBusy(PoolBusy):
+    """Hàng đợi ghi đã đầy."""
+
+class WriteBatcher:
+    """
+    Thread ghi duy nhất gộp các thao tác ghi thành lô, mỗi lô là một transaction.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        window (float): Thời gian (giây) chờ thêm thao tác sau thao tác đầu tiên của lô.
+        max_batch (int): Số thao tác tối đa trong một lô.
+        max_queue (int): Số thao tác được phép chờ; vượt quá thì báo WriteBatcherBusy.
+    """
+
+    def __init__(self, engine, window: float = 0.002, max_batch: int = 64, max_queue: int = 1024):
+        self.engine = engine
+        self.window = window
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.pending = 0  # Đang chờ + đang chạy
+        self.counters = {"submitted_total": 0, "rejected_total": 0, "batches_total": 0, "writes_total": 0,
+                         "failed_total": 0, "run_seconds_total": 0.0}
+        # Phân bố: số đếm theo bucket (+Inf ở cuối); tổng kích thước lô là writes_total
+        self.batch_sizes = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.queue_waits = [0] * (len(QUEUE_WAIT_BUCKETS) + 1)
+        self.queue_wait_seconds_total = 0.0
+
+    def start(self):
+        """Bắt đầu thread ghi (gọi khi ứng dụng khởi động; submit cũng tự gọi nếu cần)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Dừng thread ghi (gọi khi ứng dụng tắt); các thao tác đã gửi được ghi xong trước khi dừng."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def submit(self, func, *args) -> Future:
+        """
+        Gửi một thao tác ghi func(conn, *args) vào lô kế tiếp.
+
+        Args:
+            func: Hàm ghi nhận conn là Connection đang mở transaction (ví dụ models.todo_crud.set_todo_status).
+            *args: Các tham số còn lại của func.
+
+        Returns:
+            concurrent.futures.Future: Kết quả của func, có sau khi lô chứa nó đã commit
+            (hoặc lỗi của func nếu nó báo lỗi; khi đó riêng thao tác này bị hoàn tác).
+
+        Raises:
+            WriteBatcherBusy: Nếu số thao tác đang chờ đã đạt max_queue.
+        """
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.counters["rejected_total"] += 1
+                raise WriteBatcherBusy()
+            self.pending += 1
+            self.counters["submitted_total"] += 1
+            started = self._thread is not None
+        if not started:
+            self.start()
+        future = Future()
+        self._queue.put((future, func, args, time.perf_counter()))
+        return future
+
+    async def run(self, func, *args):
+        """Gửi func(conn, *args) vào lô kế tiếp và chờ (không chặn event loop) đến khi lô đã commit."""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = item[3] + self.window
+            # Gom thêm thao tác cho đến hết cửa sổ của thao tác đầu tiên hoặc đủ max_batch
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+        # Ghi nốt các thao tác còn trong hàng đợi trước khi dừng
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                rest.append(item)
+        for start in range(0, len(rest), self.max_batch):
+            self._write(rest[start:start + self.max_batch])
+
+    def _write(self, batch: list):
+        started = time.perf_counter()
+        # Bỏ các thao tác đã bị hủy (request bị ngắt trước khi lô chạy)
+        items = [item for item in batch if item[0].set_running_or_notify_cancel()]
+        outcomes = []  # (future, kết quả hoặc lỗi, thành công?)
+        try:
+            if items:
+                with self.engine.connect() as conn:
+                    # pysqlite chỉ tự mở transaction trước câu lệnh ghi đầu tiên: mở tường minh để các
+                    # SAVEPOINT nằm trong transaction của lô (RELEASE không tự commit)
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    for future, func, args, _ in items:
+                        savepoint = conn.begin_nested()
+                        try:
+                            result = func(conn, *args)
+                        except Exception as exc:
+                            savepoint.rollback()
+                            outcomes.append((future, exc, False))
+                        else:
+                            savepoint.commit()
+                            outcomes.append((future, result, True))
+                    conn.commit()
+        except Exception as exc:
+            # Không mở/commit được transaction: mọi thao tác trong lô đều thất bại
+            write_batcher_logger.exception("Lỗi khi ghi lô %d thao tác", len(items))
+            outcomes = [(future, exc, False) for future, *_ in items]
+        finished = time.perf_counter()
+
+        failed = 0
+        for future, value, ok in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                failed += 1
+                future.set_exception(value)
+        with self._lock:
+            self.pending -= len(batch)
+            if items:
+                counters = self.counters
+                counters["batches_total"] += 1
+                counters["writes_total"] += len(items)
+                counters["failed_total"] += failed
+                counters["run_seconds_total"] += finished - started
+                self.batch_sizes[bisect.bisect_left(BATCH_SIZE_BUCKETS, len(items))] += 1
+            for *_, enqueued_at in batch:
+                wait = started - enqueued_at
+                self.queue_waits[bisect.bisect_left(QUEUE_WAIT_BUCKETS, wait)] += 1
+                self.queue_wait_seconds_total += wait
+
+    def stats(self) -> dict:
+        """Số liệu: số thao tác đang chờ, các bộ đếm tích lũy và phân bố kích thước lô/thời gian chờ."""
+        with self._lock:
+            return {
+                "pending": self.pending,
+                **self.counters,
+                "batch_sizes": list(self.batch_sizes),
+                "queue_waits": list(self.queue_waits),
+                "queue_wait_seconds_total": self.queue_wait_seconds_total,
+            }
@@ -0,0 +1,41 @@
+# Kiểm tra database do các migration tạo ra (models/migrations.py):
+# - schema khớp với các model: migration 1 ghi cố định DDL, nên một cột mới trong model mà thiếu migration
+#   sẽ làm test này thất bại;
+# - các truy vấn chính (hot_queries) đều đi theo index: không SCAN toàn bảng, không sắp xếp bằng B-tree tạm.
+# Chạy: python -m pytest -q
+
+import pytest
+from sqlalchemy import create_engine
+from models import make_engine, migrate
+from models.migrations import explain_query_plan, hot_queries
+from models.model_base import ModelBase
+
+def table_columns(engine, table: str) -> list[tuple]:
+    # (tên, kiểu, NOT NULL, khóa chính) của từng cột, theo thứ tự trong bảng
+    with engine.connect() as conn:
+        return [(name, type_, notnull, pk) for _, name, type_, notnull, _, pk in conn.exec_driver_sql(f"PRAGMA table_info({table})")]
+
+def test_migrated_schema_matches_models(tmp_path):
+    migrated = make_engine({"url": f"sqlite+pysqlite:///{tmp_path / 'migrated.db'}"})
+    migrate(migrated)
+    expected = create_engine(f"sqlite+pysqlite:///{tmp_path / 'models.db'}")
+    ModelBase.metadata.create_all(expected)
+    try:
+        for table in ModelBase.metadata.tables:
+            assert table_columns(migrated, table) == table_columns(expected, table), table
+    finally:
+        migrated.dispose()
+        expected.dispose()
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    engine = make_engine({"url": f"sqlite+pysqlite:///{tmp_path_factory.mktemp('plans') / 'todo.db'}"})
+    migrate(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.mark.parametrize("name", list(hot_queries()))
+def test_hot_query_uses_index(migrated_engine, name):
+    with migrated_engine.connect() as conn:
+        plan = explain_query_plan(conn, hot_queries()[name])
+    assert not [line for line in plan if line.startswith("SCAN ") or "USE TEMP B-TREE" in line], plan
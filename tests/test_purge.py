@@ -0,0 +1,39 @@
+# Kiểm tra việc xóa hẳn các dòng đã xóa mềm (models/purge.py): mỗi transaction chỉ xóa tối đa batch_size
+# dòng của mỗi bảng, kể cả khi một nhãn bị xóa gắn với rất nhiều công việc.
+# Chạy: python -m pytest -q
+
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert, text
+from models import Tag, Todo, TodoTag, User, make_engine, migrate, purge_deleted
+
+def test_purge_deletes_links_of_a_tag_in_batches(tmp_path):
+    engine = make_engine({"url": f"sqlite+pysqlite:///{tmp_path / 'todo.db'}", "slow_query_ms": 60_000})
+    migrate(engine)
+    deleted_at = datetime.now() - timedelta(days=60)
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(login="user", email="user@example.com", name="User", password="x",
+                                                   is_admin=False, is_deleted=0)).inserted_primary_key[0]
+        kept_tag, purged_tag = (conn.execute(insert(Tag).values(name=name, is_deleted=0)).inserted_primary_key[0]
+                                for name in ("giữ", "xóa"))
+        conn.execute(insert(Todo), [{"title": f"Công việc {i}", "status": "pending", "priority": 1, "user_id": user_id,
+                                     "is_deleted": 0} for i in range(1200)])
+        todo_ids = [todo_id for (todo_id,) in conn.execute(text("SELECT id FROM todos"))]
+        conn.execute(insert(TodoTag), [{"todo_id": todo_id, "tag_id": tag_id, "is_deleted": 0}
+                                       for todo_id in todo_ids for tag_id in (kept_tag, purged_tag)])
+        conn.execute(text("UPDATE tags SET is_deleted = 1, deleted_at = :at WHERE id = :id"), {"at": deleted_at, "id": purged_tag})
+
+    # Số dòng bị xóa của từng câu DELETE
+    deleted = []
+    listener = lambda conn, cursor, statement, parameters, context, executemany: (
+        deleted.append(cursor.rowcount) if statement.startswith("DELETE") else None)
+    event.listen(engine, "after_cursor_execute", listener)
+    try:
+        counts = purge_deleted(engine, retention=timedelta(days=30), batch_size=500)
+    finally:
+        event.remove(engine, "after_cursor_execute", listener)
+    assert counts["todo_tags"] == 1200 and counts["tags"] == 1
+    assert max(deleted) <= 500
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT tag_id, COUNT(*) FROM todo_tags GROUP BY tag_id")).all() == [(kept_tag, 1200)]
+        assert conn.execute(text("SELECT id FROM tags")).scalars().all() == [kept_tag]
+    engine.dispose()
@@ -0,0 +1,64 @@
+# Kiểm tra số câu lệnh SQL của các hàm nạp danh sách công việc (models/repository.py) không phụ thuộc
+# vào số công việc của user (không có lỗi N+1 query khi duyệt todos -> tags).
+# Chạy: python -m pytest -q
+
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import (Tag, Todo, TodoTag, User, configure_data_versions, load_todo_page, load_todo_rows,
+                    load_user_with_todos, make_engine, migrate, tag_index)
+
+def make_database(path, todo_count: int):
+    # Tạo database SQLite tạm với một user có todo_count công việc, mỗi công việc gắn 2 nhãn
+    engine = make_engine({"url": f"sqlite+pysqlite:///{path}", "slow_query_ms": 60_000})
+    migrate(engine)
+    configure_data_versions(engine)
+    tag_index.clear()  # Chỉ mục nhãn là biến toàn cục: bỏ dữ liệu của database trước
+    now = datetime(2024, 1, 1)
+    with Session(engine) as db:
+        user = User(login="user", email="user@example.com", name="User", password="x")
+        tags = [Tag(name=f"nhãn {i}") for i in range(5)]
+        db.add_all([user, *tags])
+        db.flush()
+        for i in range(todo_count):
+            todo = Todo(title=f"Công việc {i}", status="pending", priority=1, user_id=user.id, due_date=now + timedelta(days=i))
+            db.add(todo)
+            db.flush()
+            db.add_all([TodoTag(todo_id=todo.id, tag_id=tags[i % 5].id), TodoTag(todo_id=todo.id, tag_id=tags[(i + 1) % 5].id)])
+        db.commit()
+        return engine, user.id
+
+def count_statements(engine, load) -> tuple[int, int]:
+    # Gọi load(db) một lần để làm nóng cache (chỉ mục nhãn, phiên bản dữ liệu), rồi đếm số câu lệnh
+    # của lần gọi thứ hai. Trả về (số câu lệnh, số công việc đã nạp)
+    with Session(engine) as db:
+        load(db)
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with Session(engine) as db:
+            loaded = load(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements), loaded
+
+LOADERS = {
+    "load_user_with_todos": lambda db, user_id: len(load_user_with_todos(db, user_id).todos),
+    "load_todo_page": lambda db, user_id: len(load_todo_page(db, user_id, limit=500)[0]),
+    "load_todo_rows": lambda db, user_id: len(load_todo_rows(db, user_id, limit=500)[0]),
+}
+
+@pytest.mark.parametrize("name", LOADERS)
+def test_statement_count_does_not_grow_with_todos(tmp_path, name):
+    load = LOADERS[name]
+    counts = {}
+    for todo_count in (1, 200):
+        engine, user_id = make_database(tmp_path / f"{todo_count}.db", todo_count)
+        try:
+            counts[todo_count] = count_statements(engine, lambda db: load(db, user_id))
+        finally:
+            engine.dispose()
+    assert counts[1][1] == 1 and counts[200][1] == 200
+    assert counts[1][0] == counts[200][0], f"{name}: {counts[1][0]} câu lệnh với 1 công việc, {counts[200][0]} với 200"
@@ -0,0 +1,116 @@
+# Kiểm tra renderer nhanh của danh sách công việc (views/Home/rows.py) sinh HTML giống từng byte với cách
+# render bằng FT (views/Home/index.py: todo_item -> FH.Li -> FH.to_xml), trên dữ liệu có:
+# - ký tự cần thoát (<, >, &, dấu nháy, emoji, khoảng trắng) trong tiêu đề, mô tả và tên nhãn;
+# - due_date NULL, description NULL, đủ các trạng thái, công việc không có nhãn;
+# - nhiều trang (cuộn vô hạn), các bộ lọc (kể cả bộ lọc không khớp công việc nào) và danh sách rỗng.
+# Thời gian render được đo riêng bằng bench/render.py.
+# Chạy: python -m pytest -q
+
+from datetime import datetime, timedelta
+import pytest
+from fasthtml import common as FH
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models import (Tag, Todo, TodoFilter, TodoTag, User, configure_data_versions, iter_todo_row_pages, load_todo_page,
+                    load_todo_rows, load_user_todos, make_engine, migrate, tag_index)
+from views import Home
+
+TRICKY_TEXTS = ('<b>đậm</b> & "nháy kép"', "nháy đơn ' và  hai khoảng trắng", "a&amp;b <!-- x --> 🎉", "  ", "\\ \t tab")
+TRICKY_TAGS = ('nhãn <"&">', "it's", "🏷️ nhãn", "thường")
+STATUSES = ("pending", "in_progress", "completed")
+TODO_COUNT = 130  # Hơn hai trang của load_todo_page/load_todo_rows
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    engine = make_engine({"url": f"sqlite+pysqlite:///{tmp_path_factory.mktemp('rows') / 'todo.db'}", "slow_query_ms": 60_000})
+    migrate(engine)
+    configure_data_versions(engine)
+    tag_index.clear()  # Chỉ mục nhãn là biến toàn cục: bỏ dữ liệu của database trước
+    now = datetime(2024, 1, 1, 8, 30)
+    with Session(engine) as db:
+        user = User(login="user", email="user@example.com", name="User", password="x")
+        empty_user = User(login="empty", email="empty@example.com", name="Empty", password="x")
+        tags = [Tag(name=name) for name in TRICKY_TAGS]
+        db.add_all([user, empty_user, *tags])
+        db.flush()
+        for i in range(TODO_COUNT):
+            todo = Todo(
+                title=TRICKY_TEXTS[i % len(TRICKY_TEXTS)] if i % 3 == 0 else f"Công việc {i}",
+                description=None if i % 4 == 0 else TRICKY_TEXTS[i % len(TRICKY_TEXTS)],
+                status=STATUSES[i % len(STATUSES)],
+                priority=i % 5 + 1,
+                due_date=now + timedelta(days=i % 40),  # Trùng hạn chót: thứ tự theo id
+                user_id=user.id,
+            )
+            db.add(todo)
+            db.flush()
+            db.add_all([TodoTag(todo_id=todo.id, tag_id=tags[(i + k) % len(tags)].id) for k in range(i % 3)])
+        # Model gán hạn chót mặc định khi due_date là None: đặt NULL bằng UPDATE
+        db.execute(text("UPDATE todos SET due_date = NULL WHERE id % 7 = 0"))
+        db.commit()
+        yield engine, user.id, empty_user.id
+    engine.dispose()
+
+def sort_key(todo):
+    # Cùng thứ tự với phân trang keyset: due_date NULL đứng trước, rồi theo (due_date, id)
+    return (todo.due_date is not None, todo.due_date or datetime.min, todo.id)
+
+FILTERS = {
+    "none": None,
+    "status": TodoFilter(statuses=("pending",)),
+    "statuses_priority": TodoFilter(statuses=("in_progress", "completed"), priority_min=2, priority_max=4),
+    "tags_quoted": TodoFilter(tags=TRICKY_TAGS[:2], tag_mode="all"),
+    "tags_any": TodoFilter(tags=TRICKY_TAGS[1:3]),
+    "no_match": TodoFilter(tags=("không-có-nhãn-này",)),
+    "no_match_priority": TodoFilter(priority_min=99),
+}
+
+@pytest.mark.parametrize("name", FILTERS)
+def test_first_page_matches_ft(database, name):
+    engine, user_id, _ = database
+    with Session(engine) as db:
+        todos, next_cursor = load_todo_page(db, user_id, filters=FILTERS[name])
+        rows, row_cursor = load_todo_rows(db, user_id, filters=FILTERS[name])
+        assert row_cursor == next_cursor
+        assert Home.todo_list_html(rows, row_cursor, FILTERS[name]) == FH.to_xml(Home.todo_list(todos, next_cursor, FILTERS[name]))
+
+def test_every_page_matches_ft(database):
+    engine, user_id, _ = database
+    cursor, pages = None, 0
+    with Session(engine) as db:
+        while True:
+            todos, next_cursor = load_todo_page(db, user_id, cursor)
+            rows, _ = load_todo_rows(db, user_id, cursor)
+            expected = "".join(FH.to_xml(item) for item in Home.todo_page_items(todos, next_cursor))
+            assert Home.todo_page_items_html(rows, next_cursor) == expected, cursor
+            pages += 1
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+    assert pages > 1
+
+def test_single_item_matches_ft(database):
+    engine, user_id, _ = database
+    with Session(engine) as db:
+        todos, _ = load_todo_page(db, user_id)
+        rows, _ = load_todo_rows(db, user_id)
+    for todo, row in zip(todos, rows):
+        assert Home.todo_item_html(row) == FH.to_xml(Home.todo_item(todo))
+
+def test_streamed_list_matches_ft(database):
+    engine, user_id, _ = database
+    with Session(engine) as db:
+        todos = sorted(load_user_todos(db, user_id), key=sort_key)
+        expected = FH.to_xml(Home.todo_list(todos))
+    assert {todo.status for todo in todos} == set(STATUSES) and any(todo.due_date is None for todo in todos)
+    assert "".join(Home.iter_todo_list_html(iter_todo_row_pages(engine, user_id))) == expected
+
+def test_empty_list_matches_ft(database):
+    engine, _, empty_user_id = database
+    expected = FH.to_xml(Home.todo_list([]))
+    assert Home.todo_list_html([]) == expected
+    assert "".join(Home.iter_todo_list_html([[]])) == expected
+    assert "".join(Home.iter_todo_list_html(iter_todo_row_pages(engine, empty_user_id))) == expected
+    with Session(engine) as db:
+        rows, next_cursor = load_todo_rows(db, empty_user_id)
+    assert next_cursor is None and Home.todo_list_html(rows) == expected
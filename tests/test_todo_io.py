@@ -0,0 +1,76 @@
+# Kiểm tra nhập/xuất hàng loạt công việc qua HTTP (POST /todos/import, GET /todos/export):
+# dữ liệu vừa xuất phải nhập lại được nguyên vẹn, kể cả khi có các ký tự ngắt dòng Unicode
+# (U+2028, U+0085, \x0b, \x0c) nằm nguyên văn trong dữ liệu xuất.
+# Chạy: python -m pytest -q
+
+import io
+import json
+import pytest
+from sqlalchemy import text
+from starlette.testclient import TestClient
+from models import ini_db
+from models.todo_io import iter_records
+from webapp import create_app
+
+# Tiêu đề, mô tả và tên nhãn có ký tự đặc biệt
+SPECIAL = [
+    {"title": "dòng tách", "description": "mô tả\x85có NEL", "status": "pending", "tags": ["nhãn\x0bVT"]},
+    {"title": "multi\x85line", "description": "a\x0cb", "status": "completed", "tags": ["x y", "thường"]},
+    {"title": 'nháy "kép", phẩy', "description": "xuống\r\ndòng thật", "status": "in_progress", "tags": []},
+]
+
+@pytest.fixture
+def client(tmp_path):
+    app = create_app({"db": {"url": f"sqlite+pysqlite:///{tmp_path / 'todo.db'}"}, "reminders": False,
+                      "purge_interval_seconds": 0})
+    ini_db(app.state.engine)
+    with TestClient(app) as client:
+        response = client.post("/login", data={"login": "john", "password": "123456"}, follow_redirects=False)
+        assert response.status_code == 303
+        yield client
+
+def exported(client, fmt: str) -> list[dict]:
+    # Xuất công việc của user và đọc lại thành các bản ghi (chỉ các trường so sánh được)
+    response = client.get(f"/todos/export?format={fmt}")
+    assert response.status_code == 200
+    # StringIO(newline="") chỉ tách dòng ở \r, \n, \r\n (như file mở với newline=""), không tách ở U+2028/U+0085
+    records = iter_records(io.StringIO(response.text, newline=""), fmt)
+    return [{key: record[key] or None for key in ("title", "description", "status")} | {"tags": sorted(record["tags"])}
+            for record in records]
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+def test_export_import_round_trip(client, fmt):
+    body = "".join(json.dumps(record) + "\n" for record in SPECIAL)  # ensure_ascii: nhập lần đầu không phụ thuộc cách tách dòng
+    response = client.post("/todos/import?format=jsonl", content=body.encode())
+    assert response.status_code == 200 and f"Đã nhập {len(SPECIAL)} công việc" in response.text
+    before = exported(client, fmt)
+    titles = [record["title"] for record in before]
+    assert all(record["title"] in titles for record in SPECIAL)
+
+    # Nhập lại đúng dữ liệu vừa xuất (ký tự đặc biệt nằm nguyên văn trong file): mọi công việc xuất hiện hai lần
+    raw = client.get(f"/todos/export?format={fmt}").content
+    response = client.post(f"/todos/import?format={fmt}", content=raw)
+    assert response.status_code == 200, response.text
+    assert f"Đã nhập {len(before)} công việc" in response.text
+    assert "bỏ qua 0 dòng" in response.text
+    after = exported(client, fmt)
+    key = lambda record: json.dumps(record, sort_keys=True)
+    assert sorted(after, key=key) == sorted(before + before, key=key)
+
+def test_malformed_jsonl_lines_are_skipped(client):
+    body = '{"title": "một"}\n{"title": "hai"\n[1, 2]\n{"title": "ba"}\n'
+    response = client.post("/todos/import?format=jsonl", content=body.encode())
+    assert response.status_code == 200
+    assert "Đã nhập 2 công việc" in response.text and "bỏ qua 2 dòng" in response.text
+
+def test_import_revives_soft_deleted_tag(client):
+    # Tên nhãn là duy nhất kể cả với dòng đã xóa mềm: nhập lại tên đó phải khôi phục nhãn cũ, không trỏ vào dòng đã xóa
+    engine = client.app.state.engine
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE tags SET is_deleted = 1, deleted_at = CURRENT_TIMESTAMP WHERE name = 'Học tập'"))
+        tag_id = conn.execute(text("SELECT id FROM tags WHERE name = 'Học tập'")).scalar_one()
+    response = client.post("/todos/import?format=jsonl", content='{"title": "ôn thi", "tags": ["Học tập"]}\n'.encode())
+    assert "tạo 1 nhãn mới" in response.text
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, is_deleted FROM tags WHERE name = 'Học tập'")).one() == (tag_id, 0)
+    assert {"title": "ôn thi", "description": None, "status": "pending", "tags": ["Học tập"]} in exported(client, "jsonl")
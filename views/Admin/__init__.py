@@ -0,0 +1,3 @@
+# Đây là file __init__.py trong thư mục 'Admin'.
+# Package này chứa giao diện trang quản trị (danh sách user, thống kê nhãn, hoạt động gần đây).
+from .index import *  # Import tất cả các hàm và lớp từ index.py
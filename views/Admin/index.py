@@ -0,0 +1,102 @@
+# Đây là file index.py trong package views.Admin.
+# File này chứa các hàm tạo giao diện trang quản trị (/admin), dữ liệu lấy từ models/admin.py.
+# Bảng user và bảng nhãn được phân trang keyset: dòng cuối là "cảm biến" HTMX, khi cuộn tới sẽ gọi
+# GET /admin/users?after=... (hoặc /admin/tags?after=...) và được thay bằng các dòng của trang kế tiếp.
+
+from urllib.parse import urlencode
+from fasthtml import common as FH
+from models.admin import encode_tag_cursor
+from views import menubar
+
+def user_rows(users: list[dict], next_after: int | None = None):
+    """
+    Tạo các dòng Tr của một trang user, kèm dòng "cảm biến" tải trang kế tiếp nếu còn.
+
+    Args:
+        users (list[dict]): Các dòng của trang (xem models.admin.list_users_page).
+        next_after (int | None): Con trỏ của trang kế tiếp.
+
+    Returns:
+        list: Các thẻ Tr.
+    """
+    rows = [
+        FH.Tr(
+            FH.Td(user["id"]), FH.Td(user["login"]), FH.Td(user["name"]), FH.Td(user["email"]),
+            FH.Td("✓" if user["is_admin"] else ""),
+            FH.Td(user["pending"]), FH.Td(user["in_progress"]), FH.Td(user["completed"]), FH.Td(user["total"]),
+            FH.Td(user["last_activity"] or ""),
+        )
+        for user in users
+    ]
+    if next_after is not None:
+        rows.append(FH.Tr(
+            FH.Td("Đang tải thêm...", colspan="10"),
+            hx_get=f"/admin/users?{urlencode({'after': next_after})}",
+            hx_trigger="revealed",
+            hx_swap="outerHTML",
+            cls="admin-more",
+        ))
+    return rows
+
+def tag_rows(tags: list[tuple[int, str, int]], next_after: tuple[int, int] | None = None):
+    """
+    Tạo các dòng Tr của một trang thống kê nhãn, kèm dòng "cảm biến" tải trang kế tiếp nếu còn.
+
+    Args:
+        tags (list[tuple[int, str, int]]): Danh sách (tag_id, tên nhãn, số công việc).
+        next_after (tuple[int, int] | None): Con trỏ của trang kế tiếp.
+
+    Returns:
+        list: Các thẻ Tr.
+    """
+    rows = [FH.Tr(FH.Td(tag_id), FH.Td(name), FH.Td(count)) for tag_id, name, count in tags]
+    if next_after is not None:
+        rows.append(FH.Tr(
+            FH.Td("Đang tải thêm...", colspan="3"),
+            hx_get=f"/admin/tags?{urlencode({'after': encode_tag_cursor(next_after)})}",
+            hx_trigger="revealed",
+            hx_swap="outerHTML",
+            cls="admin-more",
+        ))
+    return rows
+
+def admin_page(request, totals: dict, users: list[dict], next_user: int | None,
+               tags: list[tuple[int, str, int]], next_tag: tuple[int, int] | None, recent: list[dict]):
+    """
+    Tạo giao diện trang quản trị.
+
+    Args:
+        request: Đối tượng request hiện tại.
+        totals (dict): Số liệu tổng (xem models.admin.get_admin_totals).
+        users (list[dict]): Trang user đầu tiên; next_user là con trỏ của trang kế tiếp.
+        tags (list[tuple[int, str, int]]): Trang nhãn đầu tiên; next_tag là con trỏ của trang kế tiếp.
+        recent (list[dict]): Các công việc được sửa gần đây nhất (xem models.admin.list_recent_activity).
+    """
+    return FH.Div(
+        menubar(request),
+        FH.H1("Quản trị"),
+        FH.P(
+            f"{totals['users']} user - {totals['total']} công việc "
+            f"(đang chờ {totals['pending']}, đang làm {totals['in_progress']}, hoàn thành {totals['completed']}) - "
+            f"{totals['tags']} nhãn đang dùng"
+        ),
+        FH.H2("Người dùng"),
+        FH.A("Xuất CSV", href="/admin/users/export", download=True),
+        FH.Table(
+            FH.Thead(FH.Tr(*[FH.Th(title) for title in (
+                "ID", "Đăng nhập", "Tên", "Email", "Quản trị", "Đang chờ", "Đang làm", "Hoàn thành", "Tổng", "Hoạt động gần nhất")])),
+            FH.Tbody(*user_rows(users, next_user)),
+            id="admin-users",
+        ),
+        FH.H2("Nhãn được dùng nhiều nhất"),
+        FH.Table(
+            FH.Thead(FH.Tr(FH.Th("ID"), FH.Th("Nhãn"), FH.Th("Số công việc"))),
+            FH.Tbody(*tag_rows(tags, next_tag)),
+            id="admin-tags",
+        ),
+        FH.H2("Hoạt động gần đây"),
+        FH.Ul(
+            *[FH.Li(f"{item['updated_at']} - {item['login']}: {item['title']} ({item['status']})") for item in recent],
+            id="admin-recent",
+        ),
+    )
@@ -4,4 +4,5 @@
 # ví dụ: from views.Home import index
 
 # Bạn cũng có thể đặt code khởi tạo cho package 'Home' tại đây nếu cần.
-from .index import *  # Import tất cả các hàm và lớp từ index.py
\ No newline at end of file
+from .index import *  # Import tất cả các hàm và lớp từ index.py
+from .rows import *  # Renderer nhanh cho danh sách công việc (dòng tuple -> HTML)
\ No newline at end of file
@@ -5,17 +5,268 @@
 # Ví dụ, bạn có thể định nghĩa một hàm `index_view()` tại đây để trả về
 # HTML cho trang chủ, hiển thị danh sách công việc của người dùng đang đăng nhập.
 
+import zlib
+from urllib.parse import urlencode
 from fasthtml import common as FH
 from sqlalchemy.orm import Session
-from models import User, Todo
+from models import User, Todo, TodoFilter, tag_index
 from views import *
+from views.fragment_cache import FragmentCache
+from views.Reminders import reminder_feed
+from views.Search import search_box
+from views.Stats import STATUS_LABELS, stats_placeholder, stats_widget
+from views.Tags import tag_input
 
-def home_page(request, user: User):
+# Các nút trong một thẻ Li thay chính thẻ Li chứa nó bằng fragment trả về
+# (dùng "closest li" thay vì id, nên cũng chạy được với các kết quả tìm kiếm)
+_ITEM_SWAP = {"hx_target": "closest li", "hx_swap": "outerHTML"}
+
+def todo_item(todo: Todo):
+    """
+    Tạo thẻ Li hiển thị một công việc, kèm các nút đổi trạng thái, sửa và xóa (HTMX).
+
+    Args:
+        todo (Todo): Công việc cần hiển thị (tags đã được nạp sẵn; tên nhãn lấy từ tag_index).
+    """
+    return FH.Li(
+        f"{todo.title} - Trạng thái: {todo.status} - Nhãn: {', '.join(tag_index.name(link.tag_id) for link in todo.tags)} - {todo.due_date}",
+        FH.Button("Đổi trạng thái", hx_post=f"/todos/{todo.id}/status", **_ITEM_SWAP),
+        FH.Button("Sửa", hx_get=f"/todos/{todo.id}/edit", **_ITEM_SWAP),
+        FH.Button("Xóa", hx_delete=f"/todos/{todo.id}", hx_confirm="Xóa công việc này?", **_ITEM_SWAP),
+        cls="todo-item",
+    )
+
+def todo_tags_editor(todo: Todo):
+    """
+    Tạo khung sửa nhãn của một công việc: mỗi nhãn có nút bỏ, cùng một ô để gắn thêm nhãn.
+    Các thao tác chỉ thay chính khung này (không ảnh hưởng form sửa đang nhập dở bên cạnh).
+
+    Args:
+        todo (Todo): Công việc (tags đã được nạp sẵn; tên nhãn lấy từ tag_index).
+    """
+    return FH.Div(
+        *[FH.Span(tag_index.name(link.tag_id), FH.Button("×", hx_delete=f"/todos/{todo.id}/tags/{link.tag_id}"), cls="todo-tag")
+          for link in todo.tags],
+        FH.Form(
+            *tag_input("name", f"tag-suggestions-{todo.id}", "Thêm nhãn", maxlength=50, required=True),
+            FH.Button("Gắn nhãn", type="submit"),
+            hx_post=f"/todos/{todo.id}/tags",
+        ),
+        hx_target="this",
+        hx_swap="outerHTML",
+        cls="todo-tags",
+    )
+
+def todo_edit_form(todo: Todo):
+    """
+    Tạo thẻ Li chứa form sửa một công việc (thay cho thẻ Li hiển thị khi bấm "Sửa").
+    Lưu gửi PUT /todos/{id}; Hủy tải lại thẻ Li hiển thị.
+
+    Args:
+        todo (Todo): Công việc cần sửa (tags đã được nạp sẵn).
+    """
+    due = todo.due_date.isoformat(timespec="minutes") if todo.due_date else ""
+    return FH.Li(
+        FH.Form(
+            FH.Input(name="title", value=todo.title, maxlength=100, required=True),
+            FH.Textarea(todo.description or "", name="description", maxlength=500),
+            FH.Select(*[FH.Option(label, value=status, selected=status == todo.status) for status, label in STATUS_LABELS.items()],
+                      name="status"),
+            FH.Input(name="priority", type="number", value=todo.priority),
+            FH.Input(name="due_date", type="datetime-local", value=due),
+            FH.Button("Lưu", type="submit"),
+            FH.Button("Hủy", type="button", hx_get=f"/todos/{todo.id}", **_ITEM_SWAP),
+            hx_put=f"/todos/{todo.id}",
+            **_ITEM_SWAP,
+        ),
+        todo_tags_editor(todo),
+        cls="todo-item",
+    )
+
+def new_todo_form():
+    """Tạo form thêm công việc: công việc mới được chèn vào đầu #todo-list, form được xóa trắng khi thành công."""
+    return FH.Form(
+        FH.Input(name="title", placeholder="Công việc mới", maxlength=100, required=True),
+        FH.Input(name="due_date", type="datetime-local"),
+        *tag_input("tags", "new-todo-tag-suggestions", "Nhãn, ngăn cách bằng dấu phẩy"),
+        FH.Button("Thêm", type="submit"),
+        hx_post="/todos",
+        hx_target="#todo-list",
+        hx_swap="afterbegin",
+        hx_on__after_request="if (event.detail.successful) this.reset()",
+        id="new-todo-form",
+    )
+
+def todo_error(message: str = "", oob: bool = True):
+    """Khung thông báo lỗi của các thao tác sửa công việc (được cập nhật bằng out-of-band swap)."""
+    return FH.Div(message, id="todo-error", role="alert", style="color:red;", hx_swap_oob="true" if oob else None)
+
+def todo_fragment(todo: Todo, stats: dict):
+    """
+    Fragment trả về sau khi tạo/sửa một công việc: thẻ Li của công việc đó, cùng widget thống kê
+    và khung lỗi được cập nhật bằng out-of-band swap (không render lại cả danh sách).
+
+    Args:
+        todo (Todo): Công việc vừa được ghi (tags đã được nạp sẵn).
+        stats (dict): Số liệu của user (models.stats.get_user_stats).
+    """
+    return todo_item(todo), stats_widget(stats, oob=True), todo_error()
+
+def todo_deleted_fragment(stats: dict):
+    """Fragment trả về sau khi xóa: nội dung chính rỗng (thẻ Li bị gỡ) và widget thống kê cập nhật."""
+    return "", stats_widget(stats, oob=True), todo_error()
+
+def todo_page_items(todos: list[Todo], next_cursor: str | None = None, filters: TodoFilter | None = None):
+    """
+    Tạo danh sách các thẻ Li cho một trang công việc.
+    Nếu còn trang sau, thêm một thẻ Li "cảm biến" ở cuối: khi người dùng cuộn tới (hx-trigger="revealed"),
+    HTMX sẽ gọi GET /todos?cursor=... (kèm bộ lọc) và thay thẻ này bằng các công việc của trang kế tiếp.
+
+    Args:
+        todos (list[Todo]): Các công việc của trang hiện tại.
+        next_cursor (str | None): Con trỏ của trang kế tiếp (None nếu đã hết).
+        filters (TodoFilter | None): Bộ lọc đang áp dụng.
+
+    Returns:
+        list: Các thẻ Li.
+    """
+    items = [todo_item(todo) for todo in todos]
+    filter_params = filters.to_params() if filters is not None else []
+    if not items and filter_params:
+        items.append(FH.Li("Không có công việc nào khớp bộ lọc.", cls="todo-list-empty"))
+    if next_cursor:
+        items.append(FH.Li(
+            "Đang tải thêm...",
+            hx_get=f"/todos?{urlencode(filter_params + [('cursor', next_cursor)])}",
+            hx_trigger="revealed",
+            hx_swap="outerHTML",
+            cls="todo-list-more",
+        ))
+    return items
+
+def todo_list(todos: list[Todo], next_cursor: str | None = None, filters: TodoFilter | None = None):
+    """
+    Tạo thẻ Ul chứa trang đầu tiên của danh sách công việc.
+
+    Args:
+        todos (list[Todo]): Các công việc của trang đầu tiên.
+        next_cursor (str | None): Con trỏ của trang kế tiếp, dùng cho cuộn vô hạn.
+        filters (TodoFilter | None): Bộ lọc đang áp dụng.
+    """
+    return FH.Ul(*todo_page_items(todos, next_cursor, filters), id="todo-list")
+
+def todo_filter_form(filters: TodoFilter | None = None):
+    """
+    Tạo form lọc danh sách công việc: mỗi khi một trường thay đổi, HTMX gọi GET /todos với các tham số lọc
+    và thay nội dung của #todo-list bằng trang đầu tiên của kết quả (lọc trong SQL, xem models/todo_filter.py).
+
+    Args:
+        filters (TodoFilter | None): Bộ lọc đang áp dụng (để điền sẵn các trường).
+    """
+    filters = filters or TodoFilter()
+    day = lambda value: value.date().isoformat() if value else ""
+    return FH.Form(
+        FH.Fieldset(
+            *[FH.Label(FH.Input(type="checkbox", name="status", value=status, checked=status in filters.statuses), label)
+              for status, label in STATUS_LABELS.items()],
+        ),
+        FH.Input(name="priority_min", type="number", placeholder="Ưu tiên từ", value=filters.priority_min),
+        FH.Input(name="priority_max", type="number", placeholder="Ưu tiên đến", value=filters.priority_max),
+        FH.Input(name="due_from", type="date", value=day(filters.due_from)),
+        FH.Input(name="due_to", type="date", value=day(filters.due_to)),
+        *tag_input("tags", "filter-tag-suggestions", "Lọc theo nhãn, ngăn cách bằng dấu phẩy", value=", ".join(filters.tags)),
+        FH.Select(
+            FH.Option("Có một trong các nhãn", value="any", selected=filters.tag_mode == "any"),
+            FH.Option("Có đủ các nhãn", value="all", selected=filters.tag_mode == "all"),
+            name="tag_mode",
+        ),
+        hx_get="/todos",
+        hx_trigger="change, submit",
+        hx_target="#todo-list",
+        hx_swap="innerHTML",
+        id="todo-filter",
+    )
+
+def todo_list_all_button():
+    """
+    Nút hiện toàn bộ danh sách công việc (theo bộ lọc đang chọn) thay cho danh sách phân trang:
+    GET /todos/all trả về cả thẻ Ul dạng stream (render nhanh từ dòng tuple, xem rows.py).
+    """
+    return FH.Button("Hiện tất cả công việc", type="button", hx_get="/todos/all", hx_include="#todo-filter",
+                     hx_target="#todo-list", hx_swap="outerHTML")
+
+# --- Cache fragment danh sách công việc và ETag ---
+# Danh sách công việc đã render được lưu theo user_id, gắn với phiên bản dữ liệu của user
+# (models.data_version). Phiên bản được lưu trong database nên giống nhau ở mọi worker và không
+# quay lại giá trị cũ khi khởi động lại: ETag do worker này tạo vẫn được worker khác công nhận.
+todo_list_cache = FragmentCache()
+
+def home_etag(request, version: tuple[int, int], user: User) -> str:
+    """
+    Tính ETag cho trang chủ từ user, phiên bản dữ liệu và các thông tin hiển thị trong menubar.
+
+    Args:
+        request: Đối tượng request hiện tại.
+        version (tuple[int, int]): Phiên bản dữ liệu của user (xem models.data_version.get_data_version).
+        user (User | UserSnapshot): Người dùng đang đăng nhập (tên của nó hiện trong tiêu đề trang).
+
+    Returns:
+        str: Giá trị ETag dạng weak (W/"...").
+    """
+    session = request.session
+    # Nội dung trang còn phụ thuộc vào tên (tiêu đề lấy từ snapshot user, menubar lấy từ session), quyền admin (menubar),
+    # kiểu request (HTMX trả về fragment) và bộ lọc danh sách trong query string.
+    # Đổi tên user không tăng phiên bản dữ liệu của user, nhưng snapshot trong cache được làm mới (USERS_SCOPE)
+    view_key = (f"{user.name}|{session.get('name')}|{session.get('is_admin')}|{'HX-Request' in request.headers}"
+                f"|{request.url.query}")
+    return f'W/"home-{user.id}-{version[0]}-{version[1]}-{zlib.crc32(view_key.encode("utf-8")):08x}"'
+
+def etag_matches(request, etag: str) -> bool:
+    """Kiểm tra header If-None-Match của request có chứa ETag hiện tại hay không."""
+    if_none_match = request.headers.get("if-none-match", "")
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+def not_modified(etag: str):
+    """Trả về response 304 Not Modified (không có nội dung) kèm ETag."""
+    return FH.Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "HX-Request"})
+
+def cache_headers(etag: str):
+    """Các header HTTP đi kèm trang chủ: ETag và yêu cầu trình duyệt luôn kiểm tra lại (revalidate)."""
+    return (
+        FH.HttpHeader("ETag", etag),
+        FH.HttpHeader("Cache-Control", "private, no-cache"),
+        FH.HttpHeader("Vary", "HX-Request"),
+    )
+
+def home_page(request, user: User, todos: list[Todo] | None = None, next_cursor: str | None = None, todo_list_html: str | None = None,
+              filters: TodoFilter | None = None):
+    """
+    Tạo giao diện trang chủ với danh sách công việc của người dùng.
+
+    Args:
+        request: Đối tượng request hiện tại.
+        user (User | UserSnapshot): Người dùng đang đăng nhập.
+        todos (list[Todo] | None): Trang đầu tiên của danh sách công việc, đã được nạp sẵn tags
+            (xem models.repository.load_todo_page). Nếu None thì dùng user.todos.
+        next_cursor (str | None): Con trỏ của trang kế tiếp, dùng cho cuộn vô hạn.
+        todo_list_html (str | None): Danh sách công việc đã render sẵn (lấy từ todo_list_cache).
+            Nếu có thì bỏ qua todos/next_cursor.
+        filters (TodoFilter | None): Bộ lọc đang áp dụng cho danh sách (xem models/todo_filter.py).
+    """
+    if todo_list_html is not None:
+        content = FH.NotStr(todo_list_html)
+    else:
+        content = todo_list(user.todos if todos is None else todos, next_cursor, filters)
     return FH.Div(
         menubar(request),
         FH.H1(f"Chào mừng trở lại, {user.name}!"),
+        stats_placeholder(),
+        reminder_feed(),
+        search_box(),
         FH.H2("Đây là danh sách công việc của bạn:"),
-        FH.Ul(*[
-            FH.Li(f"{todo.title} - Trạng thái: {todo.status} - Nhãn: {', '.join(tag.tag.name for tag in todo.tags)} - {todo.due_date}") for todo in user.todos
-        ])
+        new_todo_form(),
+        todo_filter_form(filters),
+        todo_list_all_button(),
+        todo_error(oob=False),
+        content
     )
@@ -0,0 +1,94 @@
+# File rows.py trong package views.Home
+# Renderer nhanh cho danh sách công việc, làm việc trên các dòng tuple thuần
+# (id, title, status, due_date, tuple id nhãn) do models.repository.load_todo_rows trả về.
+# Cách render bằng FT (todo_item -> FH.Li -> FH.to_xml) tạo vài đối tượng cho mỗi công việc rồi mới duyệt cây
+# để tuần tự hóa; ở đây mỗi công việc chỉ là MỘT f-string đã thoát ký tự, ghép thẳng thành chuỗi kết quả.
+# HTML sinh ra giống từng byte với cách render FT (cùng thứ tự thuộc tính, cùng thụt lề, cùng cách thoát
+# ký tự của fastcore.xml); tests/test_rows.py kiểm tra điều đó trên dữ liệu có ký tự đặc biệt.
+# Khi sửa todo_item/todo_page_items/todo_list trong index.py, phải sửa tương ứng ở đây.
+
+from html import escape  # Thoát ký tự đặc biệt giống fastcore.xml
+from urllib.parse import urlencode  # Tham số của link trang kế tiếp
+from models import TodoFilter, tag_index
+
+# Thụt lề của thẻ Li nằm trong thẻ Ul (fastcore.xml thụt 2 khoảng trắng cho mỗi cấp thẻ khối)
+_LIST_INDENT = "  "
+
+def _attr(value: str) -> str:
+    # Giá trị thuộc tính kèm dấu nháy, theo đúng quy tắc của fastcore.xml (_to_attr)
+    if "&" in value or "<" in value or ">" in value:
+        value = escape(value, quote=False)
+    if '"' in value:
+        return "'" + value.replace("'", "&#39;") + "'"
+    return f'"{value}"'
+
+def todo_item_html(row: tuple, indent: str = "") -> str:
+    """
+    HTML của thẻ Li một công việc (giống FH.to_xml(todo_item(todo))).
+
+    Args:
+        row (tuple): (id, title, status, due_date, tuple id nhãn).
+        indent (str): Thụt lề của thẻ (rỗng khi trả về như fragment, 2 khoảng trắng khi nằm trong Ul).
+    """
+    todo_id, title, status, due_date, tag_ids = row
+    names = ", ".join(map(tag_index.name, tag_ids))
+    text = escape(f"{title} - Trạng thái: {status} - Nhãn: {names} - {due_date}", quote=False)
+    return (f'{indent}<li class="todo-item">\n{text}'
+            f'<button hx-post="/todos/{todo_id}/status" hx-swap="outerHTML" hx-target="closest li">Đổi trạng thái</button>'
+            f'<button hx-get="/todos/{todo_id}/edit" hx-swap="outerHTML" hx-target="closest li">Sửa</button>'
+            f'<button hx-delete="/todos/{todo_id}" hx-confirm="Xóa công việc này?" hx-swap="outerHTML" hx-target="closest li">Xóa</button>'
+            f'{indent}</li>\n')
+
+def todo_rows_html(rows: list[tuple], indent: str = "") -> str:
+    """HTML của các thẻ Li cho nhiều công việc, ghép thành một chuỗi."""
+    return "".join([todo_item_html(row, indent) for row in rows])
+
+def todo_page_items_html(rows: list[tuple], next_cursor: str | None = None, filters: TodoFilter | None = None,
+                         indent: str = "") -> str:
+    """
+    HTML của một trang công việc (giống các thẻ Li của todo_page_items): các công việc, thông báo khi bộ lọc
+    không khớp công việc nào, và thẻ Li "cảm biến" tải trang kế tiếp.
+
+    Args:
+        rows (list[tuple]): Các dòng của trang (xem models.repository.load_todo_rows).
+        next_cursor (str | None): Con trỏ của trang kế tiếp (None nếu đã hết).
+        filters (TodoFilter | None): Bộ lọc đang áp dụng.
+        indent (str): Thụt lề của các thẻ Li.
+    """
+    html = todo_rows_html(rows, indent)
+    filter_params = filters.to_params() if filters is not None else []
+    if not rows and filter_params:
+        html += f'{indent}<li class="todo-list-empty">Không có công việc nào khớp bộ lọc.</li>\n'
+    if next_cursor:
+        url = f"/todos?{urlencode(filter_params + [('cursor', next_cursor)])}"
+        html += (f'{indent}<li hx-get={_attr(url)} hx-trigger="revealed" hx-swap="outerHTML" class="todo-list-more">'
+                 f'Đang tải thêm...</li>\n')
+    return html
+
+def todo_list_html(rows: list[tuple], next_cursor: str | None = None, filters: TodoFilter | None = None) -> str:
+    """HTML của thẻ Ul chứa trang đầu tiên của danh sách (giống FH.to_xml(todo_list(...)))."""
+    items = todo_page_items_html(rows, next_cursor, filters, _LIST_INDENT)
+    return f'<ul id="todo-list">\n{items}</ul>\n' if items else '<ul id="todo-list"></ul>\n'
+
+def iter_todo_list_html(pages, filters: TodoFilter | None = None):
+    """
+    Sinh HTML của thẻ Ul chứa TOÀN BỘ danh sách theo từng phần, mỗi trang dòng một phần, để gửi response
+    dạng stream (không giữ cả danh sách trong bộ nhớ). Ghép các phần lại giống FH.to_xml(todo_list(tất cả, None, filters)).
+
+    Args:
+        pages: Iterable các trang dòng (ví dụ models.repository.iter_todo_row_pages), được đọc dần.
+        filters (TodoFilter | None): Bộ lọc đang áp dụng.
+
+    Yields:
+        str: Các phần HTML.
+    """
+    opened = False
+    for rows in pages:
+        if not rows:
+            continue
+        html = todo_rows_html(rows, _LIST_INDENT)
+        if not opened:
+            html = '<ul id="todo-list">\n' + html
+            opened = True
+        yield html
+    yield "</ul>\n" if opened else todo_list_html([], None, filters)
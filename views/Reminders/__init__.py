@@ -0,0 +1,3 @@
+# Đây là file __init__.py trong thư mục 'Reminders'.
+# Package này chứa khung nhắc việc theo hạn chót (nhận qua Server-Sent Events).
+from .index import *  # Import tất cả các hàm và lớp từ index.py
@@ -0,0 +1,33 @@
+# Đây là file index.py trong package views.Reminders.
+# File này chứa khung nhắc việc trên trang chủ. Khung mở một kết nối Server-Sent Events tới GET /reminders
+# (extension sse của HTMX); mỗi sự kiện "reminder" chứa một thẻ Li được chèn vào đầu danh sách.
+# Nhắc việc do models.reminders.ReminderScheduler tạo ra khi công việc đến hạn.
+
+from fasthtml import common as FH
+
+# Extension SSE cho HTMX 2 (thêm vào hdrs của ứng dụng)
+SSE_EXTENSION_SRC = "https://cdn.jsdelivr.net/npm/htmx-ext-sse@2.2.2/sse.js"
+# Tên sự kiện SSE chứa nhắc việc
+REMINDER_EVENT = "reminder"
+
+def reminder_feed():
+    """Tạo khung nhận nhắc việc: HTMX giữ kết nối SSE và chèn mỗi nhắc việc mới vào đầu danh sách."""
+    return FH.Div(
+        FH.Ul(id="reminder-list", sse_swap=REMINDER_EVENT, hx_swap="afterbegin"),
+        hx_ext="sse",
+        sse_connect="/reminders",
+        id="reminders",
+    )
+
+def reminder_item(reminder):
+    """
+    Tạo thẻ Li cho một nhắc việc.
+
+    Args:
+        reminder (models.reminders.Reminder): Nhắc việc vừa đến hạn.
+    """
+    return FH.Li(f"Đến hạn: {reminder.title} ({reminder.due_date:%Y-%m-%d %H:%M})", cls="reminder")
+
+def reminder_event(reminder) -> str:
+    """Đóng gói một nhắc việc thành sự kiện SSE (dạng văn bản "event: ...\\ndata: ...")."""
+    return FH.sse_message(reminder_item(reminder), event=REMINDER_EVENT)
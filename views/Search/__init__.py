@@ -0,0 +1,3 @@
+# Đây là file __init__.py trong thư mục 'Search'.
+# Package này chứa giao diện tìm kiếm công việc (ô tìm kiếm và danh sách kết quả).
+from .index import *  # Import tất cả các hàm và lớp từ index.py
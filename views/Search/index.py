@@ -0,0 +1,48 @@
+# Đây là file index.py trong package views.Search.
+# File này chứa các hàm tạo giao diện cho chức năng tìm kiếm toàn văn (xem models/search.py).
+# Kết quả được trả về dưới dạng fragment HTML để HTMX chèn vào trang.
+
+from urllib.parse import urlencode
+from fasthtml import common as FH
+
+def search_box():
+    """
+    Tạo ô tìm kiếm: mỗi khi người dùng ngừng gõ 300ms, HTMX gọi GET /search
+    và thay nội dung của #search-results bằng kết quả trả về.
+    """
+    return FH.Div(
+        FH.Input(
+            type="search", name="q", placeholder="Tìm kiếm công việc...",
+            hx_get="/search", hx_trigger="input changed delay:300ms, search",
+            hx_target="#search-results", hx_swap="innerHTML",
+        ),
+        FH.Ul(id="search-results"),
+        cls="search",
+    )
+
+def search_results(items: list, query: str, page: int, has_more: bool):
+    """
+    Tạo danh sách các thẻ Li cho một trang kết quả tìm kiếm.
+    Nếu còn trang sau, thêm một thẻ Li "cảm biến" ở cuối để tải trang kế tiếp khi cuộn tới.
+
+    Args:
+        items (list): Các thẻ Li của trang kết quả (xem views.Home.todo_item).
+        query (str): Chuỗi tìm kiếm.
+        page (int): Số trang hiện tại.
+        has_more (bool): Còn trang sau hay không.
+
+    Returns:
+        list: Các thẻ Li.
+    """
+    if not items and page == 1:
+        return [FH.Li("Không tìm thấy công việc nào.")] if query.strip() else []
+    items = list(items)
+    if has_more:
+        items.append(FH.Li(
+            "Đang tải thêm...",
+            hx_get=f"/search?{urlencode({'q': query, 'page': page + 1})}",
+            hx_trigger="revealed",
+            hx_swap="outerHTML",
+            cls="search-more",
+        ))
+    return items
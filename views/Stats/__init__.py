@@ -0,0 +1,3 @@
+# Đây là file __init__.py trong thư mục 'Stats'.
+# Package này chứa các widget hiển thị số liệu thống kê công việc.
+from .index import *  # Import tất cả các hàm và lớp từ index.py
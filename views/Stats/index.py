@@ -0,0 +1,31 @@
+# Đây là file index.py trong package views.Stats.
+# File này chứa các hàm tạo widget thống kê (số công việc theo trạng thái, quá hạn).
+# Widget được tải riêng bằng HTMX sau khi trang chủ hiển thị, nên trang chủ vẫn có thể
+# trả về 304 (xem views.Home.home_etag) trong khi số quá hạn thay đổi theo thời gian.
+
+from fasthtml import common as FH
+
+# Nhãn hiển thị cho từng trạng thái
+STATUS_LABELS = {"pending": "Đang chờ", "in_progress": "Đang làm", "completed": "Hoàn thành"}
+
+def stats_placeholder():
+    """Tạo khung chứa widget thống kê; HTMX gọi GET /stats ngay khi trang được tải."""
+    return FH.Div("Đang tải thống kê...", id="user-stats", hx_get="/stats", hx_trigger="load", hx_swap="outerHTML")
+
+def stats_widget(stats: dict, oob: bool = False):
+    """
+    Tạo widget hiển thị số liệu thống kê của user.
+
+    Args:
+        stats (dict): Kết quả của models.stats.get_user_stats.
+        oob (bool): Gửi kèm như một out-of-band swap (cập nhật bộ đếm sau khi sửa công việc).
+    """
+    return FH.Div(
+        FH.Ul(
+            *[FH.Li(f"{label}: {stats[status]}") for status, label in STATUS_LABELS.items()],
+            FH.Li(f"Quá hạn: {stats['overdue']}"),
+            FH.Li(f"Tổng cộng: {stats['total']}"),
+        ),
+        id="user-stats",
+        hx_swap_oob="true" if oob else None,
+    )
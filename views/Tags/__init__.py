@@ -0,0 +1,3 @@
+# Đây là file __init__.py trong thư mục 'Tags'.
+# Package này chứa ô nhập nhãn có gợi ý theo tiền tố (autocomplete).
+from .index import *  # Import tất cả các hàm và lớp từ index.py
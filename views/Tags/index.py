@@ -0,0 +1,51 @@
+# Đây là file index.py trong package views.Tags.
+# File này chứa ô nhập nhãn có gợi ý (autocomplete): khi người dùng ngừng gõ, HTMX gọi GET /tags/suggest
+# và thay các Option của <datalist> đi kèm ô nhập; trình duyệt tự hiện danh sách gợi ý.
+# Gợi ý được tìm trong chỉ mục nhãn trong bộ nhớ (models/tag_index.py), không truy vấn bảng tags.
+
+from fasthtml import common as FH
+
+def tag_input(name: str, list_id: str, placeholder: str, **kwargs):
+    """
+    Tạo ô nhập nhãn kèm <datalist> chứa gợi ý.
+
+    Args:
+        name (str): Tên trường trong form ("name" cho một nhãn, "tags" cho danh sách ngăn cách bằng dấu phẩy).
+        list_id (str): id của datalist (phải duy nhất trên trang).
+        placeholder (str): Chữ gợi ý trong ô nhập.
+        **kwargs: Thuộc tính thêm cho thẻ Input (ví dụ maxlength, required).
+
+    Returns:
+        tuple: Thẻ Input và thẻ Datalist.
+    """
+    return (
+        FH.Input(
+            name=name, placeholder=placeholder, list=list_id, autocomplete="off",
+            hx_get="/tags/suggest", hx_trigger="input changed delay:150ms",
+            hx_target=f"#{list_id}", hx_swap="innerHTML", hx_sync="this:replace",
+            **kwargs,
+        ),
+        FH.Datalist(id=list_id),
+    )
+
+def tag_suggestions(value: str, names: list[str]):
+    """
+    Tạo các Option gợi ý cho ô nhập nhãn. Với ô nhập nhiều nhãn (ngăn cách bằng dấu phẩy), chỉ phần sau
+    dấu phẩy cuối cùng được gợi ý; giá trị của Option giữ nguyên các nhãn đã gõ trước đó.
+
+    Args:
+        value (str): Nội dung hiện tại của ô nhập.
+        names (list[str]): Tên các nhãn khớp với tiền tố (xem split_tag_prefix).
+
+    Returns:
+        list: Các thẻ Option.
+    """
+    head, _ = split_tag_prefix(value)
+    return [FH.Option(value=f"{head}{name}") for name in names]
+
+def split_tag_prefix(value: str) -> tuple[str, str]:
+    """
+    Tách nội dung ô nhập thành (phần giữ nguyên, tiền tố cần gợi ý), ví dụ "Học, cá" -> ("Học, ", "cá").
+    """
+    head, comma, prefix = value.rpartition(",")
+    return (f"{head}, " if comma else ""), prefix.strip()
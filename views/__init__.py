@@ -1,31 +1,80 @@
 # Import các thư viện và module cần thiết
-import datetime  # Để làm việc với ngày giờ
 from models.user import User  # Import model User để truy vấn thông tin người dùng
+from models.user_cache import UserSnapshot, user_cache  # Cache thông tin user trong tiến trình
+from models.data_version import USERS_SCOPE, get_scope_version, peek_scope_version  # Phát hiện thay đổi bảng users từ tiến trình khác
 from sqlalchemy.orm import Session  # Import Session để tương tác với database
 from fasthtml import common as FH  # Import thư viện FastHTML để xây dựng giao diện
 
 # --- Hàm trợ giúp (Helper Function) ---
-def get_current_user(session, engine) -> User | None:
+def get_current_user(session, engine) -> UserSnapshot | None:
     """
     Hàm này lấy thông tin của người dùng hiện tại đang đăng nhập dựa vào session.
+    Thông tin user được lấy từ cache trong tiến trình (models.user_cache) theo user_id;
+    chỉ khi cache không có (hoặc đã hết hạn) mới truy vấn database.
 
     Args:
         session: Đối tượng session của request, chứa thông tin phiên làm việc.
         engine: Đối tượng engine của SQLAlchemy để kết nối database.
 
     Returns:
-        User | None: Trả về đối tượng User nếu tìm thấy, ngược lại trả về None.
+        UserSnapshot | None: Trả về snapshot của User nếu tìm thấy, ngược lại trả về None.
     """
     # Kiểm tra xem có 'login' trong session không. Nếu không, tức là chưa đăng nhập.
     if 'login' not in session:
         return None
     
+    # Thử lấy từ cache trước (sau khi xóa các bản đã cũ nếu bảng users vừa bị sửa ở tiến trình khác)
+    user_cache.sync(get_scope_version(USERS_SCOPE))
+    user_id = session.get('user_id')
+    if user_id is not None:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+    return _load_current_user(engine, user_id, session.get('login'))
+
+def _load_current_user(engine, user_id: int | None, login: str | None) -> UserSnapshot | None:
+    # Truy vấn user từ database (khi cache không có) rồi lưu vào cache
     # Mở một session mới để truy vấn database
     with Session(engine) as db:
-        # Truy vấn bảng 'users' để tìm người dùng có 'login' trùng với giá trị trong session
-        user = db.query(User).filter(User.login == session.get('login')).first()
-        db.close() # Đóng session sau khi xong việc
-        return user # Trả về đối tượng user hoặc None nếu không tìm thấy
+        if user_id is not None:
+            # Truy vấn theo khóa chính
+            user = db.get(User, user_id)
+        else:
+            # Session cũ không có user_id: tìm theo 'login'
+            user = db.query(User).filter(User.login == login).first()
+        if not user:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+    user_cache.put(snapshot)
+    return snapshot # Trả về snapshot của user
+
+async def get_current_user_async(session, executor) -> UserSnapshot | None:
+    """
+    Phiên bản async của get_current_user cho route async: kiểm tra cache ngay trong event loop,
+    chỉ truy vấn database (bảng data_versions hoặc users) qua executor khi cần.
+
+    Args:
+        session: Đối tượng session của request, chứa thông tin phiên làm việc.
+        executor (models.db_executor.DbExecutor): Pool truy cập database.
+
+    Returns:
+        UserSnapshot | None: Trả về snapshot của User nếu tìm thấy, ngược lại trả về None.
+    """
+    if 'login' not in session:
+        return None
+
+    users_version = peek_scope_version(USERS_SCOPE)
+    if users_version is None:
+        users_version = await executor.run(get_scope_version, USERS_SCOPE)
+    user_cache.sync(users_version)
+    user_id = session.get('user_id')
+    if user_id is not None:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+    return await executor.run(_load_current_user, executor.engine, user_id, session.get('login'))
 
 # --- Hàm tạo giao diện (View Function) ---
 def login_view(error_msg: str = ""):
@@ -79,25 +128,13 @@ def require_login(request, session):
                             để chuyển hướng người dùng đến trang login. Nếu đã đăng nhập và hợp lệ,
                             trả về None để cho phép request được tiếp tục xử lý bình thường.
     """
-    # Nếu không có 'login' trong session, chuyển hướng ngay đến trang /login
+    # Nếu không có 'login' trong session, chuyển hướng ngay đến trang /login.
+    # Session không hoạt động quá 15 phút đã bị store coi là hết hạn (models.session_store.SESSION_IDLE_TIMEOUT),
+    # nên khi đó session ở đây rỗng. Thời điểm hoạt động được middleware gia hạn theo lô
+    # (views/sessions.py), không còn ghi vào session ở mỗi request.
     if 'login' not in session:
         return FH.Redirect("/login")
-    
-    # Kiểm tra thời gian không hoạt động. Nếu quá 15 phút, xóa session và bắt đăng nhập lại.
-    # Lấy thời gian hiện tại
-    now = datetime.datetime.now()
-    # Lấy thời gian hoạt động cuối cùng từ session (được lưu dưới dạng chuỗi ISO format)
-    last_active_str = session.get('last_active')
-    if last_active_str:
-        last_active = datetime.datetime.fromisoformat(last_active_str)
-        # Nếu khoảng thời gian từ lần hoạt động cuối đến giờ lớn hơn 15 phút
-        if now - last_active > datetime.timedelta(minutes=15):
-            session.clear()  # Xóa toàn bộ dữ liệu trong session
-            return FH.Redirect("/login") # Chuyển hướng về trang login
-
-    # Nếu mọi thứ đều ổn, cập nhật lại thời gian hoạt động cuối cùng là thời gian hiện tại
-    session['last_active'] = now.isoformat()
-    
+
     # Trả về None để cho phép request đi tiếp
     return None
 
@@ -0,0 +1,63 @@
+# File fragment_cache.py trong package views
+# Bộ nhớ đệm cho các đoạn HTML (fragment) đã render sẵn.
+# Mỗi phần tử được khóa theo một "key" (ví dụ user_id) và gắn với một "version"
+# (ví dụ phiên bản dữ liệu của user, xem models.data_version). Khi version thay đổi,
+# phần tử cũ tự động bị coi là hết hạn.
+
+import threading  # Khóa để dùng an toàn giữa nhiều thread
+from collections import OrderedDict  # Giữ thứ tự truy cập cho chính sách LRU
+
+class FragmentCache:
+    """
+    Cache LRU cho các đoạn HTML đã render, có kiểm tra phiên bản.
+
+    Args:
+        maxsize (int): Số fragment tối đa giữ trong cache.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version) -> str | None:
+        """
+        Lấy fragment đã render nếu còn đúng phiên bản.
+
+        Args:
+            key: Khóa của fragment (ví dụ user_id).
+            version: Phiên bản dữ liệu hiện tại.
+
+        Returns:
+            str | None: Chuỗi HTML, hoặc None nếu không có/đã cũ.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, html: str):
+        """Lưu fragment đã render cùng phiên bản của nó."""
+        with self._lock:
+            self._data[key] = (version, html)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Xóa toàn bộ cache và đặt lại bộ đếm."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Trả về số liệu thống kê: hits, misses, size, maxsize."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
@@ -0,0 +1,331 @@
+# File metrics.py trong package views
+# Đo đạc (instrumentation) cho ứng dụng web, xuất ra định dạng văn bản của Prometheus tại /metrics:
+# - MetricsMiddleware (ASGI): histogram độ trễ theo route, số request đang xử lý, kích thước response.
+# - instrument_engine: dùng sự kiện của SQLAlchemy để đếm số câu lệnh SQL và thời gian ở database
+#   trên mỗi request, đồng thời ghi log các câu lệnh chậm (thay cho echo=True in mọi câu lệnh).
+
+import bisect  # Tìm bucket của histogram
+import logging  # Ghi log câu lệnh chậm
+import threading  # Khóa cho các bộ đếm dùng chung
+import time  # Đo thời gian
+from contextvars import ContextVar  # Gắn bộ đếm SQL với request hiện tại (kể cả khi chạy trong threadpool)
+from sqlalchemy import event  # Sự kiện của engine
+from fasthtml import common as FH  # Response của Starlette
+from models.write_batcher import BATCH_SIZE_BUCKETS, QUEUE_WAIT_BUCKETS  # Mốc phân bố của thread ghi theo lô
+
+# Logger cho câu lệnh SQL chậm
+slow_query_logger = logging.getLogger("todo.sql.slow")
+
+# Các mốc (giây) của histogram độ trễ và thời gian database
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Các mốc (byte) của histogram kích thước response
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Các mốc của histogram số câu lệnh SQL trên mỗi request
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class Histogram:
+    """Histogram tích lũy kiểu Prometheus, tách theo bộ nhãn (labels)."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # labels -> [số đếm theo bucket..., +Inf, tổng, số mẫu]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        """Ghi nhận một giá trị quan sát cho bộ nhãn labels."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self, label_names: tuple) -> list[str]:
+        """Xuất histogram ra các dòng văn bản Prometheus (bucket là số đếm tích lũy)."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(label_names, labels))
+            prefix = f"{base}," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+def _escape(value) -> str:
+    # Thoát các ký tự đặc biệt trong giá trị nhãn Prometheus
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    """Tập hợp các số liệu đo của ứng dụng."""
+
+    LABELS = ("method", "route", "status")
+
+    def __init__(self):
+        self.request_latency = Histogram("http_request_duration_seconds", "Độ trễ xử lý request.", LATENCY_BUCKETS)
+        self.response_size = Histogram("http_response_size_bytes", "Kích thước thân response.", SIZE_BUCKETS)
+        self.db_time = Histogram("db_time_per_request_seconds", "Tổng thời gian chạy câu lệnh SQL trong một request.", LATENCY_BUCKETS)
+        self.db_statements = Histogram("db_statements_per_request", "Số câu lệnh SQL trong một request.", STATEMENT_BUCKETS)
+        self.in_flight = 0
+        self.statements_total = 0
+        self.slow_queries_total = 0
+        self.collectors = {}  # Tên -> hàm trả về thêm dòng số liệu (xem register_collector)
+        self._lock = threading.Lock()
+
+    def register_collector(self, name: str, collector):
+        """
+        Đăng ký (hoặc thay thế, nếu trùng tên) một hàm không tham số trả về list các dòng văn bản Prometheus,
+        được gọi mỗi lần render.
+        """
+        self.collectors[name] = collector
+
+    def render(self) -> str:
+        """Xuất toàn bộ số liệu ra định dạng văn bản của Prometheus."""
+        lines = [
+            "# HELP http_requests_in_flight Số request đang được xử lý.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP db_statements_total Tổng số câu lệnh SQL đã thực thi.",
+            "# TYPE db_statements_total counter",
+            f"db_statements_total {self.statements_total}",
+            "# HELP db_slow_queries_total Số câu lệnh SQL chạy chậm hơn ngưỡng.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {self.slow_queries_total}",
+        ]
+        lines += self.request_latency.render(self.LABELS)
+        lines += self.response_size.render(self.LABELS)
+        lines += self.db_time.render(("route",))
+        lines += self.db_statements.render(("route",))
+        for collector in list(self.collectors.values()):
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+# Số liệu dùng chung cho toàn tiến trình
+metrics = Metrics()
+
+class _RequestDbStats:
+    # Bộ đếm SQL của một request
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+# Bộ đếm SQL của request hiện tại (None khi không ở trong request, ví dụ lúc khởi động)
+_current_db_stats: ContextVar[_RequestDbStats | None] = ContextVar("current_db_stats", default=None)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware đo độ trễ, kích thước response và số request đang xử lý cho từng route.
+    Route được lấy theo mẫu đường dẫn (ví dụ "/todos/{id}") để số bộ nhãn không tăng vô hạn.
+    """
+
+    def __init__(self, app, metrics: Metrics = metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        m = self.metrics
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        db_stats = _RequestDbStats()
+        token = _current_db_stats.set(db_stats)
+        with m._lock:
+            m.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            with m._lock:
+                m.in_flight -= 1
+            _current_db_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            labels = (scope["method"], route, str(status))
+            m.request_latency.observe(labels, elapsed)
+            m.response_size.observe(labels, size)
+            m.db_time.observe((route,), db_stats.seconds)
+            m.db_statements.observe((route,), db_stats.statements)
+
+def instrument_engine(engine, slow_query_ms: float = 100.0, metrics: Metrics = metrics):
+    """
+    Gắn các sự kiện đo vào engine: đếm câu lệnh, cộng thời gian database cho request hiện tại
+    và ghi log WARNING (logger "todo.sql.slow") cho câu lệnh chạy lâu hơn slow_query_ms.
+
+    Args:
+        engine: Engine SQLAlchemy.
+        slow_query_ms (float): Ngưỡng (mili giây) để coi một câu lệnh là chậm.
+        metrics (Metrics): Nơi ghi số liệu.
+    """
+    threshold = slow_query_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        with metrics._lock:
+            metrics.statements_total += 1
+        db_stats = _current_db_stats.get()
+        if db_stats is not None:
+            db_stats.statements += 1
+            db_stats.seconds += elapsed
+        if elapsed >= threshold:
+            with metrics._lock:
+                metrics.slow_queries_total += 1
+            slow_query_logger.warning("Câu lệnh SQL chậm (%.1f ms): %s", elapsed * 1000, " ".join(statement.split()))
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        # Câu lệnh lỗi không gọi after_cursor_execute: bỏ mốc thời gian đã ghi để không lệch ngăn xếp
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+def pool_collector(prefix: str, pool, noun: str, run_name: str = "run_seconds_total", run_help: str = "Tổng thời gian chạy."):
+    """
+    Tạo collector xuất số liệu của một pool thread giới hạn (models.bounded_pool.BoundedPool):
+    số thao tác đang chờ/chạy, số bị từ chối vì quá tải và tổng thời gian chờ/chạy.
+
+    Args:
+        prefix (str): Tiền tố tên số liệu (ví dụ "password_pool").
+        pool: Pool cần theo dõi.
+        noun (str): Tên thao tác dùng trong phần mô tả (ví dụ "băm").
+        run_name (str): Tên (sau tiền tố) của số liệu tổng thời gian chạy.
+        run_help (str): Mô tả của số liệu tổng thời gian chạy.
+    """
+    def collect() -> list[str]:
+        stats = pool.stats()
+        return [
+            f"# HELP {prefix}_workers Số thread {noun}.",
+            f"# TYPE {prefix}_workers gauge",
+            f"{prefix}_workers {stats['workers']}",
+            f"# HELP {prefix}_pending Số thao tác {noun} đang chạy hoặc đang chờ.",
+            f"# TYPE {prefix}_pending gauge",
+            f"{prefix}_pending {stats['pending']}",
+            f"# HELP {prefix}_queued Số thao tác {noun} đang chờ thread rảnh.",
+            f"# TYPE {prefix}_queued gauge",
+            f"{prefix}_queued {stats['queued']}",
+            f"# HELP {prefix}_rejected_total Số thao tác bị từ chối vì hàng đợi đầy.",
+            f"# TYPE {prefix}_rejected_total counter",
+            f"{prefix}_rejected_total {stats['rejected_total']}",
+            f"# HELP {prefix}_completed_total Số thao tác {noun} đã xong.",
+            f"# TYPE {prefix}_completed_total counter",
+            f"{prefix}_completed_total {stats['completed_total']}",
+            f"# HELP {prefix}_wait_seconds_total Tổng thời gian chờ trong hàng đợi.",
+            f"# TYPE {prefix}_wait_seconds_total counter",
+            f"{prefix}_wait_seconds_total {stats['wait_seconds_total']}",
+            f"# HELP {prefix}_{run_name} {run_help}",
+            f"# TYPE {prefix}_{run_name} counter",
+            f"{prefix}_{run_name} {stats['run_seconds_total']}",
+        ]
+    return collect
+
+def password_pool_collector(pool):
+    """Collector cho pool băm mật khẩu (models.passwords.PasswordHasherPool)."""
+    return pool_collector("password_pool", pool, "băm", "hash_seconds_total", "Tổng thời gian băm.")
+
+def db_executor_collector(executor):
+    """Collector cho pool truy cập database của route async (models.db_executor.DbExecutor)."""
+    return pool_collector("db_executor", executor, "truy cập database", run_help="Tổng thời gian chạy thao tác database.")
+
+def reminder_collector(scheduler):
+    """Collector cho bộ lập lịch nhắc việc (models.reminders.ReminderScheduler)."""
+    def collect() -> list[str]:
+        counters = dict(scheduler.counters)
+        lines = [
+            "# HELP reminder_subscribers Số kết nối SSE đang nhận nhắc việc.",
+            "# TYPE reminder_subscribers gauge",
+            f"reminder_subscribers {scheduler.subscriber_count()}",
+            "# HELP reminder_scheduled Số công việc đang chờ nhắc trong cửa sổ hiện tại (kích thước heap).",
+            "# TYPE reminder_scheduled gauge",
+            f"reminder_scheduled {scheduler.scheduled_count()}",
+        ]
+        for name, help_text in (
+            ("resyncs_total", "Số lần nạp lại cửa sổ công việc sắp đến hạn."),
+            ("loaded_total", "Tổng số dòng đọc được khi nạp cửa sổ."),
+            ("fired_total", "Số nhắc việc đã đến hạn."),
+            ("delivered_total", "Số nhắc việc đã gửi tới kết nối SSE."),
+            ("dropped_total", "Số nhắc việc bị bỏ vì kết nối không đọc kịp."),
+        ):
+            lines += [f"# HELP reminder_{name} {help_text}", f"# TYPE reminder_{name} counter", f"reminder_{name} {counters[name]}"]
+        return lines
+    return collect
+
+def metrics_response():
+    """Tạo response văn bản Prometheus cho route /metrics."""
+    return FH.Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def tag_index_collector(index):
+    """Collector cho chỉ mục nhãn trong bộ nhớ (models.tag_index.TagIndex)."""
+    def collect() -> list[str]:
+        stats = index.stats()
+        return [
+            "# HELP tag_index_size Số nhãn trong chỉ mục nhãn của tiến trình.",
+            "# TYPE tag_index_size gauge",
+            f"tag_index_size {stats['size']}",
+            "# HELP tag_index_reloads_total Số lần nạp lại toàn bộ chỉ mục nhãn.",
+            "# TYPE tag_index_reloads_total counter",
+            f"tag_index_reloads_total {stats['reloads']}",
+            "# HELP tag_index_refreshes_total Số lần chỉ nạp thêm các nhãn mới vào chỉ mục.",
+            "# TYPE tag_index_refreshes_total counter",
+            f"tag_index_refreshes_total {stats['refreshes']}",
+        ]
+    return collect
+
+def _bucket_lines(name: str, help_text: str, buckets: tuple, counts: list, total, count: int) -> list[str]:
+    # Xuất một phân bố đã đếm sẵn theo bucket (+Inf ở cuối) thành histogram Prometheus
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    cumulative = 0
+    for bound, bucket_count in zip(buckets + ("+Inf",), counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+    return lines + [f"{name}_sum {total}", f"{name}_count {count}"]
+
+def write_batcher_collector(batcher):
+    """Collector cho thread ghi theo lô (models.write_batcher.WriteBatcher)."""
+    def collect() -> list[str]:
+        stats = batcher.stats()
+        lines = [
+            "# HELP write_batcher_pending Số thao tác ghi đang chờ hoặc đang chạy.",
+            "# TYPE write_batcher_pending gauge",
+            f"write_batcher_pending {stats['pending']}",
+        ]
+        for name, help_text in (
+            ("submitted_total", "Số thao tác ghi đã gửi."),
+            ("rejected_total", "Số thao tác ghi bị từ chối vì hàng đợi đầy."),
+            ("batches_total", "Số lô (transaction) đã ghi."),
+            ("writes_total", "Số thao tác ghi đã chạy trong các lô."),
+            ("failed_total", "Số thao tác ghi báo lỗi (đã hoàn tác riêng thao tác đó)."),
+            ("run_seconds_total", "Tổng thời gian chạy các lô (gồm cả commit)."),
+        ):
+            lines += [f"# HELP write_batcher_{name} {help_text}", f"# TYPE write_batcher_{name} counter",
+                      f"write_batcher_{name} {stats[name]}"]
+        lines += _bucket_lines("write_batcher_batch_size", "Số thao tác ghi trong mỗi lô.", BATCH_SIZE_BUCKETS,
+                               stats["batch_sizes"], stats["writes_total"], stats["batches_total"])
+        lines += _bucket_lines("write_batcher_queue_wait_seconds", "Thời gian thao tác ghi chờ trong hàng đợi đến khi lô bắt đầu chạy.",
+                               QUEUE_WAIT_BUCKETS, stats["queue_waits"], stats["queue_wait_seconds_total"], sum(stats["queue_waits"]))
+        return lines
+    return collect
@@ -0,0 +1,188 @@
+# File sessions.py trong package views
+# Session phía server thay cho SessionMiddleware của Starlette (vốn lưu toàn bộ session trong cookie đã ký).
+# - Cookie chỉ chứa một ID ngẫu nhiên; nội dung session nằm trong models.session_store.
+# - Set-Cookie chỉ được gửi khi ID thay đổi (đăng nhập) hoặc khi session bị xóa (đăng xuất),
+#   không còn ký và gửi lại cookie ở mỗi response.
+# - Thời điểm hoạt động được gom lại: session chỉ được gia hạn (ghi vào store) tối đa một lần mỗi touch_interval.
+# - SessionSweeper chạy nền, định kỳ xóa các session đã hết hạn.
+
+import logging  # Ghi log lỗi khi dọn session
+import threading  # Thread nền dọn session
+import time  # Thời gian hiện tại
+from starlette.concurrency import run_in_threadpool  # Chạy thao tác I/O của store ngoài event loop
+from starlette.requests import HTTPConnection  # Đọc cookie của request
+from models.session_store import SESSION_TOUCH_INTERVAL, new_session_id
+
+session_logger = logging.getLogger("todo.sessions")
+
+class ServerSession(dict):
+    """
+    Nội dung session của một request (dùng như dict, giống request.session của Starlette).
+    Ghi nhận việc bị sửa để middleware biết có cần lưu lại hay không.
+
+    Args:
+        data (dict | None): Nội dung đọc từ store.
+        session_id (str | None): ID của session (None nếu là session mới).
+        expires_at (float): Thời điểm hết hạn hiện tại trong store.
+    """
+
+    def __init__(self, data: dict | None = None, session_id: str | None = None, expires_at: float = 0.0):
+        super().__init__(data or {})
+        self.session_id = session_id
+        self.expires_at = expires_at
+        self.modified = False
+        self.rotate = False
+
+    def cycle_id(self):
+        """Đổi sang ID mới khi lưu (gọi lúc đăng nhập để chống tấn công cố định session - session fixation)."""
+        self.rotate = True
+        self.modified = True
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        super().__delitem__(key)
+
+    def clear(self):
+        self.modified = True
+        super().clear()
+
+    def pop(self, *args):
+        self.modified = True
+        return super().pop(*args)
+
+    def popitem(self):
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.modified = True
+        super().update(*args, **kwargs)
+
+class ServerSessionMiddleware:
+    """
+    ASGI middleware gắn ServerSession vào scope["session"] và lưu lại vào store trước khi gửi response.
+
+    Args:
+        app: Ứng dụng ASGI bên trong.
+        store (models.session_store.SessionStore): Nơi lưu session.
+        cookie_name (str): Tên cookie chứa ID session.
+        touch_interval (float): Khoảng thời gian tối thiểu (giây) giữa hai lần gia hạn session.
+        path (str): Thuộc tính path của cookie.
+        same_site (str): Thuộc tính SameSite của cookie.
+        https_only (bool): Thêm thuộc tính Secure cho cookie.
+    """
+
+    def __init__(self, app, store, cookie_name: str = "sid", touch_interval: float = SESSION_TOUCH_INTERVAL,
+                 path: str = "/", same_site: str = "lax", https_only: bool = False):
+        self.app = app
+        self.store = store
+        self.cookie_name = cookie_name
+        self.touch_interval = touch_interval
+        flags = f"path={path}; httponly; samesite={same_site}"
+        if https_only:
+            flags += "; secure"
+        self._flags = flags
+
+    async def _call(self, func, *args):
+        # Store ghi database thì chạy trong threadpool để không chặn event loop
+        if self.store.blocking:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        cookie_id = HTTPConnection(scope).cookies.get(self.cookie_name)
+        loaded = await self._call(self.store.load, cookie_id) if cookie_id else None
+        session = ServerSession(loaded[0], cookie_id, loaded[1]) if loaded else ServerSession()
+        scope["session"] = session
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                cookie = await self._persist(session)
+                if cookie is None and cookie_id and session.session_id is None:
+                    # Cookie trỏ tới session đã hết hạn hoặc không tồn tại: xóa nó để không phải tra cứu lại
+                    cookie = self._expired_cookie()
+                if cookie is not None:
+                    message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _persist(self, session: ServerSession) -> str | None:
+        # Lưu thay đổi của session vào store; trả về giá trị header Set-Cookie nếu cần gửi
+        if session.modified:
+            if not session:
+                # Session bị xóa hết (đăng xuất)
+                if session.session_id is not None:
+                    await self._call(self.store.delete, session.session_id)
+                    session.session_id = None
+                    return self._expired_cookie()
+                return None
+            old_id = session.session_id
+            if old_id is None or session.rotate:
+                session.session_id = new_session_id()
+                if old_id is not None:
+                    await self._call(self.store.delete, old_id)
+            session.expires_at = await self._call(self.store.save, session.session_id, dict(session))
+            if session.session_id != old_id:
+                return f"{self.cookie_name}={session.session_id}; {self._flags}"
+            return None
+        if session.session_id is not None:
+            # Chỉ gia hạn khi lần gia hạn trước đã cách đây ít nhất touch_interval
+            last_touch = session.expires_at - self.store.idle_timeout
+            if time.time() - last_touch >= self.touch_interval:
+                session.expires_at = await self._call(self.store.touch, session.session_id)
+        return None
+
+    def _expired_cookie(self) -> str:
+        return f"{self.cookie_name}=null; expires=Thu, 01 Jan 1970 00:00:00 GMT; {self._flags}"
+
+class SessionSweeper:
+    """
+    Thread nền định kỳ xóa các session đã hết hạn khỏi store.
+
+    Args:
+        store (models.session_store.SessionStore): Nơi lưu session.
+        interval (float): Khoảng thời gian (giây) giữa hai lần dọn.
+    """
+
+    def __init__(self, store, interval: float = 300.0):
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Bắt đầu thread dọn dẹp (gọi khi ứng dụng khởi động)."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Dừng thread dọn dẹp (gọi khi ứng dụng tắt)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                deleted = self.store.sweep()
+                if deleted:
+                    session_logger.info("Đã xóa %d session hết hạn", deleted)
+            except Exception:
+                session_logger.exception("Lỗi khi dọn session hết hạn")
@@ -0,0 +1,64 @@
+# File todo_io.py trong package views
+# Các hàm trợ giúp cho route nhập/xuất công việc (xem models/todo_io.py).
+
+import codecs  # Giải mã UTF-8 theo từng phần (không cắt đôi ký tự nhiều byte)
+import anyio.from_thread  # Gọi code bất đồng bộ từ thread của threadpool
+from fasthtml import common as FH  # Response của Starlette
+
+# Kiểu nội dung (Content-Type) tương ứng với từng định dạng
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "jsonl": "application/x-ndjson; charset=utf-8"}
+
+def request_lines(request):
+    """
+    Đọc thân (body) của request theo từng dòng văn bản mà không nạp hết vào bộ nhớ.
+    Hàm này là generator ĐỒNG BỘ, phải được chạy trong threadpool (run_in_threadpool):
+    mỗi lần cần thêm dữ liệu, nó lấy phần tiếp theo của luồng body từ event loop.
+
+    Args:
+        request: Đối tượng request của Starlette.
+
+    Yields:
+        str: Từng dòng (giữ nguyên ký tự xuống dòng để csv đọc được trường nhiều dòng).
+        Chỉ tách dòng ở "\n" ("\r" của "\r\n" đi theo dòng, csv và json đều bỏ qua nó): các ký tự ngắt dòng
+        Unicode khác (U+2028, U+0085, \x0b, \x0c) có thể nằm nguyên văn trong dữ liệu xuất (ensure_ascii=False).
+    """
+    stream = request.stream().__aiter__()
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    while True:
+        try:
+            chunk = anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            break
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        # Phần sau "\n" cuối cùng có thể chưa hoàn chỉnh: giữ lại chờ phần dữ liệu tiếp theo
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def export_response(lines, fmt: str, filename: str):
+    """
+    Tạo response dạng streaming cho dữ liệu xuất: từng dòng được gửi ngay khi đọc xong từ database.
+
+    Args:
+        lines: Generator các dòng văn bản (xem models.todo_io.iter_export_lines).
+        fmt (str): Định dạng ('csv' hoặc 'jsonl').
+        filename (str): Tên file gợi ý cho trình duyệt khi tải về.
+    """
+    return FH.StreamingResponse(
+        (line.encode("utf-8") for line in lines),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+def import_result(stats: dict):
+    """Tạo fragment HTML báo kết quả nhập dữ liệu."""
+    return FH.Div(
+        f"Đã nhập {stats['todos']} công việc, tạo {stats['tags_created']} nhãn mới, "
+        f"gán {stats['links']} nhãn, bỏ qua {stats['skipped']} dòng không hợp lệ.",
+        id="import-result",
+    )
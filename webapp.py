@@ -0,0 +1,698 @@
+# File webapp.py
+# Factory tạo ứng dụng web và điểm chạy server nhiều tiến trình (worker).
+# - create_app(config): tạo engine, áp dụng migration, đăng ký route và trả về ứng dụng FastHTML.
+#   Mọi import nặng (FastHTML, SQLAlchemy, models, views) nằm bên trong hàm, nên "import webapp" gần như
+#   không tốn gì; mỗi tiến trình gọi create_app sẽ có engine (pool kết nối) riêng của nó.
+# - serve(): áp dụng migration một lần ở tiến trình cha, sau đó chạy N worker uvicorn cùng dùng
+#   một file SQLite ở chế độ WAL (người đọc không bị chặn bởi người ghi, các worker ghi lần lượt nhờ busy_timeout).
+#   Cache trong từng worker được làm mới qua phiên bản dữ liệu lưu trong database (xem models/data_version.py).
+#
+# Cách dùng:
+#   python main.py --workers 4 --port 8000
+#   uvicorn webapp:create_app --factory --workers 4
+# Cấu hình máy chủ có thể ghi đè bằng biến môi trường TODO_APP_HOST, TODO_APP_PORT, TODO_APP_WORKERS, TODO_APP_MIGRATE,
+# TODO_APP_SESSION_BACKEND, ... (xem DEFAULT_APP_CONFIG);
+# cấu hình database đọc từ TODO_DB_* (xem models/engine.py).
+
+import os  # Đọc biến môi trường
+import time  # Đo thời gian khởi động
+
+# Giá trị mặc định của cấu hình ứng dụng (ngoài cấu hình database)
+DEFAULT_APP_CONFIG = {
+    "host": "0.0.0.0",  # Chạy trên tất cả các địa chỉ IP của máy
+    "port": 80,         # Cổng HTTP
+    "workers": 1,       # Số tiến trình worker
+    "migrate": True,    # Áp dụng migration khi tạo ứng dụng (serve() tắt nó ở worker vì tiến trình cha đã làm)
+    "session_backend": "sqlite",    # Nơi lưu session phía server: "sqlite" (dùng chung giữa các worker) hoặc "memory"
+    "session_db_url": "",           # Database riêng cho session "sqlite" (rỗng = file <database>.sessions.db cạnh database dữ liệu)
+    "session_idle_seconds": 900,    # Session hết hạn sau 15 phút không hoạt động
+    "session_touch_seconds": 60,    # Gia hạn session (ghi vào store) tối đa một lần mỗi 60 giây
+    "session_sweep_seconds": 300,   # Chu kỳ dọn các session hết hạn
+    "purge_interval_seconds": 3600, # Chu kỳ xóa hẳn các dòng đã xóa mềm (0 = tắt, khi đã chạy "cli.py purge" theo lịch)
+    "purge_retention_days": 30,     # Dòng đã xóa mềm được giữ lại bao nhiêu ngày trước khi xóa hẳn
+    "purge_batch_size": 500,        # Số dòng xóa hẳn trong mỗi transaction (giữ khóa ghi ngắn)
+    "reminders": True,              # Nhắc việc khi công việc đến hạn (đẩy tới trình duyệt qua Server-Sent Events)
+    "reminder_horizon_hours": 24,   # Các công việc có hạn trong khoảng này được giữ trong heap nhắc việc
+    "reminder_resync_seconds": 300, # Chu kỳ nạp lại heap từ database (để thấy thay đổi của worker khác; 0 = tắt)
+    "password_workers": 0,          # Số thread băm mật khẩu (scrypt); 0 = bằng số nhân CPU
+    "password_queue": 64,           # Số lần đăng nhập được chờ băm; vượt quá thì trả về 503
+    "db_async": True,               # Trang chủ và đăng nhập truy cập database qua DbExecutor (False = route đồng bộ cũ, để so sánh)
+    "db_workers": 0,                # Số thread truy cập database; 0 = bằng pool_size của engine (1 với database trong bộ nhớ)
+    "db_queue": 256,                # Số thao tác database được chờ; vượt quá thì trả về 503
+    "write_batching": False,        # Gộp các thao tác ghi công việc/nhãn của nhiều request vào một transaction (xem models/write_batcher.py)
+    "write_batch_window_ms": 2,     # Thời gian thread ghi chờ thêm thao tác cho một lô (mili giây)
+    "write_batch_max": 64,          # Số thao tác ghi tối đa trong một lô
+    "write_queue": 1024,            # Số thao tác ghi được chờ; vượt quá thì trả về 503
+    "todo_stream_page_size": 500,   # Số công việc đọc và render cho mỗi phần của GET /todos/all (response dạng stream)
+}
+
+def load_app_config(overrides: dict | None = None) -> dict:
+    """
+    Đọc cấu hình ứng dụng: giá trị mặc định < biến môi trường TODO_APP_* < tham số overrides.
+
+    Args:
+        overrides (dict | None): Các giá trị muốn ghi đè trực tiếp. Khóa "db" (dict) được chuyển cho
+            models.engine.make_engine để ghi đè cấu hình database (ví dụ {"db": {"url": "sqlite://"}}).
+
+    Returns:
+        dict: Cấu hình đầy đủ.
+    """
+    config = dict(DEFAULT_APP_CONFIG)
+    for key, default in DEFAULT_APP_CONFIG.items():
+        raw = os.environ.get(f"TODO_APP_{key.upper()}")
+        if raw is None:
+            continue
+        if isinstance(default, bool):
+            config[key] = raw.strip().lower() in ("1", "true", "yes", "on")
+        elif isinstance(default, int):
+            config[key] = int(raw)
+        else:
+            config[key] = raw
+    config["db"] = {}
+    if overrides:
+        config.update(overrides)
+    return config
+
+def create_app(config: dict | None = None):
+    """
+    Tạo ứng dụng FastHTML với engine riêng cho tiến trình hiện tại.
+
+    Args:
+        config (dict | None): Cấu hình ghi đè (xem load_app_config).
+
+    Returns:
+        Ứng dụng FastHTML (Starlette). app.state.engine là engine đã tạo,
+        app.state.boot_seconds là thời gian chạy create_app (giây).
+    """
+    started = time.perf_counter()
+    config = load_app_config(config)
+
+    # Import muộn: chỉ tốn chi phí khi thực sự tạo ứng dụng
+    import asyncio
+    from datetime import datetime, timedelta
+    from fasthtml import common as FH
+    from sqlalchemy.orm import Session
+    from starlette.concurrency import run_in_threadpool  # Chạy code đồng bộ (ghi database) trong threadpool
+    from sqlalchemy import update
+    from models import (DbExecutor, DeletedRowPurger, WriteBatcher, PasswordHasherPool, ReminderScheduler, PoolBusy, User, UserSnapshot, add_todo_tag, clean_todo_values,
+                        configure_data_versions, create_todo, delete_todo, get_data_version, get_data_version_async,
+                        get_user_stats, ini_db, iter_todo_row_pages, load_db_config, load_todo, load_todo_rows, make_engine, migrate,
+                        needs_rehash, parse_todo_filter, remove_todo_tag, search_todos, set_todo_status, tag_index, update_todo)
+    from models.engine import _is_memory_db
+    from models.data_version import GLOBAL_SCOPE, get_scope_version
+    from models.admin import (decode_tag_cursor, get_admin_totals, iter_users_csv, list_recent_activity,  # Trang quản trị
+                              list_tag_usage_page, list_users_page)
+    from models.todo_io import FORMATS, TodoImportError, import_todos, iter_records, iter_export_lines  # Nhập/xuất hàng loạt
+    from views import Admin, Home, Reminders, Search, Stats, Tags, get_current_user, get_current_user_async, login_view, require_login
+    from views import todo_io as TodoIO  # Các hàm trợ giúp cho nhập/xuất công việc
+    from views.metrics import (MetricsMiddleware, db_executor_collector, instrument_engine, metrics,  # Đo đạc và /metrics
+                               metrics_response, password_pool_collector, reminder_collector, tag_index_collector,
+                               write_batcher_collector)
+    from views.sessions import ServerSessionMiddleware, SessionSweeper  # Session phía server
+    from models.session_store import make_session_engine, make_session_store
+    from starlette.middleware.sessions import SessionMiddleware
+
+    # Tạo engine kết nối đến database SQLite bằng hàm make_engine trong models/engine.py
+    # Cấu hình được đọc từ biến môi trường (TODO_DB_URL, TODO_DB_ECHO, TODO_DB_POOL_SIZE, ...) và config["db"]
+    # Mặc định: file todo_app.db, không in câu lệnh SQL (echo=False), chế độ WAL
+    # và các PRAGMA (synchronous, cache_size, mmap_size, busy_timeout, foreign_keys) cho mọi kết nối
+    db_config = load_db_config(config["db"])
+    engine = make_engine(db_config)
+
+    # Đếm số câu lệnh SQL, thời gian database trên mỗi request và ghi log các câu lệnh chậm hơn ngưỡng
+    # TODO_DB_SLOW_QUERY_MS (thay cho echo=True in ra mọi câu lệnh)
+    instrument_engine(engine, db_config["slow_query_ms"])
+
+    # Áp dụng các migration schema còn thiếu (tạo bảng, thêm index) mà không xóa dữ liệu hiện có
+    if config["migrate"]:
+        migrate(engine)
+
+    # Theo dõi phiên bản dữ liệu (dùng cho fragment cache và ETag) bằng engine của tiến trình này
+    configure_data_versions(engine)
+
+    # Session lưu phía server (cookie chỉ chứa ID), dọn session hết hạn bằng thread nền.
+    # Session "sqlite" nằm trong file database riêng: ghi session không làm đổi PRAGMA data_version
+    # của database dữ liệu, nên không xóa bản sao phiên bản dữ liệu (cache, ETag) của các worker
+    session_engine = (make_session_engine(db_config, config["session_db_url"])
+                      if config["session_backend"] == "sqlite" else None)
+    session_store = make_session_store(config["session_backend"], session_engine, config["session_idle_seconds"])
+    sweeper = SessionSweeper(session_store, config["session_sweep_seconds"])
+
+    # Thread nền xóa hẳn các dòng đã xóa mềm quá thời gian lưu giữ, theo lô nhỏ (xem models/purge.py)
+    purger = DeletedRowPurger(engine, config["purge_interval_seconds"], timedelta(days=config["purge_retention_days"]),
+                              config["purge_batch_size"])
+    # Nhắc việc theo hạn chót: heap các công việc sắp đến hạn trong bộ nhớ, cập nhật khi route ghi công việc
+    # (xem models/reminders.py); nhắc việc được đẩy tới trang chủ qua SSE (GET /reminders)
+    reminders = ReminderScheduler(engine, timedelta(hours=config["reminder_horizon_hours"]),
+                                  resync_interval=config["reminder_resync_seconds"])
+    metrics.register_collector("reminders", reminder_collector(reminders))
+    # Chỉ mục nhãn trong bộ nhớ (id <-> tên, gợi ý theo tiền tố), nạp ở lần dùng đầu tiên (xem models/tag_index.py)
+    metrics.register_collector("tag_index", tag_index_collector(tag_index))
+    background = ([sweeper] + ([purger] if config["purge_interval_seconds"] > 0 else [])
+                  + ([reminders] if config["reminders"] else []))
+
+    # Pool thread giới hạn để kiểm tra mật khẩu (scrypt tốn hàng chục ms CPU) mà không chặn các request khác;
+    # số liệu hàng đợi và số lần từ chối được xuất ra /metrics
+    password_pool = PasswordHasherPool(config["password_workers"] or os.cpu_count() or 1, config["password_queue"])
+    metrics.register_collector("password_pool", password_pool_collector(password_pool))
+
+    # Pool thread truy cập database cho các route async: mỗi thread có sẵn một kết nối trong pool của engine,
+    # hàng đợi có giới hạn (quá tải thì trả về 503)
+    db_workers = config["db_workers"] or (1 if _is_memory_db(db_config["url"]) else db_config["pool_size"])
+    db_executor = DbExecutor(engine, db_workers, config["db_queue"])
+    metrics.register_collector("db_executor", db_executor_collector(db_executor))
+    # Truy cập database trong route async: qua DbExecutor, hoặc qua threadpool chung của Starlette khi tắt db_async
+    run_db = db_executor.run if config["db_async"] else run_in_threadpool
+    # Ghi công việc/nhãn theo lô: một thread ghi gộp các thao tác của nhiều request vào một transaction
+    # (giảm tranh chấp khóa ghi của SQLite khi ghi đồng thời); tắt thì mỗi thao tác là một transaction riêng.
+    # Database trong bộ nhớ chỉ có một kết nối dùng chung nên không bật được
+    write_batcher = None
+    if config["write_batching"] and not _is_memory_db(db_config["url"]):
+        write_batcher = WriteBatcher(engine, config["write_batch_window_ms"] / 1000, config["write_batch_max"],
+                                     config["write_queue"])
+        metrics.register_collector("write_batcher", write_batcher_collector(write_batcher))
+        background.append(write_batcher)
+
+    def busy_response(request, exc):
+        # Pool băm mật khẩu, pool database hoặc hàng đợi ghi theo lô đã đầy: từ chối ngay thay vì để request chờ vô hạn
+        return FH.Response("Hệ thống đang bận, vui lòng thử lại sau giây lát.", status_code=503, headers={"Retry-After": "1"})
+
+    # Tạo Beforeware để kiểm tra login trước khi truy cập các trang
+    # require_login là hàm sẽ được gọi trước mỗi request
+    # skip=["/login", "/static/", "/metrics"] là danh sách các đường dẫn không cần kiểm tra login
+    beforeware = FH.Beforeware(require_login, skip=["/login", "/static/", "/metrics"])
+
+    # Tạo ứng dụng FastHTML
+    # beforeware=beforeware: áp dụng beforeware đã tạo ở trên
+    # static_folder="static": thư mục chứa các file tĩnh (css, js, images)
+    # pico=True: sử dụng Pico.css cho giao diện
+    # htmx=True: tích hợp HTMX để tạo các trang web động
+    # middleware: MetricsMiddleware đo độ trễ, kích thước response theo từng route (xem /metrics)
+    # hdrs: extension SSE của HTMX (khung nhắc việc)
+    # on_startup/on_shutdown: bật/tắt các thread nền (dọn session, xóa hẳn dòng đã xóa mềm, nhắc việc) và các pool thread
+    # exception_handlers: trả về 503 khi một pool thread giới hạn đã đầy
+    app, rt = FH.fast_app(
+        before=beforeware,
+        middleware=[FH.Middleware(MetricsMiddleware)],
+        static_folder="static",
+        pico=True,
+        htmx=True,
+        hdrs=(FH.Script(src=Reminders.SSE_EXTENSION_SRC),),
+        on_startup=[job.start for job in background],
+        on_shutdown=[job.stop for job in background] + [password_pool.shutdown, db_executor.shutdown],
+        exception_handlers={PoolBusy: busy_response},
+    )
+    # FastHTML luôn thêm SessionMiddleware (lưu session trong cookie đã ký): thay nó bằng session phía server,
+    # ở đúng vị trí cũ trong chuỗi middleware
+    app.user_middleware = [
+        FH.Middleware(ServerSessionMiddleware, store=session_store, touch_interval=config["session_touch_seconds"])
+        if m.cls is SessionMiddleware else m
+        for m in app.user_middleware
+    ]
+    app.state.engine = engine
+    app.state.session_store = session_store
+    app.state.password_pool = password_pool
+    app.state.db_executor = db_executor
+    app.state.write_batcher = write_batcher
+    app.state.reminders = reminders
+    # Các route được định nghĩa bên trong hàm nên FastHTML không suy ra được phương thức HTTP từ tên hàm
+    # (nó dùng __qualname__, ví dụ "create_app.<locals>.get"): phải ghi rõ methods cho từng route
+
+    # Định nghĩa route "/metrics" cho phương thức GET
+    # Xuất số liệu đo (độ trễ, kích thước response, số câu lệnh SQL...) theo định dạng Prometheus
+    # (số liệu của worker đang xử lý request này)
+    @rt("/metrics", methods="get")
+    def get(request):
+        return metrics_response()
+
+    def render_todo_list(user_id: int, version: tuple, filters=None) -> str:
+        # Danh sách công việc chưa có trong cache (hoặc đã cũ): nạp trang đầu tiên dưới dạng dòng tuple
+        # (phân trang keyset, kèm id nhãn trong số câu lệnh SQL cố định) rồi render nhanh và lưu vào cache.
+        # Danh sách có bộ lọc (điều kiện nằm trong câu truy vấn, xem models/todo_filter.py) không được lưu vào cache
+        with Session(engine) as db:
+            rows, next_cursor = load_todo_rows(db, user_id, filters=filters)
+        todo_list_html = Home.todo_list_html(rows, next_cursor, filters)
+        if filters is None or filters.is_empty():
+            Home.todo_list_cache.put(user_id, version, todo_list_html)
+        return todo_list_html
+
+    # Định nghĩa route "/" (trang chủ) cho phương thức GET
+    # Query string có thể chứa bộ lọc danh sách: status, priority_min, priority_max, due_from, due_to, tag, tag_mode
+    if config["db_async"]:
+        @rt("/", methods="get")
+        async def get(request):
+            try:
+                filters = parse_todo_filter(request.query_params)
+            except ValueError as e:
+                return FH.Response(str(e), status_code=400)
+            # Kiểm tra ETag trước: nếu dữ liệu chưa đổi kể từ lần xem trước, trả về 304
+            # mà không cần truy vấn bảng dữ liệu hay render lại giao diện.
+            # Phiên bản dữ liệu và user thường có sẵn trong cache nên được trả về ngay trong event loop;
+            # chỉ khi phải truy vấn database mới chuyển sang DbExecutor.
+            # ETag tính cả thông tin user đang hiển thị (ví dụ tên), nên đổi tên cũng làm trang hết hạn
+            user = await get_current_user_async(request.session, db_executor)
+            if not user:
+                return FH.Redirect("/login")
+            version = await get_data_version_async(db_executor, user.id)
+            etag = Home.home_etag(request, version, user)
+            if Home.etag_matches(request, etag):
+                return Home.not_modified(etag)
+
+            # Lấy danh sách công việc đã render từ cache; chỉ khi chưa có mới nạp và render trong DbExecutor
+            todo_list_html = Home.todo_list_cache.get(user.id, version) if filters.is_empty() else None
+            if todo_list_html is None:
+                todo_list_html = await db_executor.run(render_todo_list, user.id, version, filters)
+            return Home.home_page(request, user, todo_list_html=todo_list_html, filters=filters), *Home.cache_headers(etag)
+    else:
+        @rt("/", methods="get")
+        def get(request):
+            try:
+                filters = parse_todo_filter(request.query_params)
+            except ValueError as e:
+                return FH.Response(str(e), status_code=400)
+            user = get_current_user(request.session, engine)
+            if not user:
+                return FH.Redirect("/login")
+            version = get_data_version(user.id)
+            etag = Home.home_etag(request, version, user)
+            if Home.etag_matches(request, etag):
+                return Home.not_modified(etag)
+
+            todo_list_html = Home.todo_list_cache.get(user.id, version) if filters.is_empty() else None
+            if todo_list_html is None:
+                todo_list_html = render_todo_list(user.id, version, filters)
+            return Home.home_page(request, user, todo_list_html=todo_list_html, filters=filters), *Home.cache_headers(etag)
+
+    # Định nghĩa route "/todos" cho phương thức GET
+    # Trả về các trang tiếp theo của danh sách công việc dưới dạng fragment HTML (dùng cho HTMX cuộn vô hạn),
+    # hoặc trang đầu tiên của danh sách đã lọc (form lọc ở trang chủ); bộ lọc nằm trong query string như ở "/"
+    @rt("/todos", methods="get")
+    def get(request, cursor: str = ""):
+        user = get_current_user(request.session, engine)
+        if not user:
+            return FH.Redirect("/login")
+        try:
+            filters = parse_todo_filter(request.query_params)
+        except ValueError as e:
+            return invalid_input(request, str(e))
+        with Session(engine) as db:
+            rows, next_cursor = load_todo_rows(db, user.id, cursor, filters=filters)
+        return FH.HTMLResponse(Home.todo_page_items_html(rows, next_cursor, filters))
+
+    # Toàn bộ danh sách công việc (theo bộ lọc trong query string) trong một thẻ Ul, gửi dạng stream:
+    # mỗi lần đọc một trang todo_stream_page_size dòng (keyset, Session riêng) rồi render nhanh thành một phần
+    # của response, nên bộ nhớ không tăng theo số công việc và trình duyệt nhận phần đầu ngay
+    @rt("/todos/all", methods="get")
+    async def get(request):
+        try:
+            filters = parse_todo_filter(request.query_params)
+        except ValueError as e:
+            return invalid_input(request, str(e))
+        chunks = Home.iter_todo_list_html(
+            iter_todo_row_pages(engine, request.session.get('user_id'), filters, config["todo_stream_page_size"]), filters)
+
+        async def stream():
+            # Đọc và render từng phần trong DbExecutor (không chặn event loop)
+            while (chunk := await run_db(next, chunks, None)) is not None:
+                yield chunk
+        return FH.StreamingResponse(stream(), media_type="text/html; charset=utf-8")
+
+    # --- Sửa công việc bằng HTMX ---
+    # Mỗi thao tác ghi đúng các dòng thay đổi trong một transaction ngắn (xem models/todo_crud.py),
+    # rồi chỉ trả về thẻ Li bị ảnh hưởng; bộ đếm thống kê được cập nhật bằng out-of-band swap.
+    # Trigger tăng phiên bản dữ liệu của user, nên fragment cache và ETag của trang chủ tự hết hạn.
+    # Công việc vừa ghi được báo cho bộ lập lịch nhắc việc (cập nhật heap, không cần quét lại bảng).
+    # Khi bật write_batching, phần ghi chạy trong thread ghi theo lô (WriteBatcher) và chỉ trả về sau khi lô đã commit,
+    # nên phần đọc lại ngay sau đó luôn thấy dữ liệu vừa ghi. Các hàm dưới đây chạy trong DbExecutor/thread ghi
+    def write_in(conn, user_id: int, todo_id: int | None, write, *args) -> int | None:
+        # todo_id None nghĩa là tạo mới (write trả về id mới).
+        # Trả về id của công việc, hoặc None nếu nó không tồn tại/không thuộc về user
+        if todo_id is None:
+            return write(conn, user_id, *args)
+        return todo_id if write(conn, user_id, todo_id, *args) else None
+
+    def write_then(then, user_id: int, todo_id: int | None, write, *args):
+        # Ghi trong một transaction riêng rồi gọi then(user_id, todo_id) để nạp kết quả
+        with engine.begin() as conn:
+            todo_id = write_in(conn, user_id, todo_id, write, *args)
+        return then(user_id, todo_id) if todo_id is not None else None
+
+    async def run_write(then, user_id: int, todo_id: int | None, write, *args):
+        # Ghi (theo lô nếu bật write_batching) rồi nạp kết quả bằng then; None nếu công việc không tồn tại
+        if write_batcher is None:
+            return await run_db(write_then, then, user_id, todo_id, write, *args)
+        todo_id = await write_batcher.run(write_in, user_id, todo_id, write, *args)
+        return await run_db(then, user_id, todo_id) if todo_id is not None else None
+
+    def find_todo(user_id: int, todo_id: int):
+        with Session(engine) as db:
+            return load_todo(db, user_id, todo_id)
+
+    def load_written(user_id: int, todo_id: int):
+        # Nạp lại đúng công việc vừa ghi và số liệu thống kê: (todo, stats) hoặc None
+        with Session(engine) as db:
+            todo = load_todo(db, user_id, todo_id)
+            if todo is None:
+                return None
+            reminders.todo_changed(todo)
+            return todo, get_user_stats(db, user_id)
+
+    def count_after_delete(user_id: int, todo_id: int):
+        reminders.todo_removed(todo_id)
+        with engine.connect() as conn:
+            return get_user_stats(conn, user_id)
+
+    def todo_not_found():
+        return FH.Response("Không tìm thấy công việc.", status_code=404)
+
+    def invalid_input(request, message: str):
+        # Request HTMX: hiện lỗi bằng out-of-band swap và không thay nội dung chính
+        # (HTMX mặc định bỏ qua response 4xx, nên lỗi sẽ không hiện ra nếu trả về 400)
+        if 'HX-Request' in request.headers:
+            return Home.todo_error(message), FH.HttpHeader("HX-Reswap", "none")
+        return FH.Response(message, status_code=400)
+
+    # Tạo công việc: trả về thẻ Li mới (HTMX chèn vào đầu danh sách)
+    @rt("/todos", methods="post")
+    async def post(request):
+        record = dict(await request.form())
+        try:
+            result = await run_write(load_written, request.session.get('user_id'), None, create_todo, record)
+        except ValueError as e:
+            return invalid_input(request, str(e))
+        # Công việc vừa tạo có thể đã bị xóa (request khác) trước khi được nạp lại
+        return Home.todo_fragment(*result) if result is not None else todo_not_found()
+
+    # Thẻ Li hiển thị của một công việc (nút "Hủy" của form sửa)
+    @rt("/todos/{todo_id:int}", methods="get")
+    async def get(request, todo_id: int):
+        todo = await run_db(find_todo, request.session.get('user_id'), todo_id)
+        return Home.todo_item(todo) if todo is not None else todo_not_found()
+
+    # Form sửa một công việc
+    @rt("/todos/{todo_id:int}/edit", methods="get")
+    async def get(request, todo_id: int):
+        todo = await run_db(find_todo, request.session.get('user_id'), todo_id)
+        return Home.todo_edit_form(todo) if todo is not None else todo_not_found()
+
+    # Lưu form sửa: một câu UPDATE cho các trường có trong form
+    @rt("/todos/{todo_id:int}", methods="put")
+    async def put(request, todo_id: int):
+        try:
+            values = clean_todo_values(dict(await request.form()))
+        except ValueError as e:
+            return invalid_input(request, str(e))
+        result = await run_write(load_written, request.session.get('user_id'), todo_id, update_todo, values)
+        return Home.todo_fragment(*result) if result is not None else todo_not_found()
+
+    # Đổi trạng thái: ?status=... để đặt trạng thái cụ thể, bỏ trống để chuyển sang trạng thái kế tiếp
+    @rt("/todos/{todo_id:int}/status", methods="post")
+    async def post(request, todo_id: int, status: str = ""):
+        try:
+            result = await run_write(load_written, request.session.get('user_id'), todo_id, set_todo_status, status or None)
+        except ValueError as e:
+            return invalid_input(request, str(e))
+        return Home.todo_fragment(*result) if result is not None else todo_not_found()
+
+    # Xóa công việc: nội dung trả về rỗng (HTMX gỡ thẻ Li), kèm bộ đếm mới
+    @rt("/todos/{todo_id:int}", methods="delete")
+    async def delete(request, todo_id: int):
+        stats = await run_write(count_after_delete, request.session.get('user_id'), todo_id, delete_todo)
+        return Home.todo_deleted_fragment(stats) if stats is not None else todo_not_found()
+
+    # Gắn nhãn (theo tên) vào công việc: trả về khung sửa nhãn
+    @rt("/todos/{todo_id:int}/tags", methods="post")
+    async def post(request, todo_id: int, name: str = ""):
+        try:
+            todo = await run_write(find_todo, request.session.get('user_id'), todo_id, add_todo_tag, name)
+        except ValueError as e:
+            return invalid_input(request, str(e))
+        return Home.todo_tags_editor(todo) if todo is not None else todo_not_found()
+
+    # Bỏ một nhãn khỏi công việc: trả về khung sửa nhãn
+    @rt("/todos/{todo_id:int}/tags/{tag_id:int}", methods="delete")
+    async def delete(request, todo_id: int, tag_id: int):
+        todo = await run_write(find_todo, request.session.get('user_id'), todo_id, remove_todo_tag, tag_id)
+        return Home.todo_tags_editor(todo) if todo is not None else todo_not_found()
+
+    # Định nghĩa route "/stats" cho phương thức GET
+    # Trả về widget thống kê của user (đọc từ bảng thống kê được cập nhật bằng trigger)
+    @rt("/stats", methods="get")
+    def get(request):
+        with engine.connect() as conn:
+            stats = get_user_stats(conn, request.session.get('user_id'))
+        return Stats.stats_widget(stats)
+
+    # Định nghĩa route "/search" cho phương thức GET
+    # Tìm kiếm toàn văn trong các công việc của user, trả về fragment HTML (xếp hạng theo độ liên quan, phân trang)
+    @rt("/search", methods="get")
+    def get(request, q: str = "", page: int = 1):
+        with Session(engine) as db:
+            todos, has_more = search_todos(db, request.session.get('user_id'), q, page)
+            items = [Home.todo_item(todo) for todo in todos]
+        return tuple(Search.search_results(items, q, page, has_more))
+
+    # Định nghĩa route "/tags/suggest" cho phương thức GET
+    # Gợi ý nhãn theo tiền tố cho ô nhập nhãn (autocomplete): trả về các Option cho <datalist>.
+    # Tìm trong chỉ mục nhãn trong bộ nhớ ngay trong event loop; chỉ khi bảng tags đã thay đổi
+    # mới đồng bộ chỉ mục (trong DbExecutor)
+    def sync_tag_index():
+        # Đọc phiên bản chung qua bộ theo dõi để các request sau kiểm tra is_current mà không cần truy vấn
+        get_scope_version(GLOBAL_SCOPE)
+        with engine.connect() as conn:
+            tag_index.sync(conn)
+
+    @rt("/tags/suggest", methods="get")
+    async def get(request, name: str = "", tags: str = ""):
+        value = name or tags
+        if not tag_index.is_current():
+            await run_db(sync_tag_index)
+        _, prefix = Tags.split_tag_prefix(value)
+        return tuple(Tags.tag_suggestions(value, [tag_name for _, tag_name in tag_index.search_prefix(prefix)]))
+
+    # Định nghĩa route "/todos/import" cho phương thức POST
+    # Nhập hàng loạt công việc từ thân request (CSV hoặc JSON Lines, chọn bằng tham số ?format=)
+    # Dữ liệu được đọc dần theo luồng và ghi theo lô, không nạp toàn bộ file vào bộ nhớ
+    @rt("/todos/import", methods="post")
+    async def post(request, format: str = "csv"):
+        if format not in FORMATS:
+            return FH.Response(f"Định dạng không được hỗ trợ: {format}", status_code=400)
+        user_id = request.session.get('user_id')
+        records = iter_records(TodoIO.request_lines(request), format)
+        try:
+            stats = await run_in_threadpool(import_todos, engine, user_id, records)
+        except TodoImportError as e:
+            # Các lô trước chỗ lỗi đã được commit: báo cho client biết đã nhập được bao nhiêu
+            if e.stats["todos"]:
+                reminders.request_resync()
+            return FH.Response(f"Dữ liệu không hợp lệ: {e} (đã nhập {e.stats['todos']} công việc trước khi gặp lỗi)",
+                               status_code=400)
+        # Công việc mới có thể có hạn trong cửa sổ nhắc việc: nạp lại heap (một truy vấn theo khoảng, chạy nền)
+        if stats["todos"]:
+            reminders.request_resync()
+        return TodoIO.import_result(stats)
+
+    # Định nghĩa route "/todos/export" cho phương thức GET
+    # Xuất toàn bộ công việc của user dưới dạng CSV hoặc JSON Lines (streaming)
+    @rt("/todos/export", methods="get")
+    def get(request, format: str = "csv"):
+        if format not in FORMATS:
+            return FH.Response(f"Định dạng không được hỗ trợ: {format}", status_code=400)
+        lines = iter_export_lines(engine, request.session.get('user_id'), format)
+        return TodoIO.export_response(lines, format, f"todos.{format}")
+
+    # Luồng nhắc việc (Server-Sent Events) của user đang đăng nhập: mỗi nhắc việc là một sự kiện "reminder"
+    # chứa thẻ Li; gửi dòng chú thích định kỳ để proxy không đóng kết nối đang rảnh
+    @rt("/reminders", methods="get")
+    async def get(request):
+        user_id = request.session.get('user_id')
+        queue = reminders.subscribe(user_id)
+
+        async def stream():
+            try:
+                while True:
+                    try:
+                        reminder = await asyncio.wait_for(queue.get(), 15)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                        continue
+                    if reminder is None:  # Ứng dụng đang tắt
+                        return
+                    yield Reminders.reminder_event(reminder)
+            finally:
+                reminders.unsubscribe(user_id, queue)
+
+        return FH.EventStream(stream())
+
+    # --- Trang quản trị ---
+    # Chỉ dành cho user có is_admin (kiểm tra theo thông tin user mới nhất trong cache, không chỉ theo session).
+    # Mọi truy vấn là GROUP BY/keyset trên các bảng thống kê (models/admin.py), không nạp User.todos
+    def read_db(func, *args):
+        # Chạy func(conn, *args) với một kết nối đọc (trong DbExecutor)
+        with engine.connect() as conn:
+            return func(conn, *args)
+
+    def load_admin_page():
+        with engine.connect() as conn:
+            totals = get_admin_totals(conn)
+            users, next_user = list_users_page(conn)
+            tags, next_tag = list_tag_usage_page(conn)
+            recent = list_recent_activity(conn)
+        return totals, users, next_user, tags, next_tag, recent
+
+    async def is_admin(request) -> bool:
+        user = await get_current_user_async(request.session, db_executor)
+        return user is not None and user.is_admin
+
+    def forbidden():
+        return FH.Response("Chỉ quản trị viên mới được truy cập trang này.", status_code=403)
+
+    # Định nghĩa route "/init_db" cho phương thức GET
+    # Route này dùng để khởi tạo lại database (xóa toàn bộ dữ liệu, chỉ tạo dữ liệu mẫu): chỉ quản trị viên được dùng.
+    # Dữ liệu giả lập kích thước lớn chỉ được sinh từ dòng lệnh ("cli.py seed"), không qua HTTP
+    @rt("/init_db", methods="get")
+    async def get(request):
+        if not await is_admin(request):
+            return forbidden()
+        #Tạo bảng trong database bằng cách gọi hàm ini_db từ model (trong threadpool, không chặn event loop)
+        await run_in_threadpool(ini_db, engine)
+        # Trả về thông báo đã khởi tạo database thành công
+        return FH.H1("Database initialized.")
+
+    @rt("/admin", methods="get")
+    async def get(request):
+        if not await is_admin(request):
+            return forbidden()
+        return Admin.admin_page(request, *await run_db(load_admin_page))
+
+    # Các trang tiếp theo của bảng user (fragment cho HTMX cuộn vô hạn)
+    @rt("/admin/users", methods="get")
+    async def get(request, after: int = 0):
+        if not await is_admin(request):
+            return forbidden()
+        return tuple(Admin.user_rows(*await run_db(read_db, list_users_page, after)))
+
+    # Các trang tiếp theo của bảng nhãn
+    @rt("/admin/tags", methods="get")
+    async def get(request, after: str = ""):
+        if not await is_admin(request):
+            return forbidden()
+        return tuple(Admin.tag_rows(*await run_db(read_db, list_tag_usage_page, decode_tag_cursor(after))))
+
+    # Xuất toàn bộ danh sách user kèm số liệu dưới dạng CSV (streaming, đọc theo lô keyset)
+    @rt("/admin/users/export", methods="get")
+    async def get(request):
+        if not await is_admin(request):
+            return forbidden()
+        return TodoIO.export_response(iter_users_csv(engine), "csv", "users.csv")
+
+    # Định nghĩa route "/login" cho phương thức GET
+    # Trả về giao diện login
+    @rt("/login", methods="get")
+    def get(request):
+        return login_view()
+
+    # Định nghĩa route "/login" cho phương thức POST
+    # Xử lý việc user submit form login
+    def find_login(login: str):
+        # Tìm user theo tên đăng nhập; trả về (snapshot, chuỗi băm mật khẩu) hoặc None
+        with Session(engine) as db: # Mở một session để làm việc với database
+            user = db.query(User).filter(User.login == login).first()
+            return (UserSnapshot.from_user(user), user.password) if user else None
+
+    def store_rehash(user_id: int, old_hash: str, new_hash: str):
+        # Chỉ ghi nếu mật khẩu chưa bị đổi bởi request khác trong lúc băm
+        with engine.begin() as conn:
+            conn.execute(update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash))
+
+    @rt("/login", methods="post")
+    async def post(request, login: str, password: str):
+        # Truy vấn database qua DbExecutor; kiểm tra mật khẩu (scrypt) trong pool băm mật khẩu,
+        # nên event loop không bị chặn khi nhiều người đăng nhập cùng lúc.
+        # Pool nào đầy thì PoolBusy được chuyển thành 503 (busy_response)
+        found = await run_db(find_login, login)
+        user, stored_hash = found or (None, None)
+        # User không tồn tại vẫn tốn một lần băm, để thời gian phản hồi không tiết lộ tên đăng nhập
+        ok = await password_pool.verify(stored_hash, password)
+        # Nếu không tìm thấy user hoặc sai mật khẩu
+        if not ok:
+            # Trả về lại trang login với thông báo lỗi
+            return login_view("Không tìm thấy user hoặc sai mật khẩu.")
+        # Mật khẩu còn lưu theo định dạng cũ (SHA-256): băm lại bằng scrypt ngay khi biết mật khẩu đúng.
+        # Nếu pool đang bận thì bỏ qua, lần đăng nhập sau sẽ làm
+        if needs_rehash(stored_hash):
+            try:
+                new_hash = await password_pool.hash(password)
+                await run_db(store_rehash, user.id, stored_hash, new_hash)
+            except PoolBusy:
+                pass
+        #Lưu thông tin user vào session sau khi login thành công (nội dung nằm ở server, cookie chỉ chứa ID)
+        # Đổi sang ID session mới để ID cũ (nếu có) không dùng được nữa
+        request.session.cycle_id()
+        request.session['login'] = user.login
+        request.session['is_admin'] = user.is_admin
+        request.session['user_id'] = user.id
+        request.session['name'] = user.name
+        request.session['email'] = user.email
+        request.session['login_time'] = datetime.now().isoformat() # Lưu thời gian login
+        # Chuyển hướng người dùng về trang chủ
+        return FH.Redirect("/")
+
+    #Đăng xuất
+    @rt("/logout", methods="get")
+    def get(request):
+        # Xoá thông tin user khỏi session để đăng xuất (session bị xóa khỏi store và cookie bị hủy)
+        request.session.clear()
+        # Chuyển hướng về trang đăng nhập
+        return FH.Redirect("/login")
+
+    app.state.boot_seconds = time.perf_counter() - started
+    return app
+
+def _prepare_database(config: dict, workers: int):
+    # Chạy ở tiến trình cha trước khi tạo worker: áp dụng migration đúng một lần
+    # (tránh nhiều worker cùng migrate một lúc) và kiểm tra database có dùng chung được không
+    from models import load_db_config, make_engine, migrate
+    from models.engine import _is_memory_db
+    from models.data_version import GLOBAL_SCOPE, get_scope_version
+    db_config = load_db_config(config["db"])
+    if workers > 1 and _is_memory_db(db_config["url"]):
+        raise SystemExit("Database trong bộ nhớ không thể dùng chung giữa nhiều worker; hãy đặt TODO_DB_URL tới một file.")
+    if workers > 1 and config["session_backend"] == "memory":
+        raise SystemExit("Session trong bộ nhớ không dùng chung được giữa các worker; hãy dùng TODO_APP_SESSION_BACKEND=sqlite.")
+    engine = make_engine(db_config)
+    try:
+        migrate(engine)
+        with engine.connect() as conn:
+            journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        if workers > 1 and str(journal_mode).lower() != "wal":
+            print(f"Cảnh báo: journal_mode = {journal_mode}; nên dùng WAL khi chạy nhiều worker.")
+    finally:
+        engine.dispose()
+
+def serve(argv=None) -> int:
+    """
+    Chạy server uvicorn với N worker, mỗi worker gọi create_app() để có engine riêng.
+
+    Args:
+        argv (list[str] | None): Tham số dòng lệnh (mặc định lấy từ sys.argv).
+
+    Returns:
+        int: Mã thoát.
+    """
+    import argparse
+    config = load_app_config()
+    parser = argparse.ArgumentParser(description="Chạy ứng dụng Todo")
+    parser.add_argument("--host", default=config["host"], help="Địa chỉ lắng nghe")
+    parser.add_argument("--port", type=int, default=config["port"], help="Cổng HTTP")
+    parser.add_argument("--workers", type=int, default=config["workers"], help="Số tiến trình worker")
+    parser.add_argument("--reload", action="store_true", help="Tự khởi động lại khi mã nguồn thay đổi (chỉ 1 worker, dùng khi phát triển)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    _prepare_database(config, args.workers)
+    # Worker được tạo bằng spawn và thừa hưởng biến môi trường: không migrate lại ở từng worker
+    os.environ["TODO_APP_MIGRATE"] = "0"
+    uvicorn.run("webapp:create_app", factory=True, host=args.host, port=args.port,
+                workers=None if args.reload else args.workers, reload=args.reload)
+    return 0